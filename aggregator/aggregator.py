@@ -2,12 +2,11 @@ import time
 import logging
 from datetime import datetime, timedelta
 import grpc
-from concurrent.futures import ThreadPoolExecutor
 from proto import statistic_pb2, statistic_pb2_grpc, post_pb2, post_pb2_grpc
 
 AGGREGATION_INTERVAL_MINUTES = 15
-MAX_WORKERS = 5
-SYSTEM_USER_ID = "aggregator"
+LOOKUP_BATCH_SIZE = 5000
+AGGREGATE_BATCH_SIZE = 10000
 STATISTIC_SERVICE_URL = "statistic_service:50052"
 POST_SERVICE_URL = "post_service:50051"
 
@@ -29,58 +28,56 @@ def get_post_stub():
     return post_pb2_grpc.PostServiceStub(channel)
 
 
-def get_post_creator_id(post_id: str) -> str:
-    try:
-        stub = get_post_stub()
-        response = stub.GetPost(
-            post_pb2.GetPostRequest(post_id=post_id, user_id=SYSTEM_USER_ID)
-        )
-        return response.post.creator_id
-    except grpc.RpcError as e:
-        logging.error(f"Failed to get creator for post {post_id}: {e.details()}")
-        raise
-
-
-def process_post(post_id, stats_stub):
-    try:
-        creator_id = get_post_creator_id(post_id)
-        stats_stub.GetPostStats(
-            statistic_pb2.PostStatsRequest(post_id=post_id, user_id=creator_id)
-        )
-        logging.info(f"Processed post {post_id} for user {creator_id}")
-        return True
-    except Exception as e:
-        logging.error(f"Error processing post {post_id}: {str(e)}")
-        return False
+def lookup_creators(post_ids, post_stub):
+    """
+    post_id -> creator_id via GetPostCreators, LOOKUP_BATCH_SIZE posts per call. Private posts are
+    included, unlike with BatchGetPosts, so their counts are credited to the author too.
+    """
+    creators = {}
+    for offset in range(0, len(post_ids), LOOKUP_BATCH_SIZE):
+        chunk = post_ids[offset:offset + LOOKUP_BATCH_SIZE]
+        try:
+            response = post_stub.GetPostCreators(post_pb2.GetPostCreatorsRequest(post_ids=chunk))
+        except grpc.RpcError as e:
+            logging.error(f"Failed to get creators for {len(chunk)} posts: {e.details()}")
+            continue
+        creators.update(response.creator_ids)
+    return creators
 
 
 def run_aggregation():
+    """
+    Counters are aggregated continuously by ClickHouse and new events carry creator_id, so a run
+    only attributes posts known from older events alone: one AggregateBatch call lists them,
+    their creators are looked up, and the result is sent back in batches of AGGREGATE_BATCH_SIZE.
+    """
     logging.info("Starting aggregation...")
     start_time = datetime.now()
 
     try:
         stats_stub = get_statistic_stub()
-        post_ids_response = stats_stub.GetPostIds(statistic_pb2.GetPostIdsRequest())
-        post_ids = post_ids_response.post_ids
+        response = stats_stub.AggregateBatch(statistic_pb2.AggregateBatchRequest())
+        post_ids = list(response.unattributed_post_ids)
 
         if not post_ids:
-            logging.warning("No posts found for aggregation")
+            logging.info("No new posts to attribute")
             return
 
-        logging.info(f"Found {len(post_ids)} posts to process")
+        logging.info(f"Found {len(post_ids)} posts without a creator")
+        creators = lookup_creators(post_ids, get_post_stub())
 
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = [
-                executor.submit(process_post, post_id, stats_stub)
-                for post_id in post_ids
-            ]
-            success_count = sum(1 for f in futures if f.result())
-            error_count = len(futures) - success_count
+        items = [statistic_pb2.PostCreator(post_id=post_id, creator_id=creator_id)
+                 for post_id, creator_id in creators.items()]
+        recorded = 0
+        for offset in range(0, len(items), AGGREGATE_BATCH_SIZE):
+            recorded += stats_stub.AggregateBatch(
+                statistic_pb2.AggregateBatchRequest(creators=items[offset:offset + AGGREGATE_BATCH_SIZE])
+            ).recorded
 
         duration = datetime.now() - start_time
         logging.info(
-            f"Aggregation completed. Success: {success_count}, "
-            f"Errors: {error_count}, Duration: {duration.total_seconds():.2f} sec"
+            f"Aggregation completed. Success: {recorded}, "
+            f"Errors: {len(post_ids) - len(creators)}, Duration: {duration.total_seconds():.2f} sec"
         )
 
     except Exception as e:
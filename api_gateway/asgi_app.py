@@ -0,0 +1,53 @@
+"""
+ASGI variant of app.py: the same routes and JSON contracts, served on an event loop with grpc.aio
+and httpx, so a request waiting on a backend does not hold a thread. Run with
+
+    hypercorn asgi_app:app --bind 0.0.0.0:8080 --workers 4
+"""
+import asyncio
+import os
+from quart import Quart, jsonify
+from async_routes.posts import posts_bp
+from async_routes.users import users_bp, user_service
+from async_routes.statistics import statistics_bp
+from async_routes.common import channels
+from utils.auth import token_cache
+from config import GATEWAY_CONFIG
+
+app = Quart(__name__)
+
+app.config.update(GATEWAY_CONFIG)
+
+app.register_blueprint(users_bp, url_prefix='/api/v1')
+app.register_blueprint(posts_bp, url_prefix='/api/v1')
+app.register_blueprint(statistics_bp, url_prefix='/api/v1')
+
+
+@app.before_serving
+async def open_clients():
+    user_service.base_url = app.config['USER_SERVICE_URL']
+
+
+@app.after_serving
+async def close_clients():
+    await user_service.close()
+    await channels.close()
+
+
+@app.route('/metrics', methods=['GET'])
+async def metrics():
+    return jsonify({
+        'token_cache': token_cache.metrics(),
+        'grpc_channels': channels.metrics(),
+        'user_service': user_service.metrics()
+    })
+
+
+if __name__ == '__main__':
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    config = Config()
+    config.bind = [f"0.0.0.0:{os.getenv('PORT', '8080')}"]
+    config.backlog = int(os.getenv('GATEWAY_BACKLOG', '2048'))
+    asyncio.run(serve(app, config))
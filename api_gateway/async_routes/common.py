@@ -0,0 +1,90 @@
+import asyncio
+from functools import wraps
+from typing import Dict
+import grpc
+import httpx
+from quart import request, jsonify, current_app
+from proto import post_pb2_grpc, statistic_pb2_grpc
+
+try:
+    from async_routes.users import user_service
+    from utils.auth import authenticate, confirm_token, token_cache, RevocationsNotLoaded
+    from utils.grpc_channels import AsyncChannelRegistry
+    from utils.grpc_errors import grpc_error_response
+    from utils.user_service_client import UserServiceUnavailable
+    from utils.schemas import simplify_validation_errors, InvalidPostID, ValidationError
+except ImportError:
+    from .users import user_service
+    from ..utils.auth import authenticate, confirm_token, token_cache, RevocationsNotLoaded
+    from ..utils.grpc_channels import AsyncChannelRegistry
+    from ..utils.grpc_errors import grpc_error_response
+    from ..utils.user_service_client import UserServiceUnavailable
+    from ..utils.schemas import simplify_validation_errors, InvalidPostID, ValidationError
+
+channels = AsyncChannelRegistry()
+# Token -> /user-info call in progress, shared by concurrent misses of the same token
+user_info_calls: Dict[str, asyncio.Future] = {}
+
+
+def get_post_stub():
+    return channels.stub(post_pb2_grpc.PostServiceStub,
+                         current_app.config['POST_SERVICE_HOST'], current_app.config['POST_SERVICE_PORT'])
+
+
+def get_statistic_stub():
+    return channels.stub(statistic_pb2_grpc.StatisticServiceStub,
+                         current_app.config['STATISTIC_SERVICE_HOST'], current_app.config['STATISTIC_SERVICE_PORT'])
+
+
+async def fetch_user_info_status(token: str):
+    try:
+        return (await user_service.get('/user-info', headers={'Authorization': token})).status_code
+    except (httpx.HTTPError, UserServiceUnavailable):
+        return None
+
+
+async def user_info_status(token: str):
+    call = user_info_calls.get(token)
+    if call is None:
+        call = user_info_calls[token] = asyncio.ensure_future(fetch_user_info_status(token))
+        call.add_done_callback(lambda _: user_info_calls.pop(token, None))
+    # A cancelled request must not cancel the call the others are waiting on
+    return await asyncio.shield(call)
+
+
+def token_required(f):
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        token, secret = request.headers.get('Authorization'), current_app.config['JWT_SECRET']
+        try:
+            user_id, error = authenticate(token, secret)
+        except RevocationsNotLoaded:
+            # Waits off the event loop; returns at once after the first REVOCATIONS_LOAD_TIMEOUT_SECONDS
+            if await asyncio.get_running_loop().run_in_executor(None, token_cache.wait_until_loaded):
+                user_id, error = authenticate(token, secret)
+            else:
+                user_id, error = confirm_token(token, secret, await user_info_status(token))
+        if error:
+            body, status_code = error
+            return jsonify(body), status_code
+
+        return await f(user_id, *args, **kwargs)
+
+    return decorated
+
+
+def handle_errors(f):
+    @wraps(f)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await f(*args, **kwargs)
+        except ValidationError as e:
+            return jsonify(simplify_validation_errors(e)), 400
+        except InvalidPostID as e:
+            return jsonify({"message": str(e)}), 400
+        except grpc.RpcError as e:
+            body, status_code = grpc_error_response(e)
+            return jsonify(body), status_code
+        except Exception:
+            return jsonify({"message": "Internal server error"}), 500
+    return wrapper
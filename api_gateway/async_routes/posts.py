@@ -0,0 +1,246 @@
+import json
+from datetime import datetime
+from collections import OrderedDict
+from quart import Blueprint, request, jsonify, Response
+from proto import post_pb2
+
+try:
+    from async_routes.common import get_post_stub, token_required, handle_errors
+    from utils.schemas import (
+        PostCreate, PostUpdate, PostResponse, MetaResponse, CursorMetaResponse, ListQuery, CursorListQuery,
+        validate_post_id, InvalidPostID, CommentCreate
+    )
+except ImportError:
+    from .common import get_post_stub, token_required, handle_errors
+    from ..utils.schemas import (
+        PostCreate, PostUpdate, PostResponse, MetaResponse, CursorMetaResponse, ListQuery, CursorListQuery,
+        validate_post_id, InvalidPostID, CommentCreate
+    )
+
+posts_bp = Blueprint('posts', __name__)
+
+
+def json_response(data, status: int = 200) -> Response:
+    return Response(json.dumps(data, ensure_ascii=False), status, mimetype='application/json')
+
+
+@posts_bp.errorhandler(InvalidPostID)
+async def handle_invalid_post_id(error):
+    return jsonify({"message": str(error)}), 400
+
+
+@posts_bp.route('/posts', methods=['POST'])
+@token_required
+@handle_errors
+async def create_post(user_id: str):
+    data = PostCreate(**(await request.get_json()))
+    response = await get_post_stub().CreatePost(post_pb2.CreatePostRequest(
+        title=data.title,
+        description=data.description or "",
+        creator_id=user_id,
+        is_private=data.is_private,
+        tags=data.tags
+    ))
+    return json_response(OrderedDict([
+        ("post_id", int(response.post_id)),
+        ("created_at", response.created_at)
+    ]), 201)
+
+
+@posts_bp.route('/posts/<post_id>', methods=['GET'])
+@token_required
+@handle_errors
+async def get_post(user_id: str, post_id: str):
+    post_id = validate_post_id(post_id)
+    response = await get_post_stub().GetPost(post_pb2.GetPostRequest(post_id=str(post_id), user_id=user_id))
+
+    if not response.HasField('post'):
+        return jsonify({"message": "Post not found"}), 404
+
+    return json_response(OrderedDict([
+        ("post_id", int(response.post.post_id)),
+        ("title", response.post.title),
+        ("description", response.post.description),
+        ("creator_id", response.post.creator_id),
+        ("created_at", response.post.created_at),
+        ("updated_at", response.post.updated_at),
+        ("is_private", response.post.is_private),
+        ("tags", list(response.post.tags))
+    ]))
+
+
+@posts_bp.route('/posts/<post_id>', methods=['PUT'])
+@token_required
+@handle_errors
+async def update_post(user_id: str, post_id: str):
+    post_id = validate_post_id(post_id)
+    data = PostUpdate(**(await request.get_json()))
+    update_fields = {}
+    if data.title is not None:
+        update_fields['title'] = data.title
+    if data.description is not None:
+        update_fields['description'] = data.description
+    if data.is_private is not None:
+        update_fields['is_private'] = data.is_private
+    if data.tags is not None:
+        update_fields['tags'] = data.tags
+
+    response = await get_post_stub().UpdatePost(post_pb2.UpdatePostRequest(
+        post_id=str(post_id),
+        user_id=user_id,
+        **update_fields
+    ))
+    return jsonify({"updated_at": response.updated_at}), 200
+
+
+@posts_bp.route('/posts/<post_id>', methods=['DELETE'])
+@token_required
+@handle_errors
+async def delete_post(user_id: str, post_id: str):
+    post_id = validate_post_id(post_id)
+    await get_post_stub().DeletePost(post_pb2.DeletePostRequest(post_id=str(post_id), user_id=user_id))
+    return jsonify({"message": "Post deleted successfully."}), 200
+
+
+@posts_bp.route('/posts', methods=['GET'])
+@token_required
+@handle_errors
+async def list_posts(user_id: str):
+    if 'cursor' in request.args:
+        return await list_posts_by_cursor(user_id)
+
+    query = ListQuery(
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', 10, type=int)
+    )
+    response = await get_post_stub().ListPosts(post_pb2.ListPostsRequest(
+        user_id=user_id,
+        page=query.page,
+        per_page=query.per_page
+    ))
+
+    meta = MetaResponse(
+        total=response.total,
+        per_page=response.per_page,
+        current_page=response.page,
+        last_page=response.last_page,
+        from_=response.from_,
+        to_=response.to_
+    ).dict(by_alias=True)
+
+    return posts_list_response(response.posts, meta)
+
+
+async def list_posts_by_cursor(user_id: str):
+    query = CursorListQuery(
+        cursor=request.args.get('cursor', ''),
+        per_page=request.args.get('per_page', 10, type=int),
+        include_total=request.args.get('include_total', 'false').lower() == 'true'
+    )
+    response = await get_post_stub().ListPosts(post_pb2.ListPostsRequest(
+        user_id=user_id,
+        per_page=query.per_page,
+        cursor=query.cursor,
+        use_cursor=True,
+        include_total=query.include_total
+    ))
+
+    meta = CursorMetaResponse(
+        per_page=response.per_page,
+        next_cursor=response.next_cursor or None,
+        total=response.total if query.include_total else None
+    ).dict()
+
+    return posts_list_response(response.posts, meta)
+
+
+def posts_list_response(grpc_posts, meta):
+    posts = [
+        PostResponse(
+            post_id=int(post.post_id),
+            title=post.title,
+            description=post.description,
+            creator_id=post.creator_id,
+            created_at=post.created_at,
+            updated_at=post.updated_at,
+            is_private=post.is_private,
+            tags=list(post.tags)
+        ).dict()
+        for post in grpc_posts
+    ]
+    return json_response(OrderedDict([("posts", posts), ("meta", meta)]))
+
+
+@posts_bp.route('/posts/<post_id>/view', methods=['POST'])
+@token_required
+@handle_errors
+async def view_post(user_id: str, post_id: str):
+    post_id = validate_post_id(post_id)
+    response = await get_post_stub().ViewPost(post_pb2.ViewPostRequest(post_id=str(post_id), user_id=user_id))
+    return json_response(OrderedDict([
+        ("success", response.success),
+        ("viewed_at", datetime.utcnow().isoformat())
+    ]))
+
+
+@posts_bp.route('/posts/<post_id>/like', methods=['POST'])
+@token_required
+@handle_errors
+async def like_post(user_id: str, post_id: str):
+    post_id = validate_post_id(post_id)
+    response = await get_post_stub().LikePost(post_pb2.LikePostRequest(post_id=str(post_id), user_id=user_id))
+    return json_response(OrderedDict([
+        ("success", response.success),
+        ("liked_at", datetime.utcnow().isoformat())
+    ]))
+
+
+@posts_bp.route('/posts/<post_id>/comment', methods=['POST'])
+@token_required
+@handle_errors
+async def comment_post(user_id: str, post_id: str):
+    post_id = validate_post_id(post_id)
+    data = CommentCreate(**(await request.get_json()))
+    response = await get_post_stub().CommentPost(post_pb2.CommentPostRequest(
+        post_id=str(post_id),
+        user_id=user_id,
+        comment=data.text
+    ))
+    return jsonify({
+        "comment_id": int(response.comment_id),
+        "created_at": response.created_at
+    }), 201
+
+
+@posts_bp.route('/posts/<post_id>/comments', methods=['GET'])
+@token_required
+@handle_errors
+async def get_comments(user_id: str, post_id: str):
+    post_id = validate_post_id(post_id)
+    query = ListQuery(
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', 10, type=int)
+    )
+    response = await get_post_stub().GetComments(post_pb2.GetCommentsRequest(
+        post_id=str(post_id),
+        user_id=user_id,
+        page=query.page,
+        per_page=query.per_page
+    ))
+
+    comments = [
+        OrderedDict([
+            ("comment_id", int(comment.comment_id)),
+            ("text", comment.text),
+            ("user_id", comment.user_id),
+            ("created_at", comment.created_at)
+        ])
+        for comment in response.comments
+    ]
+    meta = OrderedDict([
+        ("total", response.meta.total),
+        ("page", response.meta.page),
+        ("per_page", response.meta.per_page),
+        ("last_page", response.meta.last_page)
+    ])
+    return json_response(OrderedDict([("comments", comments), ("meta", meta)]))
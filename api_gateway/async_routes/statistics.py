@@ -0,0 +1,131 @@
+import asyncio
+import json
+from typing import Optional
+from quart import Blueprint, request, Response, jsonify
+from proto import statistic_pb2, post_pb2
+
+try:
+    from async_routes.common import get_post_stub, get_statistic_stub, token_required, handle_errors
+    from utils.statistic_query import (
+        post_dynamic_request, is_streamed, top_posts_request, trending_posts_request, top_users_request,
+        post_stats_body, dynamic_body, top_posts_body, trending_posts_body, top_users_body
+    )
+except ImportError:
+    from .common import get_post_stub, get_statistic_stub, token_required, handle_errors
+    from ..utils.statistic_query import (
+        post_dynamic_request, is_streamed, top_posts_request, trending_posts_request, top_users_request,
+        post_stats_body, dynamic_body, top_posts_body, trending_posts_body, top_users_body
+    )
+
+statistics_bp = Blueprint('statistics', __name__)
+
+
+def json_response(data) -> Response:
+    return Response(json.dumps(data, ensure_ascii=False), 200, mimetype='application/json')
+
+
+async def get_post_creator_id(post_id: str, user_id: str) -> Optional[str]:
+    """creator_id of a post visible to the user (None if there is none), without loading the rest of the post."""
+    response = await get_post_stub().BatchGetPosts(post_pb2.BatchGetPostsRequest(
+        post_ids=[post_id],
+        user_id=user_id,
+        fields=['creator_id']
+    ))
+    if not response.posts:
+        return None
+    return response.posts[0].creator_id
+
+
+async def with_creator_id(post_id: str, user_id: str, call):
+    """
+    Awaits the post lookup and an independent statistic call together. The lookup decides the
+    response, so its error wins over the call's one, and the call's result is dropped if the
+    post is not visible.
+    """
+    creator_id, result = await asyncio.gather(get_post_creator_id(post_id, user_id), call, return_exceptions=True)
+    if isinstance(creator_id, BaseException):
+        raise creator_id
+    if creator_id is not None and isinstance(result, BaseException):
+        raise result
+    return creator_id, result
+
+
+@statistics_bp.route('/posts/<post_id>/stats', methods=['GET'])
+@token_required
+@handle_errors
+async def get_post_stats(user_id: str, post_id: str):
+    creator_id, response = await with_creator_id(
+        post_id, user_id, get_statistic_stub().GetPostStats(statistic_pb2.PostStatsRequest(post_id=post_id))
+    )
+    if creator_id is None:
+        return jsonify({"message": "Post not found"}), 404
+    return json_response(post_stats_body(response))
+
+
+@statistics_bp.route('/posts/<post_id>/dynamic', methods=['GET'])
+@token_required
+@handle_errors
+async def get_post_dynamic(user_id: str, post_id: str):
+    try:
+        dynamic_request, error = post_dynamic_request(request.args, post_id, user_id), None
+    except ValueError as e:
+        dynamic_request, error = None, str(e)
+    streamed = dynamic_request is not None and is_streamed(dynamic_request)
+
+    # A single unary call is fetched together with the post lookup; streams start once it passed
+    response = None
+    if dynamic_request is not None and not streamed:
+        creator_id, response = await with_creator_id(
+            post_id, user_id, get_statistic_stub().GetPostDynamic(dynamic_request)
+        )
+    else:
+        creator_id = await get_post_creator_id(post_id, user_id)
+    if creator_id is None:
+        return jsonify({"message": "Post not found"}), 404
+    if creator_id != user_id:
+        return jsonify({"message": "Only post creator can view post dynamics"}), 403
+    if error:
+        return jsonify({"message": error}), 400
+
+    if streamed:
+        # Collected before answering, like the WSGI route, so a failed chunk is not sent as a cut-off 200
+        responses = [chunk async for chunk in get_statistic_stub().StreamPostDynamic(dynamic_request)]
+    else:
+        responses = [response]
+    return json_response(dynamic_body(dynamic_request, responses))
+
+
+@statistics_bp.route('/posts/top', methods=['GET'])
+@token_required
+@handle_errors
+async def get_top_posts(user_id: str):
+    try:
+        top_request = top_posts_request(request.args, user_id)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    response = await get_statistic_stub().GetTopPosts(top_request)
+    return json_response(top_posts_body(response))
+
+
+@statistics_bp.route('/posts/trending', methods=['GET'])
+@token_required
+@handle_errors
+async def get_trending_posts(user_id: str):
+    try:
+        trending_request = trending_posts_request(request.args, user_id)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    response = await get_statistic_stub().GetTrendingPosts(trending_request)
+    return json_response(trending_posts_body(response))
+
+
+@statistics_bp.route('/users/top', methods=['GET'])
+@token_required
+@handle_errors
+async def get_top_users(user_id: str):
+    try:
+        top_request = top_users_request(request.args, user_id)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    response = await get_statistic_stub().GetTopUsers(top_request)
+    return json_response(top_users_body(response))
@@ -0,0 +1,88 @@
+import httpx
+from quart import Blueprint, request, jsonify
+
+try:
+    from utils.auth import token_cache
+    from utils.user_service_client import AsyncUserServiceClient, UserServiceUnavailable, forwarded_headers
+except ImportError:
+    from ..utils.auth import token_cache
+    from ..utils.user_service_client import AsyncUserServiceClient, UserServiceUnavailable, forwarded_headers
+
+users_bp = Blueprint('users', __name__)
+
+# base_url is set from the app config when the server starts
+user_service = AsyncUserServiceClient()
+
+UNAVAILABLE = (httpx.HTTPError, UserServiceUnavailable, ValueError)
+
+
+@users_bp.route('/register', methods=['POST'])
+async def register():
+    try:
+        response = await user_service.post('/register', json=await request.get_json())
+        response_data = response.json()
+        return jsonify({
+            'message': response_data.get('message', 'User registered successfully.')
+        }), response.status_code
+    except UNAVAILABLE:
+        return jsonify({'message': 'User service unavailable'}), 503
+
+
+@users_bp.route('/login', methods=['POST'])
+async def login():
+    try:
+        response = await user_service.post('/login', json=await request.get_json())
+        return jsonify(response.json()), response.status_code
+    except UNAVAILABLE:
+        return jsonify({'message': 'User service unavailable'}), 503
+
+
+@users_bp.route('/profile', methods=['GET'])
+async def get_profile():
+    try:
+        response = await user_service.get('/profile', headers=forwarded_headers(request.headers))
+        return jsonify(response.json()), response.status_code
+    except UNAVAILABLE:
+        return jsonify({'message': 'User service unavailable'}), 503
+
+
+@users_bp.route('/profile', methods=['PUT'])
+async def update_profile():
+    try:
+        response = await user_service.put('/profile', headers=forwarded_headers(request.headers),
+                                          json=await request.get_json())
+        return jsonify(response.json()), response.status_code
+    except UNAVAILABLE:
+        return jsonify({'message': 'User service unavailable'}), 503
+
+
+@users_bp.route('/user-info', methods=['GET'])
+async def get_user_info():
+    try:
+        response = await user_service.get('/user-info', headers=forwarded_headers(request.headers))
+        return jsonify(response.json()), response.status_code
+    except UNAVAILABLE:
+        return jsonify({'message': 'User service unavailable'}), 503
+
+
+@users_bp.route('/logout', methods=['POST'])
+async def logout():
+    try:
+        response = await user_service.post('/logout', headers=forwarded_headers(request.headers))
+        response_data = response.json()
+        if response.status_code == 200:
+            token_cache.revoke(response_data['user_id'], response_data['token_version'])
+        return jsonify({'message': response_data.get('message')}), response.status_code
+    except UNAVAILABLE:
+        return jsonify({'message': 'User service unavailable'}), 503
+
+
+@users_bp.route('/health', methods=['GET'])
+async def health():
+    try:
+        response = await user_service.get('/health')
+        if response.is_error:
+            return jsonify({'error': 'User service unavailable'}), 503
+        return jsonify(response.json()), response.status_code
+    except UNAVAILABLE:
+        return jsonify({'error': 'User service unavailable'}), 503
@@ -0,0 +1,131 @@
+"""
+Load test of the WSGI (app.py) and ASGI (asgi_app.py) gateways at BENCH_CONNECTIONS concurrent
+keep-alive connections. Each connection requests BENCH_PATH in a loop until BENCH_REQUESTS are done
+in total; prints throughput, latency percentiles and errors by status or exception for every URL in
+GATEWAY_URLS. A client that cannot keep up leaves connections idle past the default 5s keep-alive,
+and the servers then drop them, so the commands below raise it.
+
+To compare the gateways themselves, serve them fake backends answering after BENCH_BACKEND_DELAY_MS.
+Without Kafka the gateways confirm the token with the fake user_service's /user-info once per worker:
+
+    python api_gateway/benchmarks/bench_gateway_load.py backends        # gRPC on :50061, HTTP on :50062
+    cd api_gateway && export POST_SERVICE_HOST=127.0.0.1 POST_SERVICE_PORT=50061 \\
+        STATISTIC_SERVICE_HOST=127.0.0.1 STATISTIC_SERVICE_PORT=50061 USER_SERVICE_URL=http://127.0.0.1:50062
+    GUNICORN_KEEPALIVE_SECONDS=75 gunicorn -c gunicorn.conf.py app:app  # WSGI on :8080
+    hypercorn asgi_app:app --bind 0.0.0.0:8081 --keep-alive 75          # ASGI on :8081
+    ulimit -n 4096 && GATEWAY_URLS=http://localhost:8080,http://localhost:8081 \\
+        python api_gateway/benchmarks/bench_gateway_load.py
+"""
+import asyncio
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent import futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import grpc
+import httpx
+import jwt
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from proto import post_pb2, post_pb2_grpc, statistic_pb2, statistic_pb2_grpc
+
+GATEWAY_URLS = os.getenv("GATEWAY_URLS", "http://localhost:8080,http://localhost:8081").split(',')
+CONNECTIONS = int(os.getenv("BENCH_CONNECTIONS", "1000"))
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "20000"))
+PATH = os.getenv("BENCH_PATH", "/api/v1/posts/1/stats")
+USER_ID = os.getenv("BENCH_USER_ID", "bench_user")
+JWT_SECRET = os.getenv("JWT_SECRET", "12345678")
+BACKEND_PORT = int(os.getenv("BENCH_BACKEND_PORT", "50061"))
+USER_SERVICE_PORT = int(os.getenv("BENCH_USER_SERVICE_PORT", "50062"))
+BACKEND_DELAY = int(os.getenv("BENCH_BACKEND_DELAY_MS", "20")) / 1000
+
+
+class FakePostService(post_pb2_grpc.PostServiceServicer):
+    def BatchGetPosts(self, request, context):
+        time.sleep(BACKEND_DELAY)
+        return post_pb2.BatchGetPostsResponse(posts=[post_pb2.Post(post_id=pid, creator_id=USER_ID)
+                                                     for pid in request.post_ids])
+
+
+class FakeStatisticService(statistic_pb2_grpc.StatisticServiceServicer):
+    def GetPostStats(self, request, context):
+        time.sleep(BACKEND_DELAY)
+        return statistic_pb2.PostStatsResponse(views_count=100, likes_count=50, comments_count=30)
+
+
+class FakeUserService(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({'user_id': USER_ID}).encode()
+        self.send_response(200 if self.path == '/user-info' else 404)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_backends():
+    user_service = ThreadingHTTPServer(('', USER_SERVICE_PORT), FakeUserService)
+    threading.Thread(target=user_service.serve_forever, daemon=True).start()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=256),
+                         options=[('grpc.keepalive_permit_without_calls', 1),
+                                  ('grpc.http2.min_ping_interval_without_data_ms', 10000)])
+    post_pb2_grpc.add_PostServiceServicer_to_server(FakePostService(), server)
+    statistic_pb2_grpc.add_StatisticServiceServicer_to_server(FakeStatisticService(), server)
+    server.add_insecure_port(f'[::]:{BACKEND_PORT}')
+    server.start()
+    print(f"Fake post/statistic services on :{BACKEND_PORT}, {BACKEND_DELAY * 1000:.0f}ms per call, "
+          f"user_service on :{USER_SERVICE_PORT}")
+    server.wait_for_termination()
+
+
+async def load(base_url: str, token: str):
+    latencies, errors = [], Counter()
+    remaining = REQUESTS
+
+    async def connection(client: httpx.AsyncClient):
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await client.get(PATH)
+                if response.status_code != 200:
+                    errors[response.status_code] += 1
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    limits = httpx.Limits(max_connections=CONNECTIONS, max_keepalive_connections=CONNECTIONS)
+    async with httpx.AsyncClient(base_url=base_url, headers={'Authorization': token}, limits=limits,
+                                 timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(connection(client) for _ in range(CONNECTIONS)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"{base_url}: {len(latencies) / elapsed:.0f} req/s, p50={latencies[len(latencies) // 2]:.1f}ms "
+          f"p99={latencies[int(len(latencies) * 0.99)]:.1f}ms max={latencies[-1]:.1f}ms errors={dict(errors) or 0}")
+
+
+def main():
+    token = jwt.encode({'user_id': USER_ID, 'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)},
+                       JWT_SECRET, algorithm='HS256')
+    print(f"{CONNECTIONS} connections, {REQUESTS} requests of {PATH}")
+    for url in GATEWAY_URLS:
+        asyncio.run(load(url, token))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ['backends']:
+        serve_backends()
+    else:
+        main()
@@ -0,0 +1,11 @@
+import os
+
+GATEWAY_CONFIG = {
+    'USER_SERVICE_URL': os.getenv('USER_SERVICE_URL', 'http://user_service:5000'),
+    'POST_SERVICE_HOST': os.getenv('POST_SERVICE_HOST', 'post_service'),
+    'POST_SERVICE_PORT': os.getenv('POST_SERVICE_PORT', '50051'),
+    'STATISTIC_SERVICE_HOST': os.getenv('STATISTIC_SERVICE_HOST', 'statistic_service'),
+    'STATISTIC_SERVICE_PORT': os.getenv('STATISTIC_SERVICE_PORT', '50052'),
+    'JWT_SECRET': '12345678',
+    'JSON_SORT_KEYS': False,
+}
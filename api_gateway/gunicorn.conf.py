@@ -0,0 +1,25 @@
+"""
+gunicorn settings of the API gateway, all overridable from the environment:
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Requests mostly wait on user_service and gRPC, so each worker process serves them from a pool of
+threads. gRPC channels, the user_service session and the revocation listener are created lazily,
+after the fork, so every worker gets its own; the app is not preloaded in the master for that reason.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+workers = int(os.getenv("GUNICORN_WORKERS", str(os.cpu_count() or 1)))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "16"))
+backlog = int(os.getenv("GUNICORN_BACKLOG", "2048"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE_SECONDS", "5"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT_SECONDS", "30"))
+# SIGTERM stops accepting connections and lets in-flight requests finish for this long
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT_SECONDS", "30"))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+preload_app = False
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
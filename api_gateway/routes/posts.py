@@ -2,15 +2,19 @@ import grpc
 import json
 from datetime import datetime
 from collections import OrderedDict
-from flask import Blueprint, request, jsonify, current_app, g, Response
+from flask import Blueprint, request, jsonify, current_app, Response
 from functools import wraps
 from utils.auth import token_required
+from utils.grpc_channels import channels
+from utils.grpc_errors import grpc_error_response
 from utils.schemas import (
     PostCreate,
     PostUpdate,
     PostResponse,
     MetaResponse,
+    CursorMetaResponse,
     ListQuery,
+    CursorListQuery,
     validate_post_id,
     simplify_validation_errors,
     InvalidPostID,
@@ -23,27 +27,8 @@ posts_bp = Blueprint('posts', __name__)
 
 
 def get_grpc_stub():
-    if "grpc_stub" not in g:
-        channel = grpc.insecure_channel(
-            f"{current_app.config['POST_SERVICE_HOST']}:{current_app.config['POST_SERVICE_PORT']}"
-        )
-        g.grpc_stub = post_pb2_grpc.PostServiceStub(channel)
-    return g.grpc_stub
-
-
-def handle_grpc_error(error: grpc.RpcError):
-    error_message = error.details()
-    if error.code() == grpc.StatusCode.OUT_OF_RANGE:
-        return jsonify({"message": error_message}), 400
-    error_map = {
-        grpc.StatusCode.NOT_FOUND: (404, error_message),
-        grpc.StatusCode.PERMISSION_DENIED: (403, error_message),
-        grpc.StatusCode.INVALID_ARGUMENT: (400, error_message),
-        grpc.StatusCode.UNAUTHENTICATED: (401, error_message),
-        grpc.StatusCode.INTERNAL: (500, "Internal server error")
-    }
-    status_code, message = error_map.get(error.code(), (500, "Internal server error"))
-    return jsonify({"message": message}), status_code
+    return channels.stub(post_pb2_grpc.PostServiceStub,
+                         current_app.config['POST_SERVICE_HOST'], current_app.config['POST_SERVICE_PORT'])
 
 
 @posts_bp.errorhandler(InvalidPostID)
@@ -61,7 +46,8 @@ def handle_errors(f):
         except InvalidPostID as e:
             return jsonify({"message": str(e)}), 400
         except grpc.RpcError as e:
-            return handle_grpc_error(e)
+            body, status_code = grpc_error_response(e)
+            return jsonify(body), status_code
         except Exception:
             return jsonify({"message": "Internal server error"}), 500
     return wrapper
@@ -167,6 +153,9 @@ def delete_post(user_id: str, post_id: str):
 @token_required
 @handle_errors
 def list_posts(user_id: str):
+    if 'cursor' in request.args:
+        return list_posts_by_cursor(user_id)
+
     query = ListQuery(
         page=request.args.get('page', 1, type=int),
         per_page=request.args.get('per_page', 10, type=int)
@@ -188,6 +177,35 @@ def list_posts(user_id: str):
         to_=response.to_
     ).dict(by_alias=True)
 
+    return posts_list_response(response.posts, meta)
+
+
+def list_posts_by_cursor(user_id: str):
+    query = CursorListQuery(
+        cursor=request.args.get('cursor', ''),
+        per_page=request.args.get('per_page', 10, type=int),
+        include_total=request.args.get('include_total', 'false').lower() == 'true'
+    )
+    stub = get_grpc_stub()
+    grpc_request = post_pb2.ListPostsRequest(
+        user_id=user_id,
+        per_page=query.per_page,
+        cursor=query.cursor,
+        use_cursor=True,
+        include_total=query.include_total
+    )
+    response = stub.ListPosts(grpc_request)
+
+    meta = CursorMetaResponse(
+        per_page=response.per_page,
+        next_cursor=response.next_cursor or None,
+        total=response.total if query.include_total else None
+    ).dict()
+
+    return posts_list_response(response.posts, meta)
+
+
+def posts_list_response(grpc_posts, meta):
     posts = [
         PostResponse(
             post_id=int(post.post_id),
@@ -199,7 +217,7 @@ def list_posts(user_id: str):
             is_private=post.is_private,
             tags=list(post.tags)
         ).dict()
-        for post in response.posts
+        for post in grpc_posts
     ]
 
     return Response(
@@ -1,17 +1,23 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 import requests
 import json
 
+try:
+    from utils.auth import token_cache
+    from utils.user_service_client import user_service, forwarded_headers
+except ImportError:
+    from ..utils.auth import token_cache
+    from ..utils.user_service_client import user_service, forwarded_headers
+
 users_bp = Blueprint('users', __name__)
 
 
 @users_bp.route('/register', methods=['POST'])
 def register():
     try:
-        response = requests.post(
-            f"{current_app.config['USER_SERVICE_URL']}/register",
-            json=request.json,
-            timeout=5
+        response = user_service.post(
+            '/register',
+            json=request.json
         )
         response_data = response.json()
         return jsonify({
@@ -35,10 +41,9 @@ def register():
 @users_bp.route('/login', methods=['POST'])
 def login():
     try:
-        response = requests.post(
-            f"{current_app.config['USER_SERVICE_URL']}/login",
-            json=request.json,
-            timeout=5
+        response = user_service.post(
+            '/login',
+            json=request.json
         )
         return jsonify(response.json()), response.status_code
     except requests.exceptions.HTTPError as e:
@@ -50,10 +55,9 @@ def login():
 @users_bp.route('/profile', methods=['GET'])
 def get_profile():
     try:
-        response = requests.get(
-            f"{current_app.config['USER_SERVICE_URL']}/profile",
-            headers=request.headers,
-            timeout=5
+        response = user_service.get(
+            '/profile',
+            headers=forwarded_headers(request.headers)
         )
         return jsonify(response.json()), response.status_code
     except requests.exceptions.HTTPError as e:
@@ -65,11 +69,10 @@ def get_profile():
 @users_bp.route('/profile', methods=['PUT'])
 def update_profile():
     try:
-        response = requests.put(
-            f"{current_app.config['USER_SERVICE_URL']}/profile",
-            headers=request.headers,
-            json=request.json,
-            timeout=5
+        response = user_service.put(
+            '/profile',
+            headers=forwarded_headers(request.headers),
+            json=request.json
         )
         response.raise_for_status()
         return jsonify(response.json()), response.status_code
@@ -82,10 +85,9 @@ def update_profile():
 @users_bp.route('/user-info', methods=['GET'])
 def get_user_info():
     try:
-        response = requests.get(
-            f"{current_app.config['USER_SERVICE_URL']}/user-info",
-            headers=request.headers,
-            timeout=5
+        response = user_service.get(
+            '/user-info',
+            headers=forwarded_headers(request.headers)
         )
         response.raise_for_status()
         return jsonify(response.json()), response.status_code
@@ -95,12 +97,26 @@ def get_user_info():
         return jsonify({'message': 'User service unavailable'}), 503
 
 
+@users_bp.route('/logout', methods=['POST'])
+def logout():
+    try:
+        response = user_service.post(
+            '/logout',
+            headers=forwarded_headers(request.headers)
+        )
+        response_data = response.json()
+        if response.status_code == 200:
+            token_cache.revoke(response_data['user_id'], response_data['token_version'])
+        return jsonify({'message': response_data.get('message')}), response.status_code
+    except requests.exceptions.RequestException:
+        return jsonify({'message': 'User service unavailable'}), 503
+
+
 @users_bp.route('/health', methods=['GET'])
 def health():
     try:
-        response = requests.get(
-            f"{current_app.config['USER_SERVICE_URL']}/health",
-            timeout=5
+        response = user_service.get(
+            '/health'
         )
         response.raise_for_status()
         return jsonify(response.json()), response.status_code
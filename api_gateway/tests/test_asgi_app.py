@@ -0,0 +1,239 @@
+import asyncio
+import datetime
+import time
+from concurrent import futures
+
+import grpc
+import jwt
+import pytest
+from quart import Quart
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from proto import post_pb2, post_pb2_grpc, statistic_pb2, statistic_pb2_grpc
+from api_gateway.async_routes import common
+from api_gateway.async_routes.posts import posts_bp as async_posts_bp
+from api_gateway.async_routes.statistics import statistics_bp as async_statistics_bp
+
+# utils.auth or api_gateway.utils.auth, depending on sys.path
+auth_module = sys.modules[common.authenticate.__module__]
+
+SECRET = 'secret'
+CREATOR_ID = 'creator'
+BACKEND_DELAY = 0.2
+
+
+class FakePostService(post_pb2_grpc.PostServiceServicer):
+    def BatchGetPosts(self, request, context):
+        time.sleep(BACKEND_DELAY)
+        if request.post_ids[0] == 'missing':
+            return post_pb2.BatchGetPostsResponse(missing_post_ids=list(request.post_ids))
+        return post_pb2.BatchGetPostsResponse(posts=[post_pb2.Post(post_id=request.post_ids[0], creator_id=CREATOR_ID)])
+
+    def GetPost(self, request, context):
+        return post_pb2.GetPostResponse(post=post_pb2.Post(
+            post_id=request.post_id, title='Title', creator_id=CREATOR_ID, tags=['a', 'b']
+        ))
+
+
+class FakeStatisticService(statistic_pb2_grpc.StatisticServiceServicer):
+    def GetPostStats(self, request, context):
+        time.sleep(BACKEND_DELAY)
+        return statistic_pb2.PostStatsResponse(views_count=100, likes_count=50, comments_count=30)
+
+    def GetPostDynamic(self, request, context):
+        time.sleep(BACKEND_DELAY)
+        return statistic_pb2.PostDynamicResponse(
+            stats=[statistic_pb2.DailyStat(date='2026-10-01', count=5)],
+            dates=['2026-10-01'], views=[5], likes=[2], comments=[1]
+        )
+
+    def StreamPostDynamic(self, request, context):
+        if request.post_id == 'broken':
+            yield statistic_pb2.PostDynamicResponse(stats=[statistic_pb2.DailyStat(date='2026-10-01T00:00:00')])
+            context.abort(grpc.StatusCode.UNAVAILABLE, 'ClickHouse unavailable')
+        for hour in range(3):
+            yield statistic_pb2.PostDynamicResponse(
+                stats=[statistic_pb2.DailyStat(date=f'2026-10-01T0{hour}:00:00', count=hour)],
+                dates=[f'2026-10-01T0{hour}:00:00'], views=[hour], likes=[0], comments=[0]
+            )
+
+    def GetTopPosts(self, request, context):
+        return statistic_pb2.TopPostsResponse(posts=[statistic_pb2.TopPost(post_id='1', count=request.limit)])
+
+
+@pytest.fixture(scope='module')
+def backends():
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=8))
+    post_pb2_grpc.add_PostServiceServicer_to_server(FakePostService(), server)
+    statistic_pb2_grpc.add_StatisticServiceServicer_to_server(FakeStatisticService(), server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    yield port
+    server.stop(0)
+
+
+def configure(app, port):
+    app.config.update({
+        'POST_SERVICE_HOST': '127.0.0.1', 'POST_SERVICE_PORT': port,
+        'STATISTIC_SERVICE_HOST': '127.0.0.1', 'STATISTIC_SERVICE_PORT': port,
+        'JWT_SECRET': SECRET,
+    })
+    return app
+
+
+@pytest.fixture(scope='module')
+def async_app(backends):
+    app = configure(Quart(__name__), backends)
+    app.register_blueprint(async_posts_bp)
+    app.register_blueprint(async_statistics_bp)
+    return app
+
+
+def auth(user_id=CREATOR_ID):
+    token = jwt.encode({'user_id': user_id, 'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)},
+                       SECRET, algorithm='HS256')
+    return {'Authorization': token}
+
+
+@pytest.fixture(scope='module')
+def loop():
+    # grpc.aio channels are bound to a loop, so the whole module shares one like a server would
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.run_until_complete(common.channels.close())
+    loop.close()
+
+
+@pytest.fixture(scope='module', autouse=True)
+def revocations_loaded():
+    auth_module.token_cache.revocations_loaded.set()
+    yield
+    auth_module.token_cache.revocations_loaded.clear()
+
+
+@pytest.fixture(scope='module')
+def async_get(async_app, loop):
+    def get(path, headers):
+        async def run():
+            response = await async_app.test_client().get(path, headers=headers)
+            return response.status_code, await response.get_data(as_text=True)
+        return loop.run_until_complete(run())
+    return get
+
+
+# Bodies returned by the WSGI routes for the same backend answers
+@pytest.mark.parametrize('path, status, body', [
+    ('/posts/1/stats', 200, '{"views_count": 100, "likes_count": 50, "comments_count": 30}'),
+    ('/posts/missing/stats', 404, '{"message":"Post not found"}\n'),
+    ('/posts/1/dynamic', 200, '[{"date": "2026-10-01", "count": 5}]'),
+    ('/posts/1/dynamic?granularity=hour', 200,
+     '[{"date": "2026-10-01T00:00:00", "count": 0}, {"date": "2026-10-01T01:00:00", "count": 1}, '
+     '{"date": "2026-10-01T02:00:00", "count": 2}]'),
+    ('/posts/1/dynamic?format=columns', 200,
+     '{"dates": ["2026-10-01"], "views": [5], "likes": [2], "comments": [1]}'),
+    ('/posts/1/dynamic?granularity=hour&format=columns', 200,
+     '{"dates": ["2026-10-01T00:00:00", "2026-10-01T01:00:00", "2026-10-01T02:00:00"], '
+     '"views": [0, 1, 2], "likes": [0, 0, 0], "comments": [0, 0, 0]}'),
+    ('/posts/1/dynamic?metric=shares', 400, '{"message":"Invalid metric"}\n'),
+    ('/posts/missing/dynamic?metric=shares', 404, '{"message":"Post not found"}\n'),
+    ('/posts/top?limit=7&window=day', 200, '[{"post_id": "1", "count": 7}]'),
+    ('/posts/top?window=year', 400, '{"message":"Invalid window"}\n'),
+])
+def test_same_responses_as_wsgi_routes(async_get, path, status, body):
+    assert async_get(path, auth()) == (status, body)
+
+
+def test_dynamic_of_another_creator_is_forbidden(async_get):
+    status, _ = async_get('/posts/1/dynamic', auth('someone_else'))
+
+    assert status == 403
+
+
+def test_post_lookup_and_stats_run_concurrently(async_get):
+    started = time.perf_counter()
+    status, body = async_get('/posts/1/stats', auth())
+
+    assert status == 200
+    assert time.perf_counter() - started < BACKEND_DELAY * 1.8
+
+
+def test_get_post(async_get):
+    status, body = async_get('/posts/5', auth())
+
+    assert status == 200
+    assert body.startswith('{"post_id": 5, "title": "Title"')
+
+
+def test_stream_failing_after_first_chunk_is_an_error(async_get):
+    # FakePostService reports every post as visible to its creator
+    assert async_get('/posts/broken/dynamic?granularity=hour', auth()) == (503, '{"message":"Service unavailable"}\n')
+
+
+def test_missing_token(async_get):
+    assert async_get('/posts/5', {})[0] == 401
+
+
+@pytest.fixture
+def revocations_not_loaded(monkeypatch):
+    monkeypatch.setattr(auth_module.token_cache, 'load_timeout', 0)
+    auth_module.token_cache.revocations_loaded.clear()
+    yield
+    auth_module.token_cache.revocations_loaded.set()
+
+
+def test_unseen_token_is_checked_by_user_service_until_revocations_are_loaded(async_get, monkeypatch,
+                                                                               revocations_not_loaded):
+    answers = {'active': 200, 'deleted': 404, 'unreachable': None}
+
+    async def fetch_user_info_status(token):
+        return answers[jwt.decode(token, SECRET, algorithms=['HS256'])['user_id']]
+
+    monkeypatch.setattr(common, 'fetch_user_info_status', fetch_user_info_status)
+    active = auth('active')
+    assert async_get('/posts/5', active)[0] == 200
+    assert async_get('/posts/5', auth('deleted')) == (401, '{"error":"Invalid token"}\n')
+    assert async_get('/posts/5', auth('unreachable')) == (503, '{"error":"Service unavailable"}\n')
+    # Confirmed tokens are cached like locally verified ones
+    del answers['active']
+    assert async_get('/posts/5', active)[0] == 200
+
+
+def test_concurrent_misses_of_a_token_share_one_user_service_call(async_app, loop, monkeypatch,
+                                                                   revocations_not_loaded):
+    calls = []
+
+    async def fetch_user_info_status(token):
+        calls.append(token)
+        await asyncio.sleep(0.1)
+        return 200
+
+    async def run():
+        headers = auth('burst')
+        responses = await asyncio.gather(*(async_app.test_client().get('/posts/5', headers=headers)
+                                           for _ in range(10)))
+        return [response.status_code for response in responses]
+
+    monkeypatch.setattr(common, 'fetch_user_info_status', fetch_user_info_status)
+    assert loop.run_until_complete(run()) == [200] * 10
+    assert len(calls) == 1
+    assert common.user_info_calls == {}
+
+
+def test_channels_follow_the_running_loop(backends):
+    async def call():
+        return await common.get_statistic_stub().GetPostStats(statistic_pb2.PostStatsRequest(post_id='1'))
+
+    async def in_app():
+        async with configure(Quart(__name__), backends).app_context():
+            return await call()
+
+    # Each asyncio.run is a new loop; channels of the finished one must not be reused
+    registry, common.channels = common.channels, common.AsyncChannelRegistry()
+    try:
+        assert asyncio.run(in_app()).views_count == 100
+        assert asyncio.run(in_app()).views_count == 100
+    finally:
+        common.channels = registry
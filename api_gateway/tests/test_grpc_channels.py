@@ -0,0 +1,150 @@
+import time
+from concurrent import futures
+
+import grpc
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api_gateway.utils.grpc_channels import ChannelRegistry, DeadlineInterceptor
+
+
+def _echo(request, context):
+    return request
+
+
+def _slow(request, context):
+    time.sleep(float(request.decode()))
+    return request
+
+
+def _peer(request, context):
+    return context.peer().encode()
+
+
+def _stream(request, context):
+    for _ in range(3):
+        yield request
+
+
+class EchoStub:
+    def __init__(self, channel):
+        self.Echo = channel.unary_unary('/test.Test/Echo')
+        self.Slow = channel.unary_unary('/test.Test/Slow')
+        self.Stream = channel.unary_stream('/test.Test/Stream')
+        self.Peer = channel.unary_unary('/test.Test/Peer')
+
+
+@pytest.fixture
+def server():
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler('test.Test', {
+        'Echo': grpc.unary_unary_rpc_method_handler(_echo),
+        'Slow': grpc.unary_unary_rpc_method_handler(_slow),
+        'Stream': grpc.unary_stream_rpc_method_handler(_stream),
+        'Peer': grpc.unary_unary_rpc_method_handler(_peer),
+    }),))
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    yield port
+    server.stop(0)
+
+
+@pytest.fixture
+def registry():
+    registry = ChannelRegistry(deadline=0.5, stream_deadline=5)
+    yield registry
+    registry.close()
+
+
+def test_stub_is_reused_between_calls(server, registry):
+    stub = registry.stub(EchoStub, '127.0.0.1', server)
+
+    assert registry.stub(EchoStub, '127.0.0.1', str(server)) is stub
+    assert stub.Echo(b'ping') == b'ping'
+    assert list(stub.Stream(b'x')) == [b'x'] * 3
+    assert list(registry.metrics()) == [f'127.0.0.1:{server}']
+    assert registry.metrics()[f'127.0.0.1:{server}']['resets'] == 0
+
+
+def test_default_deadline_applies_without_timeout(server, registry):
+    stub = registry.stub(EchoStub, '127.0.0.1', server)
+
+    with pytest.raises(grpc.RpcError) as error:
+        stub.Slow(b'2')
+    assert error.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+
+    assert stub.Slow(b'0.7', timeout=2) == b'0.7'
+
+
+def test_explicit_timeout_is_kept():
+    interceptor = DeadlineInterceptor(unary_timeout=5, stream_timeout=60)
+    seen = []
+
+    class Details:
+        method, metadata, credentials, wait_for_ready, compression = '/test.Test/Echo', None, None, None, None
+
+        def __init__(self, timeout):
+            self.timeout = timeout
+
+    def continuation(details, request):
+        seen.append(details.timeout)
+
+    interceptor.intercept_unary_unary(continuation, Details(None), b'')
+    interceptor.intercept_unary_stream(continuation, Details(None), b'')
+    interceptor.intercept_unary_unary(continuation, Details(1.5), b'')
+
+    assert seen == [5, 60, 1.5]
+
+
+def test_targets_for_replicas():
+    assert ChannelRegistry().targets('post_service', '50051') == ['post_service:50051']
+    assert ChannelRegistry().targets('post_1, post_2:50061', 50051) == ['post_1:50051', 'post_2:50061']
+    assert ChannelRegistry(lb_policy='round_robin').targets('post_service', 50051) == ['dns:///post_service:50051']
+
+
+def test_round_robin_options():
+    options = dict(ChannelRegistry(lb_policy='round_robin').options)
+
+    assert 'round_robin' in options['grpc.service_config']
+    assert 'grpc.service_config' not in dict(ChannelRegistry().options)
+    assert options['grpc.keepalive_time_ms'] > 0
+
+
+def test_failing_replica_is_skipped_and_reset(server):
+    registry = ChannelRegistry(reset_after=60)
+    pool_stub = registry.stub(EchoStub, f'127.0.0.1:{server},127.0.0.1:1', 0)
+    pool = next(iter(registry._pools.values()))
+    healthy, failing = pool._replicas
+    grpc.channel_ready_future(failing.channel)
+    for _ in range(50):
+        if failing.failing_since is not None:
+            break
+        time.sleep(0.1)
+    assert failing.state is grpc.ChannelConnectivity.TRANSIENT_FAILURE
+
+    picked = {id(registry.stub(EchoStub, f'127.0.0.1:{server},127.0.0.1:1', 0)) for _ in range(4)}
+    assert picked == {id(healthy.stubs[EchoStub])}
+    assert pool_stub.Echo(b'ping') == b'ping'
+
+    pool.reset_after = 0
+    stubs = [registry.stub(EchoStub, f'127.0.0.1:{server},127.0.0.1:1', 0) for _ in range(2)]
+    assert pool._replicas[1] is not failing
+    assert pool.metrics()['resets'] == 1
+    assert len({id(stub) for stub in stubs}) == 2
+    registry.close()
+
+
+def test_channels_per_target_open_separate_connections(server):
+    registry = ChannelRegistry(channels_per_target=3)
+    try:
+        peers = {registry.stub(EchoStub, '127.0.0.1', server).Peer(b'') for _ in range(6)}
+
+        assert len(peers) == 3
+        assert list(registry.metrics()[f'127.0.0.1:{server}']['replicas']) == [
+            f'127.0.0.1:{server}#0', f'127.0.0.1:{server}#1', f'127.0.0.1:{server}#2'
+        ]
+    finally:
+        registry.close()
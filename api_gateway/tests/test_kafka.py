@@ -1,9 +1,9 @@
 import pytest
-import json
 from confluent_kafka import Consumer, KafkaException
 import time
 from datetime import datetime
 import requests
+from broker.event_codec import decode_event
 
 
 @pytest.fixture(scope="module")
@@ -47,7 +47,7 @@ def test_user_registration_event(kafka_consumer, test_user):
         if msg.error():
             raise KafkaException(msg.error())
 
-        event = json.loads(msg.value())
+        event = decode_event(msg.value(), msg.headers())
         if event.get("email") == test_user["email"]:
             assert event['event_type'] == 'user_registration'
             assert 'user_id' in event
@@ -95,7 +95,7 @@ def test_post_view_event(kafka_consumer, test_user):
         if msg.error():
             raise KafkaException(msg.error())
 
-        event = json.loads(msg.value())
+        event = decode_event(msg.value(), msg.headers())
         if event.get("post_id") == str(post_id):
             assert event['event_type'] == 'post_viewed'
             assert 'user_id' in event
@@ -144,7 +144,7 @@ def test_post_like_event(kafka_consumer, test_user):
         if msg.error():
             raise KafkaException(msg.error())
 
-        event = json.loads(msg.value())
+        event = decode_event(msg.value(), msg.headers())
         if event.get("post_id") == str(post_id):
             assert event['event_type'] == 'post_liked'
             assert 'user_id' in event
@@ -197,7 +197,7 @@ def test_post_comment_event(kafka_consumer, test_user):
         if msg.error():
             raise KafkaException(msg.error())
 
-        event = json.loads(msg.value())
+        event = decode_event(msg.value(), msg.headers())
         if event.get("post_id") == str(post_id) and event.get("comment_id") == str(comment_id):
             assert event['event_type'] == 'post_commented'
             assert 'user_id' in event
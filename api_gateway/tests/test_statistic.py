@@ -1,7 +1,6 @@
-from functools import wraps
 import pytest
-from unittest.mock import Mock, patch
-from flask import Flask, request, jsonify
+from unittest.mock import patch
+from flask import Flask
 import json
 import grpc
 import sys
@@ -10,20 +9,21 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 
-def mock_token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'message': 'Token is missing'}), 401
-        return f(TEST_USER_ID, *args, **kwargs)
+from api_gateway.routes.statistics import statistics_bp, get_statistic_stub, token_required
+from proto import statistic_pb2, post_pb2
 
-    return decorated
 
-
-with patch('api_gateway.utils.auth.token_required', mock_token_required):
-    from api_gateway.routes.statistics import statistics_bp, get_statistic_stub
-    from proto import statistic_pb2, post_pb2
+@pytest.fixture(autouse=True)
+def authenticated():
+    """
+    The routes keep the real token_required, from utils.auth or api_gateway.utils.auth depending on
+    sys.path; its token cache accepts TEST_TOKEN and the revocation listener is not started.
+    """
+    auth = sys.modules[token_required.__module__]
+    with patch.object(auth.token_cache, 'verify',
+                      side_effect=lambda token, secret: TEST_USER_ID if token == TEST_TOKEN else None), \
+            patch.object(auth.revocations, 'start'):
+        yield
 
 
 @pytest.fixture
@@ -35,6 +35,7 @@ def app():
     app.config['POST_SERVICE_HOST'] = 'localhost'
     app.config['POST_SERVICE_PORT'] = '50051'
     app.config['USER_SERVICE_URL'] = 'http://user-service'
+    app.config['JWT_SECRET'] = 'test_secret'
     app.register_blueprint(statistics_bp)
     return app
 
@@ -60,10 +61,10 @@ def mock_services():
 def test_get_post_stats_success(client, mock_services):
     mock_post_stub, mock_stat_stub = mock_services
 
-    mock_post_response = Mock()
-    mock_post_response.post = Mock()
-    mock_post_response.post.creator_id = TEST_USER_ID
-    mock_post_stub.return_value.GetPost.return_value = mock_post_response
+    mock_post_response = post_pb2.BatchGetPostsResponse(
+        posts=[post_pb2.Post(post_id=TEST_POST_ID, creator_id=TEST_USER_ID)]
+    )
+    mock_post_stub.return_value.BatchGetPosts.return_value = mock_post_response
 
     mock_stat_response = statistic_pb2.PostStatsResponse(
         views_count=100,
@@ -91,7 +92,7 @@ def test_get_post_stats_not_found(client, mock_services):
     rpc_error.code = lambda: grpc.StatusCode.NOT_FOUND
     rpc_error.details = lambda: "Post not found"
 
-    mock_post_stub.return_value.GetPost.side_effect = rpc_error
+    mock_post_stub.return_value.BatchGetPosts.side_effect = rpc_error
 
     response = client.get(
         f'/posts/{TEST_POST_ID}/stats',
@@ -108,10 +109,10 @@ def test_get_post_stats_not_found(client, mock_services):
 def test_get_post_dynamic_success(client, mock_services):
     mock_post_stub, mock_stat_stub = mock_services
 
-    mock_post_response = Mock()
-    mock_post_response.post = Mock()
-    mock_post_response.post.creator_id = TEST_USER_ID
-    mock_post_stub.return_value.GetPost.return_value = mock_post_response
+    mock_post_response = post_pb2.BatchGetPostsResponse(
+        posts=[post_pb2.Post(post_id=TEST_POST_ID, creator_id=TEST_USER_ID)]
+    )
+    mock_post_stub.return_value.BatchGetPosts.return_value = mock_post_response
 
     mock_stat_response = statistic_pb2.PostDynamicResponse(
         stats=[
@@ -133,14 +134,87 @@ def test_get_post_dynamic_success(client, mock_services):
     assert data[0]["count"] == 10
 
 
+@pytest.mark.dependency(depends=["test_get_post_dynamic_success"])
+def test_get_post_dynamic_by_minute_is_streamed(client, mock_services):
+    mock_post_stub, mock_stat_stub = mock_services
+    mock_post_stub.return_value.BatchGetPosts.return_value = post_pb2.BatchGetPostsResponse(
+        posts=[post_pb2.Post(post_id=TEST_POST_ID, creator_id=TEST_USER_ID)]
+    )
+    mock_stat_stub.return_value.StreamPostDynamic.return_value = iter([
+        statistic_pb2.PostDynamicResponse(stats=[
+            statistic_pb2.DailyStat(date="2025-05-20T10:00:00", count=3),
+            statistic_pb2.DailyStat(date="2025-05-20T10:01:00", count=0)
+        ]),
+        statistic_pb2.PostDynamicResponse(stats=[statistic_pb2.DailyStat(date="2025-05-20T10:02:00", count=1)])
+    ])
+
+    response = client.get(
+        f'/posts/{TEST_POST_ID}/dynamic?granularity=minute&from=2025-05-20T10:00:00&to=2025-05-20T10:03:00',
+        headers={'Authorization': TEST_TOKEN}
+    )
+
+    assert response.status_code == 200
+    assert [point["count"] for point in json.loads(response.data)] == [3, 0, 1]
+    sent = mock_stat_stub.return_value.StreamPostDynamic.call_args[0][0]
+    assert sent.granularity == statistic_pb2.PostDynamicRequest.MINUTE
+    assert sent.from_ == "2025-05-20T10:00:00"
+
+
+@pytest.mark.dependency(depends=["test_get_post_dynamic_success"])
+def test_get_post_dynamic_stream_failing_after_first_chunk_is_an_error(client, mock_services):
+    mock_post_stub, mock_stat_stub = mock_services
+    mock_post_stub.return_value.BatchGetPosts.return_value = post_pb2.BatchGetPostsResponse(
+        posts=[post_pb2.Post(post_id=TEST_POST_ID, creator_id=TEST_USER_ID)]
+    )
+    rpc_error = grpc.RpcError()
+    rpc_error.code = lambda: grpc.StatusCode.DEADLINE_EXCEEDED
+    rpc_error.details = lambda: "Deadline Exceeded"
+
+    def chunks():
+        yield statistic_pb2.PostDynamicResponse(stats=[statistic_pb2.DailyStat(date="2025-05-20T10:00:00", count=3)])
+        raise rpc_error
+
+    mock_stat_stub.return_value.StreamPostDynamic.return_value = chunks()
+
+    response = client.get(
+        f'/posts/{TEST_POST_ID}/dynamic?granularity=minute',
+        headers={'Authorization': TEST_TOKEN}
+    )
+
+    assert response.status_code == 504
+    assert json.loads(response.data) == {"message": "Service timeout"}
+
+
+@pytest.mark.dependency(depends=["test_get_post_dynamic_success"])
+def test_get_post_dynamic_all_metrics_as_columns(client, mock_services):
+    mock_post_stub, mock_stat_stub = mock_services
+    mock_post_stub.return_value.BatchGetPosts.return_value = post_pb2.BatchGetPostsResponse(
+        posts=[post_pb2.Post(post_id=TEST_POST_ID, creator_id=TEST_USER_ID)]
+    )
+    mock_stat_stub.return_value.GetPostDynamic.return_value = statistic_pb2.PostDynamicResponse(
+        dates=["2025-05-20", "2025-05-21"], views=[10, 20], likes=[1, 2], comments=[0, 5]
+    )
+
+    response = client.get(
+        f'/posts/{TEST_POST_ID}/dynamic?format=columns',
+        headers={'Authorization': TEST_TOKEN}
+    )
+
+    assert response.status_code == 200
+    assert json.loads(response.data) == {
+        "dates": ["2025-05-20", "2025-05-21"], "views": [10, 20], "likes": [1, 2], "comments": [0, 5]
+    }
+    assert mock_stat_stub.return_value.GetPostDynamic.call_args[0][0].all_metrics is True
+
+
 @pytest.mark.dependency(depends=["test_get_post_dynamic_success"])
 def test_get_post_dynamic_forbidden(client, mock_services):
     mock_post_stub, mock_stat_stub = mock_services
 
-    mock_post_response = Mock()
-    mock_post_response.post = Mock()
-    mock_post_response.post.creator_id = "another_user"
-    mock_post_stub.return_value.GetPost.return_value = mock_post_response
+    mock_post_response = post_pb2.BatchGetPostsResponse(
+        posts=[post_pb2.Post(post_id=TEST_POST_ID, creator_id="another_user")]
+    )
+    mock_post_stub.return_value.BatchGetPosts.return_value = mock_post_response
 
     response = client.get(
         f'/posts/{TEST_POST_ID}/dynamic?metric=views',
@@ -190,6 +264,53 @@ def test_get_top_posts_invalid_metric(client):
     assert data["message"] == "Invalid metric"
 
 
+@pytest.mark.dependency(depends=["test_get_top_posts_success"])
+def test_get_top_posts_limit_and_window(client, mock_services):
+    _, mock_stat_stub = mock_services
+    mock_stat_stub.return_value.GetTopPosts.return_value = statistic_pb2.TopPostsResponse()
+
+    response = client.get(
+        '/posts/top?metric=likes&limit=25&window=day',
+        headers={'Authorization': TEST_TOKEN}
+    )
+
+    assert response.status_code == 200
+    sent = mock_stat_stub.return_value.GetTopPosts.call_args[0][0]
+    assert sent.limit == 25
+    assert sent.window == statistic_pb2.TopPostsRequest.DAY
+
+
+@pytest.mark.dependency(depends=["test_get_top_posts_success"])
+def test_get_top_posts_invalid_window_and_limit(client):
+    for query, message in [('window=month', "Invalid window"),
+                           ('limit=abc', "Invalid limit"),
+                           ('limit=500', "limit must be between 1 and 100"),
+                           ('hours=1000', "hours must be between 0 and 720")]:
+        response = client.get(f'/posts/top?{query}', headers={'Authorization': TEST_TOKEN})
+
+        assert response.status_code == 400
+        assert json.loads(response.data)["message"] == message
+
+
+@pytest.mark.dependency(depends=["test_get_top_posts_success"])
+def test_get_trending_posts(client, mock_services):
+    _, mock_stat_stub = mock_services
+    mock_stat_stub.return_value.GetTrendingPosts.return_value = statistic_pb2.TrendingPostsResponse(
+        posts=[statistic_pb2.TrendingPost(post_id="post3", score=12.3456, count=40)]
+    )
+
+    response = client.get(
+        '/posts/trending?metric=likes&hours=12&half_life=3',
+        headers={'Authorization': TEST_TOKEN}
+    )
+
+    assert response.status_code == 200
+    assert json.loads(response.data) == [{"post_id": "post3", "score": 12.346, "count": 40}]
+    sent = mock_stat_stub.return_value.GetTrendingPosts.call_args[0][0]
+    assert sent.window_hours == 12
+    assert sent.half_life_hours == 3
+
+
 @pytest.mark.dependency()
 def test_get_top_users_success(client, mock_services):
     _, mock_stat_stub = mock_services
@@ -232,8 +353,7 @@ def test_get_post_stats_unauthorized(client):
     response = client.get(f'/posts/{TEST_POST_ID}/stats')
     assert response.status_code == 401
     data = json.loads(response.data)
-    assert "message" in data
-    assert data["message"] == "Token is missing"
+    assert data["error"] == "Token is missing or invalid"
 
 
 @pytest.mark.dependency(depends=["test_get_post_dynamic_success"])
@@ -241,8 +361,7 @@ def test_get_post_dynamic_unauthorized(client):
     response = client.get(f'/posts/{TEST_POST_ID}/dynamic')
     assert response.status_code == 401
     data = json.loads(response.data)
-    assert "message" in data
-    assert data["message"] == "Token is missing"
+    assert data["error"] == "Token is missing or invalid"
 
 
 @pytest.mark.dependency(depends=["test_get_top_posts_success"])
@@ -250,8 +369,7 @@ def test_get_top_posts_unauthorized(client):
     response = client.get('/posts/top')
     assert response.status_code == 401
     data = json.loads(response.data)
-    assert "message" in data
-    assert data["message"] == "Token is missing"
+    assert data["error"] == "Token is missing or invalid"
 
 
 @pytest.mark.dependency(depends=["test_get_top_users_success"])
@@ -259,15 +377,14 @@ def test_get_top_users_unauthorized(client):
     response = client.get('/users/top')
     assert response.status_code == 401
     data = json.loads(response.data)
-    assert "message" in data
-    assert data["message"] == "Token is missing"
+    assert data["error"] == "Token is missing or invalid"
 
 
 @pytest.mark.dependency(depends=["test_get_post_stats_success"])
 def test_get_post_stats_internal_error(client, mock_services):
     mock_post_stub, _ = mock_services
 
-    mock_post_stub.return_value.GetPost.side_effect = Exception("Internal error")
+    mock_post_stub.return_value.BatchGetPosts.side_effect = Exception("Internal error")
 
     response = client.get(
         f'/posts/{TEST_POST_ID}/stats',
@@ -284,7 +401,7 @@ def test_get_post_stats_internal_error(client, mock_services):
 def test_get_post_dynamic_internal_error(client, mock_services):
     mock_post_stub, _ = mock_services
 
-    mock_post_stub.return_value.GetPost.side_effect = Exception("Internal error")
+    mock_post_stub.return_value.BatchGetPosts.side_effect = Exception("Internal error")
 
     response = client.get(
         f'/posts/{TEST_POST_ID}/dynamic',
@@ -0,0 +1,210 @@
+import datetime
+import json
+import time
+
+import jwt
+import pytest
+import sys
+import os
+from confluent_kafka import TopicPartition
+from concurrent import futures
+from unittest.mock import Mock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api_gateway.utils import auth, token_cache
+from api_gateway.utils.token_cache import TokenCache, RevocationListener, RevocationsNotLoaded
+
+SECRET = 'secret'
+
+
+def make_token(user_id='u1', version=None, expires_in=3600):
+    payload = {'user_id': user_id, 'exp': datetime.datetime.utcnow() + datetime.timedelta(seconds=expires_in)}
+    if version is not None:
+        payload['ver'] = version
+    return jwt.encode(payload, SECRET, algorithm='HS256')
+
+
+def test_verified_token_is_cached():
+    cache = TokenCache(ttl=60)
+    token = make_token()
+
+    assert cache.verify(token, SECRET) == 'u1'
+    assert cache.verify(token, SECRET) == 'u1'
+    assert cache.metrics() == {'entries': 1, 'hits': 1, 'misses': 1, 'rejected': 0, 'revocations': 0, 'unconfirmed': 0}
+
+
+def test_invalid_and_expired_tokens_are_rejected():
+    cache = TokenCache()
+
+    assert cache.verify('garbage', SECRET) is None
+    assert cache.verify(make_token(expires_in=-10), SECRET) is None
+    assert cache.verify(jwt.encode({'user_id': 'u1'}, 'other', algorithm='HS256'), SECRET) is None
+    assert cache.metrics()['rejected'] == 3
+    assert cache.metrics()['entries'] == 0
+
+
+def test_entry_does_not_outlive_token_exp():
+    cache = TokenCache(ttl=60)
+    token = make_token(expires_in=1)
+
+    assert cache.verify(token, SECRET) == 'u1'
+    time.sleep(1.1)
+    assert cache.verify(token, SECRET) is None
+
+
+def test_least_recently_used_entry_is_dropped():
+    cache = TokenCache(max_entries=2)
+    first, second, third = make_token('u1'), make_token('u2'), make_token('u3')
+    cache.verify(first, SECRET)
+    cache.verify(second, SECRET)
+    cache.verify(first, SECRET)
+    cache.verify(third, SECRET)
+
+    assert cache.metrics()['entries'] == 2
+    cache.verify(first, SECRET)
+    cache.verify(second, SECRET)
+    assert cache.metrics()['hits'] == 2
+
+
+def test_revoked_versions_are_rejected():
+    cache = TokenCache()
+    old, other_user = make_token('u1'), make_token('u2')
+    cache.verify(old, SECRET)
+    cache.verify(other_user, SECRET)
+
+    cache.revoke('u1', 1)
+
+    assert cache.verify(old, SECRET) is None
+    assert cache.verify(other_user, SECRET) == 'u2'
+    assert cache.verify(make_token('u1', version=1), SECRET) == 'u1'
+    cache.revoke('u1', 1)
+    assert cache.metrics()['revocations'] == 1
+
+
+def test_listener_applies_revocation_events():
+    cache = TokenCache()
+    token = make_token('u1', version=2)
+    cache.verify(token, SECRET)
+
+    RevocationListener(cache).apply(json.dumps({
+        'event_type': 'token_revocation', 'user_id': 'u1', 'token_version': 3
+    }).encode())
+
+    assert cache.verify(token, SECRET) is None
+
+
+def revocation(user_id, version):
+    return json.dumps({'event_type': 'token_revocation', 'user_id': user_id, 'token_version': version}).encode()
+
+
+class FakeMessage:
+    def __init__(self, value):
+        self._value = value
+
+    def error(self):
+        return None
+
+    def value(self):
+        return self._value
+
+
+class FakeConsumer:
+    """One partition holding `values`, assigned on the first poll like a fresh consumer group."""
+    values = []
+
+    def __init__(self, config):
+        self._assignment = []
+        self._position = -1001
+
+    def subscribe(self, topics):
+        self.topic = topics[0]
+
+    def assignment(self):
+        return self._assignment
+
+    def get_watermark_offsets(self, partition, timeout=None):
+        return 0, len(self.values)
+
+    def position(self, partitions):
+        return [TopicPartition(self.topic, 0, self._position)]
+
+    def poll(self, timeout):
+        if not self._assignment:
+            self._assignment = [TopicPartition(self.topic, 0)]
+            return None
+        next_offset = max(self._position, 0)
+        if next_offset >= len(self.values):
+            time.sleep(0.01)
+            return None
+        self._position = next_offset + 1
+        return FakeMessage(self.values[next_offset])
+
+    def close(self):
+        pass
+
+
+def test_cache_misses_need_confirmation_until_revocations_are_loaded():
+    cache = TokenCache(wait_for_revocations=True)
+
+    with pytest.raises(RevocationsNotLoaded):
+        cache.verify(make_token(), SECRET)
+    assert cache.verify(make_token(), SECRET, confirmed=True) == 'u1'
+    cache.revocations_loaded.set()
+    assert cache.verify(make_token('u2'), SECRET) == 'u2'
+    assert cache.metrics()['unconfirmed'] == 1
+
+
+def test_waiting_for_revocations_stops_after_the_load_timeout():
+    cache = TokenCache(wait_for_revocations=True, load_timeout=0.1)
+    started = time.monotonic()
+
+    assert not cache.wait_until_loaded()
+    # Measured from the first wait, so later misses go to user_service right away
+    assert not cache.wait_until_loaded()
+    assert time.monotonic() - started < 0.2
+    cache.revocations_loaded.set()
+    assert cache.wait_until_loaded()
+
+
+def test_listener_marks_revocations_loaded_after_reading_to_the_end(monkeypatch):
+    monkeypatch.setattr(FakeConsumer, 'values', [revocation('u1', 1), b'not json', revocation('u2', 2)])
+    cache = TokenCache(wait_for_revocations=True)
+    listener = RevocationListener(cache)
+
+    with patch.object(token_cache, 'Consumer', FakeConsumer):
+        listener.start()
+        assert cache.revocations_loaded.wait(5)
+        # Set only once every event up to the end offset has been applied
+        assert cache.metrics()['revocations'] == 2
+        listener.close()
+
+    assert cache.verify(make_token('u2', version=1), SECRET) is None
+    assert cache.verify(make_token('u2', version=2), SECRET) == 'u2'
+
+
+def test_empty_topic_counts_as_loaded(monkeypatch):
+    monkeypatch.setattr(FakeConsumer, 'values', [])
+    cache = TokenCache(wait_for_revocations=True)
+    listener = RevocationListener(cache)
+
+    with patch.object(token_cache, 'Consumer', FakeConsumer):
+        listener.start()
+        assert cache.revocations_loaded.wait(5)
+        listener.close()
+
+
+def test_concurrent_misses_of_a_token_share_one_user_service_call():
+    calls = []
+
+    def get(path, headers):
+        calls.append(headers['Authorization'])
+        time.sleep(0.1)
+        return Mock(status_code=200)
+
+    with patch.object(auth.user_service, 'get', side_effect=get), futures.ThreadPoolExecutor(10) as pool:
+        statuses = list(pool.map(auth.user_info_status, ['token'] * 10))
+
+    assert statuses == [200] * 10
+    assert calls == ['token']
+    assert auth._user_info_calls == {}
@@ -0,0 +1,127 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api_gateway.utils.user_service_client import (
+    CircuitBreaker, UserServiceClient, UserServiceUnavailable, forwarded_headers
+)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    calls = []
+    statuses = []
+    delay = 0.0
+
+    def _reply(self):
+        Handler.calls.append((self.command, self.path, self.client_address[1], self.headers.get('Host')))
+        if Handler.delay:
+            time.sleep(Handler.delay)
+        status = Handler.statuses.pop(0) if Handler.statuses else 200
+        body = b'{"status": "ok"}'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    Handler.calls, Handler.statuses, Handler.delay = [], [], 0.0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_connection_is_reused(base_url):
+    client = UserServiceClient(base_url)
+
+    for _ in range(3):
+        assert client.get('/health').json() == {'status': 'ok'}
+
+    assert len({port for _, _, port, _ in Handler.calls}) == 1
+    assert client.metrics()['requests'] == 3
+
+
+def test_get_is_retried_on_unavailable_but_post_is_not(base_url):
+    client = UserServiceClient(base_url, retries=2, backoff=0.01)
+
+    Handler.statuses = [503, 503]
+    assert client.get('/user-info').status_code == 200
+    assert len(Handler.calls) == 3
+
+    Handler.calls, Handler.statuses = [], [503]
+    assert client.post('/register', json={}).status_code == 503
+    assert len(Handler.calls) == 1
+
+
+def test_breaker_opens_and_fails_fast(base_url):
+    client = UserServiceClient(base_url, retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.2))
+    Handler.statuses = [500, 500]
+    client.get('/profile')
+    client.get('/profile')
+
+    with pytest.raises(UserServiceUnavailable):
+        client.get('/profile')
+    assert len(Handler.calls) == 2
+    assert client.metrics()['breaker']['state'] == 'open'
+
+    time.sleep(0.25)
+    assert client.get('/profile').status_code == 200
+    assert client.metrics()['breaker'] == {'state': 'closed', 'consecutive_failures': 0, 'opened': 1, 'rejected': 1}
+
+
+def test_failed_trial_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert breaker.metrics()['opened'] == 2
+
+
+def test_timeout_counts_as_failure(base_url):
+    client = UserServiceClient(base_url, retries=0)
+    Handler.delay = 0.3
+
+    with pytest.raises(requests.exceptions.RequestException):
+        client.get('/health', timeout=(1, 0.1))
+    assert client.metrics()['failures'] == 1
+    assert client.metrics()['breaker']['consecutive_failures'] == 1
+
+
+def test_calls_over_max_in_flight_are_rejected(base_url):
+    client = UserServiceClient(base_url, max_in_flight=1)
+    Handler.delay = 0.3
+    slow = threading.Thread(target=client.get, args=('/health',))
+    slow.start()
+    time.sleep(0.1)
+
+    with pytest.raises(UserServiceUnavailable):
+        client.get('/health')
+    slow.join()
+    assert client.metrics()['busy'] == 1
+
+
+def test_only_authorization_is_forwarded():
+    assert forwarded_headers({'Authorization': 't', 'Host': 'gateway', 'Content-Length': '10'}) == {'Authorization': 't'}
+    assert forwarded_headers({'Host': 'gateway'}) == {}
@@ -1,35 +1,93 @@
+import threading
+from concurrent import futures
 from functools import wraps
-from flask import request, jsonify, current_app
+from typing import Dict, Optional
 import requests
+from flask import request, jsonify, current_app
 
+try:
+    from utils.token_cache import TokenCache, RevocationListener, RevocationsNotLoaded
+    from utils.user_service_client import user_service
+except ImportError:
+    from .token_cache import TokenCache, RevocationListener, RevocationsNotLoaded
+    from .user_service_client import user_service
 
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token is missing or invalid'}), 401
+token_cache = TokenCache(wait_for_revocations=True)
+revocations = RevocationListener(token_cache)
 
-        try:
-            response = requests.get(
-                f"{current_app.config['USER_SERVICE_URL']}/user-info",
-                headers={'Authorization': token},
-                timeout=5
-            )
+INVALID_TOKEN = ({'error': 'Invalid token'}, 401)
+# Token -> /user-info call in progress, shared by concurrent misses of the same token
+_user_info_calls: Dict[str, futures.Future] = {}
+_user_info_lock = threading.Lock()
+
+
+def authenticate(token: Optional[str], secret: str):
+    """
+    (user_id, None) for a valid Authorization header, otherwise (None, (body, status)) to answer with.
+    Shared by the Flask and Quart token_required decorators. A token that is not cached while the
+    revocations are still loading raises RevocationsNotLoaded: the decorators wait for them with
+    token_cache.wait_until_loaded, and once that times out ask user_service's /user-info instead
+    and pass its answer to confirm_token.
+    """
+    if not token:
+        return None, ({'error': 'Token is missing or invalid'}, 401)
 
-            if response.status_code != 200:
-                return jsonify({'error': 'Invalid token'}), 401
+    revocations.start()
+    try:
+        user_id = token_cache.verify(token, secret)
+    except RevocationsNotLoaded:
+        raise
+    except Exception:
+        return None, ({'error': 'Internal server error'}, 500)
+    if not user_id:
+        return None, INVALID_TOKEN
+    return user_id, None
 
-            data = response.json()
 
-            if not data.get('user_id'):
-                return jsonify({'error': 'Invalid user info'}), 401
+def confirm_token(token: str, secret: str, user_info_status: Optional[int]):
+    """authenticate's result for a token user_service answered /user-info with this status (None: no answer)."""
+    if user_info_status == 200:
+        user_id = token_cache.verify(token, secret, confirmed=True)
+        return (user_id, None) if user_id else (None, INVALID_TOKEN)
+    if user_info_status in (401, 404):
+        return None, INVALID_TOKEN
+    return None, ({'error': 'Service unavailable'}, 503)
 
-            return f(data['user_id'], *args, **kwargs)
 
+def user_info_status(token: str) -> Optional[int]:
+    with _user_info_lock:
+        call = _user_info_calls.get(token)
+        owner = call is None
+        if owner:
+            call = _user_info_calls[token] = futures.Future()
+    if owner:
+        try:
+            call.set_result(user_service.get('/user-info', headers={'Authorization': token}).status_code)
         except requests.exceptions.RequestException:
-            return jsonify({'error': 'Service unavailable'}), 503
-        except Exception:
-            return jsonify({'error': 'Internal server error'}), 500
+            call.set_result(None)
+        except Exception as e:
+            call.set_exception(e)
+        finally:
+            with _user_info_lock:
+                del _user_info_calls[token]
+    return call.result()
+
+
+def token_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        token, secret = request.headers.get('Authorization'), current_app.config['JWT_SECRET']
+        try:
+            user_id, error = authenticate(token, secret)
+        except RevocationsNotLoaded:
+            if token_cache.wait_until_loaded():
+                user_id, error = authenticate(token, secret)
+            else:
+                user_id, error = confirm_token(token, secret, user_info_status(token))
+        if error:
+            body, status_code = error
+            return jsonify(body), status_code
+
+        return f(user_id, *args, **kwargs)
 
     return decorated
@@ -0,0 +1,302 @@
+import asyncio
+import atexit
+import itertools
+import json
+import os
+import threading
+import time
+from collections import Counter, namedtuple
+from typing import Dict, List, Optional, Tuple
+
+import grpc
+
+DEADLINE_SECONDS = float(os.getenv('GRPC_DEADLINE_SECONDS', '5'))
+STREAM_DEADLINE_SECONDS = float(os.getenv('GRPC_STREAM_DEADLINE_SECONDS', '60'))
+# pick_first or round_robin; round_robin spreads calls over every address a host resolves to
+LB_POLICY = os.getenv('GRPC_LB_POLICY', 'pick_first')
+RESET_AFTER_SECONDS = float(os.getenv('GRPC_RESET_AFTER_SECONDS', '30'))
+# Connections opened to every replica address. A service running several processes on one port
+# (post_service with GRPC_PROCESSES) spreads load over them only connection by connection.
+CHANNELS_PER_TARGET = int(os.getenv('GRPC_CHANNELS_PER_TARGET', '1'))
+
+CHANNEL_OPTIONS = [
+    ('grpc.keepalive_time_ms', int(os.getenv('GRPC_KEEPALIVE_TIME_MS', '30000'))),
+    ('grpc.keepalive_timeout_ms', int(os.getenv('GRPC_KEEPALIVE_TIMEOUT_MS', '10000'))),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.max_pings_without_data', 0),
+    ('grpc.initial_reconnect_backoff_ms', 500),
+    ('grpc.max_reconnect_backoff_ms', 10000),
+    ('grpc.dns_min_time_between_resolutions_ms', 10000),
+]
+
+# Client-side health checking only works with round_robin; servers without the health
+# service answer UNIMPLEMENTED and are treated as healthy
+ROUND_ROBIN_SERVICE_CONFIG = {
+    'loadBalancingConfig': [{'round_robin': {}}],
+    'healthCheckConfig': {'serviceName': ''},
+}
+
+
+def channel_options(options: Optional[list], lb_policy: str, channels_per_target: int = 1) -> list:
+    options = list(CHANNEL_OPTIONS if options is None else options)
+    if lb_policy == 'round_robin':
+        options.append(('grpc.service_config', json.dumps(ROUND_ROBIN_SERVICE_CONFIG)))
+    if channels_per_target > 1:
+        # Channels with equal target and options otherwise share one connection
+        options.append(('grpc.use_local_subchannel_pool', 1))
+    return options
+
+
+def channel_targets(host: str, port, lb_policy: str, channels_per_target: int = 1) -> List[str]:
+    addresses = [h.strip() for h in host.split(',') if h.strip()]
+    addresses = [a if ':' in a else f"{a}:{port}" for a in addresses]
+    if lb_policy == 'round_robin':
+        addresses = [f"dns:///{a}" for a in addresses]
+    return [a for a in addresses for _ in range(channels_per_target)]
+
+
+def replica_names(targets: List[str]) -> List[str]:
+    """Targets as metrics keys; repeated ones are numbered ("post_service:50051#1")."""
+    counts, seen = Counter(targets), Counter()
+    names = []
+    for target in targets:
+        names.append(f"{target}#{seen[target]}" if counts[target] > 1 else target)
+        seen[target] += 1
+    return names
+
+
+class _CallDetails(
+        namedtuple('_CallDetails', ('method', 'timeout', 'metadata', 'credentials', 'wait_for_ready', 'compression')),
+        grpc.ClientCallDetails):
+    pass
+
+
+class DeadlineInterceptor(grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor):
+    """Gives calls made without a timeout a default deadline, longer for server streams."""
+
+    def __init__(self, unary_timeout: float = DEADLINE_SECONDS, stream_timeout: float = STREAM_DEADLINE_SECONDS):
+        self.unary_timeout = unary_timeout
+        self.stream_timeout = stream_timeout
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        return continuation(self._with_timeout(client_call_details, self.unary_timeout), request)
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        return continuation(self._with_timeout(client_call_details, self.stream_timeout), request)
+
+    @staticmethod
+    def _with_timeout(details, timeout: float):
+        if details.timeout is not None:
+            return details
+        return _CallDetails(details.method, timeout, details.metadata, details.credentials,
+                            getattr(details, 'wait_for_ready', None), getattr(details, 'compression', None))
+
+
+class _Replica:
+    def __init__(self, target: str, options: list, interceptor: DeadlineInterceptor):
+        self.target = target
+        self.state = grpc.ChannelConnectivity.IDLE
+        self.failing_since: Optional[float] = None
+        self.stubs = {}
+        self._raw = grpc.insecure_channel(target, options=options)
+        self._raw.subscribe(self._on_state, try_to_connect=False)
+        self.channel = grpc.intercept_channel(self._raw, interceptor)
+
+    def _on_state(self, state: grpc.ChannelConnectivity):
+        if state is grpc.ChannelConnectivity.TRANSIENT_FAILURE:
+            if self.failing_since is None:
+                self.failing_since = time.monotonic()
+        else:
+            self.failing_since = None
+        self.state = state
+
+    def close(self):
+        self._raw.unsubscribe(self._on_state)
+        self._raw.close()
+
+
+class ChannelPool:
+    """
+    Channels to one service, one per replica address, shared by all requests of the process.
+    Calls rotate over replicas that are not in TRANSIENT_FAILURE, and a channel that keeps
+    failing for reset_after seconds is replaced on its next use so its address is resolved again.
+    """
+
+    def __init__(self, targets: List[str], options: list, interceptor: DeadlineInterceptor,
+                 reset_after: float = RESET_AFTER_SECONDS):
+        self.targets = targets
+        self.reset_after = reset_after
+        self._options = options
+        self._interceptor = interceptor
+        self._replicas = [_Replica(target, options, interceptor) for target in targets]
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+        self._resets = 0
+
+    def stub(self, stub_class):
+        replica = self._pick()
+        stub = replica.stubs.get(stub_class)
+        if stub is None:
+            stub = replica.stubs.setdefault(stub_class, stub_class(replica.channel))
+        return stub
+
+    def close(self):
+        with self._lock:
+            for replica in self._replicas:
+                replica.close()
+
+    def metrics(self) -> Dict[str, object]:
+        return {
+            'replicas': {name: replica.state.name.lower()
+                         for name, replica in zip(replica_names(self.targets), self._replicas)},
+            'resets': self._resets,
+        }
+
+    def _pick(self) -> _Replica:
+        start = next(self._next)
+        for i in range(len(self._replicas)):
+            index = (start + i) % len(self._replicas)
+            replica = self._replicas[index]
+            if replica.failing_since is None:
+                return replica
+            if time.monotonic() - replica.failing_since >= self.reset_after:
+                return self._reset(index, replica)
+        return self._replicas[start % len(self._replicas)]
+
+    def _reset(self, index: int, replica: _Replica) -> _Replica:
+        with self._lock:
+            if self._replicas[index] is not replica:
+                return self._replicas[index]
+            fresh = _Replica(replica.target, self._options, self._interceptor)
+            self._replicas[index] = fresh
+            self._resets += 1
+        replica.close()
+        return fresh
+
+
+class ChannelRegistry:
+    """
+    Process-wide gRPC channels keyed by service host and port, created on first use. A host may
+    list several replicas separated by commas ("post_service_1,post_service_2:50061").
+    """
+
+    def __init__(self, options: Optional[list] = None, lb_policy: str = LB_POLICY,
+                 deadline: float = DEADLINE_SECONDS, stream_deadline: float = STREAM_DEADLINE_SECONDS,
+                 reset_after: float = RESET_AFTER_SECONDS, channels_per_target: int = CHANNELS_PER_TARGET):
+        self.options = channel_options(options, lb_policy, channels_per_target)
+        self.lb_policy = lb_policy
+        self.channels_per_target = channels_per_target
+        self.reset_after = reset_after
+        self._interceptor = DeadlineInterceptor(deadline, stream_deadline)
+        self._pools: Dict[Tuple[str, str], ChannelPool] = {}
+        self._lock = threading.Lock()
+
+    def stub(self, stub_class, host: str, port):
+        key = (host, str(port))
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    pool = ChannelPool(self.targets(host, port), self.options, self._interceptor, self.reset_after)
+                    self._pools[key] = pool
+        return pool.stub(stub_class)
+
+    def targets(self, host: str, port) -> List[str]:
+        return channel_targets(host, port, self.lb_policy, self.channels_per_target)
+
+    def close(self):
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.close()
+
+    def metrics(self) -> Dict[str, dict]:
+        return {f"{host}:{port}": pool.metrics() for (host, port), pool in self._pools.items()}
+
+
+class AsyncDeadlineInterceptor(grpc.aio.UnaryUnaryClientInterceptor, grpc.aio.UnaryStreamClientInterceptor):
+    """DeadlineInterceptor for grpc.aio channels."""
+
+    def __init__(self, unary_timeout: float = DEADLINE_SECONDS, stream_timeout: float = STREAM_DEADLINE_SECONDS):
+        self.unary_timeout = unary_timeout
+        self.stream_timeout = stream_timeout
+
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        return await continuation(self._with_timeout(client_call_details, self.unary_timeout), request)
+
+    async def intercept_unary_stream(self, continuation, client_call_details, request):
+        return await continuation(self._with_timeout(client_call_details, self.stream_timeout), request)
+
+    @staticmethod
+    def _with_timeout(details, timeout: float):
+        if details.timeout is not None:
+            return details
+        return grpc.aio.ClientCallDetails(details.method, timeout, details.metadata, details.credentials,
+                                          details.wait_for_ready)
+
+
+class AsyncChannelRegistry:
+    """
+    grpc.aio counterpart of ChannelRegistry for the ASGI gateway. aio channels belong to the event
+    loop they were created in, so channels are created anew when stub() runs on another loop than
+    the previous call. Calls rotate over a host's replicas, skipping those in TRANSIENT_FAILURE;
+    gRPC keeps reconnecting them in the background.
+    """
+
+    def __init__(self, options: Optional[list] = None, lb_policy: str = LB_POLICY,
+                 deadline: float = DEADLINE_SECONDS, stream_deadline: float = STREAM_DEADLINE_SECONDS,
+                 channels_per_target: int = CHANNELS_PER_TARGET):
+        self.options = channel_options(options, lb_policy, channels_per_target)
+        self.lb_policy = lb_policy
+        self.channels_per_target = channels_per_target
+        self._interceptor = AsyncDeadlineInterceptor(deadline, stream_deadline)
+        self._pools: Dict[Tuple[str, str], List[grpc.aio.Channel]] = {}
+        self._stubs: Dict[tuple, object] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._next = itertools.count()
+
+    def stub(self, stub_class, host: str, port):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Channels of a previous loop cannot be used, nor closed, from this one
+            self._loop, self._pools, self._stubs = loop, {}, {}
+        key = (host, str(port))
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = [
+                grpc.aio.insecure_channel(target, options=self.options, interceptors=[self._interceptor])
+                for target in channel_targets(host, port, self.lb_policy, self.channels_per_target)
+            ]
+        channel = self._pick(pool)
+        stub = self._stubs.get((id(channel), stub_class))
+        if stub is None:
+            stub = self._stubs[(id(channel), stub_class)] = stub_class(channel)
+        return stub
+
+    async def close(self):
+        pools, self._pools, self._stubs, self._loop = self._pools, {}, {}, None
+        for pool in pools.values():
+            for channel in pool:
+                await channel.close()
+
+    def metrics(self) -> Dict[str, dict]:
+        return {
+            f"{host}:{port}": {
+                'replicas': {name: channel.get_state().name.lower() for name, channel in zip(
+                    replica_names(channel_targets(host, port, self.lb_policy, self.channels_per_target)), pool)}
+            }
+            for (host, port), pool in self._pools.items()
+        }
+
+    def _pick(self, pool: List[grpc.aio.Channel]) -> grpc.aio.Channel:
+        start = next(self._next)
+        for i in range(len(pool)):
+            channel = pool[(start + i) % len(pool)]
+            if channel.get_state() is not grpc.ChannelConnectivity.TRANSIENT_FAILURE:
+                return channel
+        return pool[start % len(pool)]
+
+
+channels = ChannelRegistry()
+atexit.register(channels.close)
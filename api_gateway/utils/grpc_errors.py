@@ -0,0 +1,24 @@
+from typing import Tuple
+import grpc
+
+
+def grpc_error_response(error: grpc.RpcError) -> Tuple[dict, int]:
+    """
+    JSON body and HTTP status for a failed gRPC call. Shared by the Flask and Quart routes, which
+    each wrap the body with their own jsonify.
+    """
+    error_message = error.details()
+    if error.code() == grpc.StatusCode.OUT_OF_RANGE:
+        return {"message": error_message}, 400
+    error_map = {
+        grpc.StatusCode.NOT_FOUND: (404, error_message),
+        grpc.StatusCode.PERMISSION_DENIED: (403, error_message),
+        grpc.StatusCode.INVALID_ARGUMENT: (400, error_message),
+        grpc.StatusCode.UNAUTHENTICATED: (401, error_message),
+        grpc.StatusCode.INTERNAL: (500, "Internal server error"),
+        grpc.StatusCode.UNAVAILABLE: (503, "Service unavailable"),
+        grpc.StatusCode.RESOURCE_EXHAUSTED: (503, "Service overloaded"),
+        grpc.StatusCode.DEADLINE_EXCEEDED: (504, "Service timeout")
+    }
+    status_code, message = error_map.get(error.code(), (500, "Internal server error"))
+    return {"message": message}, status_code
@@ -78,11 +78,32 @@ class MetaResponse(BaseModel):
         ])
 
 
+class CursorMetaResponse(BaseModel):
+    per_page: int
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+    def dict(self, **kwargs) -> Dict[str, Any]:
+        meta = OrderedDict([
+            ("per_page", self.per_page),
+            ("next_cursor", self.next_cursor)
+        ])
+        if self.total is not None:
+            meta["total"] = self.total
+        return meta
+
+
 class ListQuery(BaseModel):
     page: int = Field(1, gt=0)
     per_page: int = Field(10, gt=0, le=100)
 
 
+class CursorListQuery(BaseModel):
+    cursor: str = Field("", max_length=200)
+    per_page: int = Field(10, gt=0, le=100)
+    include_total: bool = False
+
+
 class ListPostsResponse(BaseModel):
     posts: List[PostResponse]
     meta: MetaResponse
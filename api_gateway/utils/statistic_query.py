@@ -0,0 +1,139 @@
+from collections import OrderedDict
+from proto import statistic_pb2
+
+DYNAMIC_GRANULARITIES = {
+    'day': statistic_pb2.PostDynamicRequest.DAY,
+    'hour': statistic_pb2.PostDynamicRequest.HOUR,
+    'minute': statistic_pb2.PostDynamicRequest.MINUTE
+}
+TOP_WINDOWS = {'all': 0, 'day': 1, 'week': 2, 'hour': 3}
+METRICS = ['views', 'likes', 'comments']
+MAX_TOP_LIMIT = 100
+
+
+def parse_int_arg(args, name: str, default: int, low: int, high: int) -> int:
+    try:
+        value = int(args.get(name, default))
+    except ValueError:
+        raise ValueError(f"Invalid {name}")
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+
+def parse_metric(args, message) -> int:
+    """metric query argument as the Metric value of the request message type."""
+    metric = args.get('metric', 'views')
+    if metric not in METRICS:
+        raise ValueError("Invalid metric")
+    return message.Metric.Value(metric.upper())
+
+
+def parse_top_args(args):
+    """
+    limit, window and hours query arguments of the top routes; hours (an arbitrary number of last
+    hours) takes precedence over window. Raises ValueError with the message for a 400.
+    """
+    window = args.get('window', 'all')
+    if window not in TOP_WINDOWS:
+        raise ValueError("Invalid window")
+    limit = parse_int_arg(args, 'limit', 10, 1, MAX_TOP_LIMIT)
+    hours = parse_int_arg(args, 'hours', 0, 0, 24 * 30)
+    return limit, TOP_WINDOWS[window], hours
+
+
+# The statistics routes of the WSGI and ASGI gateways build their requests and bodies here, so both
+# answer the same; the builders raise ValueError with the message for a 400.
+
+def post_dynamic_request(args, post_id: str, user_id: str) -> statistic_pb2.PostDynamicRequest:
+    metric = parse_metric(args, statistic_pb2.PostDynamicRequest)
+    granularity = args.get('granularity', 'day')
+    if granularity not in DYNAMIC_GRANULARITIES:
+        raise ValueError("Invalid granularity")
+    # columns: all metrics at once as {"dates": [...], "views": [...], "likes": [...], "comments": [...]}
+    response_format = args.get('format', 'points')
+    if response_format not in ['points', 'columns']:
+        raise ValueError("Invalid format")
+    return statistic_pb2.PostDynamicRequest(
+        post_id=post_id,
+        metric=metric,
+        user_id=user_id,
+        granularity=DYNAMIC_GRANULARITIES[granularity],
+        from_=args.get('from', ''),
+        to_=args.get('to', ''),
+        all_metrics=response_format == 'columns'
+    )
+
+
+def is_streamed(dynamic_request: statistic_pb2.PostDynamicRequest) -> bool:
+    """Hours, minutes and explicit ranges come by StreamPostDynamic, the default days by GetPostDynamic."""
+    return (dynamic_request.granularity != statistic_pb2.PostDynamicRequest.DAY
+            or bool(dynamic_request.from_ or dynamic_request.to_))
+
+
+def top_posts_request(args, user_id: str) -> statistic_pb2.TopPostsRequest:
+    metric = parse_metric(args, statistic_pb2.TopPostsRequest)
+    limit, window, hours = parse_top_args(args)
+    return statistic_pb2.TopPostsRequest(metric=metric, user_id=user_id, limit=limit, window=window,
+                                         window_hours=hours)
+
+
+def trending_posts_request(args, user_id: str) -> statistic_pb2.TrendingPostsRequest:
+    metric = parse_metric(args, statistic_pb2.TrendingPostsRequest)
+    limit = parse_int_arg(args, 'limit', 10, 1, MAX_TOP_LIMIT)
+    hours = parse_int_arg(args, 'hours', 48, 1, 24 * 30)
+    half_life = parse_int_arg(args, 'half_life', 6, 1, 24 * 7)
+    return statistic_pb2.TrendingPostsRequest(metric=metric, user_id=user_id, limit=limit,
+                                              window_hours=hours, half_life_hours=half_life)
+
+
+def top_users_request(args, user_id: str) -> statistic_pb2.TopUsersRequest:
+    metric = parse_metric(args, statistic_pb2.TopUsersRequest)
+    limit, window, hours = parse_top_args(args)
+    return statistic_pb2.TopUsersRequest(metric=metric, user_id=user_id, limit=limit, window=window,
+                                         window_hours=hours)
+
+
+def post_stats_body(response) -> OrderedDict:
+    return OrderedDict([
+        ("views_count", response.views_count),
+        ("likes_count", response.likes_count),
+        ("comments_count", response.comments_count)
+    ])
+
+
+def dynamic_body(dynamic_request: statistic_pb2.PostDynamicRequest, responses):
+    if dynamic_request.all_metrics:
+        return merge_dynamic_columns(responses)
+    return dynamic_points(responses)
+
+
+def top_posts_body(response) -> list:
+    return [OrderedDict([("post_id", post.post_id), ("count", post.count)]) for post in response.posts]
+
+
+def trending_posts_body(response) -> list:
+    return [
+        OrderedDict([("post_id", post.post_id), ("score", round(post.score, 3)), ("count", post.count)])
+        for post in response.posts
+    ]
+
+
+def top_users_body(response) -> list:
+    return [OrderedDict([("user_id", user.user_id), ("count", user.count)]) for user in response.users]
+
+
+def dynamic_points(responses) -> list:
+    return [
+        OrderedDict([("date", stat.date), ("count", stat.count)])
+        for response in responses
+        for stat in response.stats
+    ]
+
+
+def merge_dynamic_columns(responses) -> OrderedDict:
+    columns = OrderedDict((name, []) for name in ['dates', 'views', 'likes', 'comments'])
+    for response in responses:
+        for name, values in columns.items():
+            values.extend(getattr(response, name))
+    return columns
@@ -0,0 +1,195 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import jwt
+from confluent_kafka import Consumer, KafkaException
+
+TOKEN_CACHE_SECONDS = float(os.getenv('TOKEN_CACHE_SECONDS', '60'))
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', '10000'))
+KAFKA_BOOTSTRAP_SERVERS = os.getenv('KAFKA_BOOTSTRAP_SERVERS', 'kafka:9092')
+TOKEN_REVOCATIONS_TOPIC = 'token_revocations'
+# How long cache misses wait for the revocations after the first of them; later ones do not wait
+REVOCATIONS_LOAD_TIMEOUT_SECONDS = float(os.getenv('REVOCATIONS_LOAD_TIMEOUT_SECONDS', '2'))
+
+logger = logging.getLogger('ApiGateway.TokenCache')
+
+
+class RevocationsNotLoaded(Exception):
+    pass
+
+
+class TokenCache:
+    """
+    Verifies JWTs locally and remembers token -> user_id for ttl seconds, never past the token's
+    exp; once max_entries tokens are stored the least recently used one is dropped. A token whose
+    ver claim is below the version revoked for its user is rejected and evicted.
+
+    With wait_for_revocations a token that is not cached raises RevocationsNotLoaded until
+    revocations_loaded is set: before that an already revoked token would pass as valid, so it has
+    to be confirmed by user_service and verified again with confirmed=True.
+    """
+
+    def __init__(self, ttl: float = TOKEN_CACHE_SECONDS, max_entries: int = TOKEN_CACHE_SIZE,
+                 wait_for_revocations: bool = False, load_timeout: float = REVOCATIONS_LOAD_TIMEOUT_SECONDS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.wait_for_revocations = wait_for_revocations
+        self.load_timeout = load_timeout
+        self.revocations_loaded = threading.Event()
+        self._load_deadline: Optional[float] = None
+        self._entries: 'OrderedDict[str, Tuple[float, str, int]]' = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._rejected = 0
+        self._revocations = 0
+        self._unconfirmed = 0
+
+    def verify(self, token: str, secret: str, confirmed: bool = False) -> Optional[str]:
+        """The token's user_id, or None if it is invalid, expired or revoked."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(token)
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+            if self.wait_for_revocations and not confirmed and not self.revocations_loaded.is_set():
+                self._unconfirmed += 1
+                raise RevocationsNotLoaded("Token revocations are still being loaded")
+
+        try:
+            payload = jwt.decode(token, secret, algorithms=['HS256'])
+        except jwt.InvalidTokenError:
+            payload = {}
+        user_id, version = payload.get('user_id'), payload.get('ver', 0)
+
+        with self._lock:
+            if not user_id or version < self._versions.get(user_id, 0):
+                self._entries.pop(token, None)
+                self._rejected += 1
+                return None
+            self._entries[token] = (min(now + self.ttl, payload.get('exp', now + self.ttl)), user_id, version)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return user_id
+
+    def wait_until_loaded(self) -> bool:
+        """Waits for revocations_loaded until load_timeout has passed since the first call."""
+        if self.revocations_loaded.is_set():
+            return True
+        with self._lock:
+            if self._load_deadline is None:
+                self._load_deadline = time.monotonic() + self.load_timeout
+        return self.revocations_loaded.wait(max(0.0, self._load_deadline - time.monotonic()))
+
+    def revoke(self, user_id: str, version: int):
+        """Rejects the user's tokens issued with a version below this one."""
+        with self._lock:
+            if version <= self._versions.get(user_id, 0):
+                return
+            self._versions[user_id] = version
+            self._revocations += 1
+            for token in [t for t, (_, uid, ver) in self._entries.items() if uid == user_id and ver < version]:
+                del self._entries[token]
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'hits': self._hits,
+            'misses': self._misses,
+            'rejected': self._rejected,
+            'revocations': self._revocations,
+            'unconfirmed': self._unconfirmed,
+        }
+
+
+class RevocationListener:
+    """
+    Applies token_revocations events from Kafka to a TokenCache. Every gateway process reads the
+    topic from the beginning under its own consumer group, so it also learns revocations made
+    before it started, and sets the cache's revocations_loaded once every assigned partition has been
+    read up to the end offset it had when assigned. Started lazily, so each forked worker gets its own
+    consumer.
+    """
+
+    def __init__(self, cache: TokenCache, bootstrap_servers: str = KAFKA_BOOTSTRAP_SERVERS,
+                 topic: str = TOKEN_REVOCATIONS_TOPIC):
+        self.cache = cache
+        self.bootstrap_servers = bootstrap_servers
+        self.topic = topic
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._end_offsets: Optional[Dict[int, Tuple[int, int]]] = None
+
+    def start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='token-revocations', daemon=True)
+                    self._thread.start()
+        return self
+
+    def close(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def apply(self, value: bytes):
+        event = json.loads(value)
+        self.cache.revoke(event['user_id'], int(event['token_version']))
+
+    def caught_up(self, consumer) -> bool:
+        """Whether the consumer has read every assigned partition up to its end offset at assignment."""
+        assignment = consumer.assignment()
+        if not assignment:
+            return False
+        if self._end_offsets is None:
+            self._end_offsets = {tp.partition: consumer.get_watermark_offsets(tp, timeout=5) for tp in assignment}
+        for tp in consumer.position(assignment):
+            low, high = self._end_offsets[tp.partition]
+            # An empty partition has no messages to wait for and no position until one arrives
+            if low < high and tp.offset < high:
+                return False
+        return True
+
+    def _run(self):
+        consumer = Consumer({
+            'bootstrap.servers': self.bootstrap_servers,
+            'group.id': f"api_gateway-{uuid.uuid4()}",
+            'auto.offset.reset': 'earliest',
+            'enable.auto.commit': False,
+        })
+        consumer.subscribe([self.topic])
+        try:
+            while not self._stopped.is_set():
+                # Checked before polling, so every message read so far has been applied
+                if not self.cache.revocations_loaded.is_set():
+                    try:
+                        if self.caught_up(consumer):
+                            self.cache.revocations_loaded.set()
+                            logger.info("Token revocations loaded")
+                    except KafkaException as e:
+                        logger.warning(f"Token revocations end offsets are not available: {e}")
+                msg = consumer.poll(1.0)
+                if msg is None:
+                    continue
+                if msg.error():
+                    logger.warning(f"Token revocations consumer error: {msg.error()}")
+                    continue
+                try:
+                    self.apply(msg.value())
+                except (ValueError, KeyError, TypeError):
+                    logger.warning("Skipping malformed token revocation event", exc_info=True)
+        finally:
+            consumer.close()
@@ -0,0 +1,278 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USER_SERVICE_POOL_SIZE = int(os.getenv('USER_SERVICE_POOL_SIZE', '20'))
+USER_SERVICE_MAX_IN_FLIGHT = int(os.getenv('USER_SERVICE_MAX_IN_FLIGHT', '32'))
+USER_SERVICE_RETRIES = int(os.getenv('USER_SERVICE_RETRIES', '2'))
+USER_SERVICE_BACKOFF_SECONDS = float(os.getenv('USER_SERVICE_BACKOFF_SECONDS', '0.1'))
+USER_SERVICE_CONNECT_TIMEOUT = float(os.getenv('USER_SERVICE_CONNECT_TIMEOUT', '1'))
+USER_SERVICE_BREAKER_FAILURES = int(os.getenv('USER_SERVICE_BREAKER_FAILURES', '5'))
+USER_SERVICE_BREAKER_RESET_SECONDS = float(os.getenv('USER_SERVICE_BREAKER_RESET_SECONDS', '10'))
+
+# Read timeout per user_service path; registration hashes the password with scrypt
+READ_TIMEOUTS = {
+    '/register': 5.0,
+    '/login': 3.0,
+    '/logout': 2.0,
+    '/profile': 2.0,
+    '/user-info': 2.0,
+    '/health': 1.0,
+}
+DEFAULT_READ_TIMEOUT = 5.0
+RETRY_STATUSES = (502, 503, 504)
+RETRY_METHODS = frozenset({'GET', 'PUT'})
+
+
+class UserServiceUnavailable(requests.exceptions.ConnectionError):
+    """Raised without calling user_service while the breaker is open or too many calls are in flight."""
+    pass
+
+
+class JitteredRetry(Retry):
+    """Full jitter: sleeps a random time up to the exponential backoff instead of exactly it."""
+
+    def get_backoff_time(self) -> float:
+        return random.uniform(0, super().get_backoff_time())
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures and rejects calls for reset_timeout
+    seconds. Then a single trial call is let through: success closes the breaker, failure
+    opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = USER_SERVICE_BREAKER_FAILURES,
+                 reset_timeout: float = USER_SERVICE_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self._rejected = 0
+        self._opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return 'open'
+        return 'half_open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self._opened += 1
+            self._trial_running = False
+
+    def metrics(self) -> Dict[str, object]:
+        return {
+            'state': self.state,
+            'consecutive_failures': self._failures,
+            'opened': self._opened,
+            'rejected': self._rejected,
+        }
+
+
+class UserServiceClient:
+    """
+    Process-wide keep-alive connection pool to user_service. Connection errors are retried for
+    every method, 502/503/504 and read errors only for GET and PUT, with jittered exponential
+    backoff. Calls fail fast with UserServiceUnavailable while the circuit breaker is open or
+    when max_in_flight calls are already waiting on user_service.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, pool_size: int = USER_SERVICE_POOL_SIZE,
+                 max_in_flight: int = USER_SERVICE_MAX_IN_FLIGHT, retries: int = USER_SERVICE_RETRIES,
+                 backoff: float = USER_SERVICE_BACKOFF_SECONDS, connect_timeout: float = USER_SERVICE_CONNECT_TIMEOUT,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.base_url = base_url
+        self.connect_timeout = connect_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._counters = {'requests': 0, 'failures': 0, 'busy': 0}
+        self._lock = threading.Lock()
+
+        retry = JitteredRetry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=RETRY_METHODS,
+            backoff_factor=backoff,
+            raise_on_status=False,
+        )
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request('POST', path, **kwargs)
+
+    def put(self, path: str, **kwargs) -> requests.Response:
+        return self.request('PUT', path, **kwargs)
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        if not self._in_flight.acquire(blocking=False):
+            self._count('busy')
+            raise UserServiceUnavailable("Too many calls in flight to user service")
+        try:
+            if not self.breaker.allow():
+                raise UserServiceUnavailable("User service circuit breaker is open")
+            self._count('requests')
+            kwargs.setdefault('timeout', (self.connect_timeout, READ_TIMEOUTS.get(path, DEFAULT_READ_TIMEOUT)))
+            url = f"{self.base_url or current_app.config['USER_SERVICE_URL']}{path}"
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException:
+                self._count('failures')
+                self.breaker.record_failure()
+                raise
+        finally:
+            self._in_flight.release()
+
+        if response.status_code >= 500:
+            self._count('failures')
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def close(self):
+        self.session.close()
+
+    def metrics(self) -> Dict[str, object]:
+        with self._lock:
+            counters = dict(self._counters)
+        counters['breaker'] = self.breaker.metrics()
+        return counters
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+
+class AsyncUserServiceClient:
+    """
+    httpx counterpart of UserServiceClient for the ASGI gateway, with the same timeouts, circuit
+    breaker and in-flight limit. The transport retries failed connections; 502/503/504 answers to
+    GET and PUT are retried here with the same jittered backoff. Read errors are not retried.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, pool_size: int = USER_SERVICE_POOL_SIZE,
+                 max_in_flight: int = USER_SERVICE_MAX_IN_FLIGHT, retries: int = USER_SERVICE_RETRIES,
+                 backoff: float = USER_SERVICE_BACKOFF_SECONDS, connect_timeout: float = USER_SERVICE_CONNECT_TIMEOUT,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.max_in_flight = max_in_flight
+        self.retries = retries
+        self.backoff = backoff
+        self.connect_timeout = connect_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._in_flight = 0
+        self._counters = {'requests': 0, 'failures': 0, 'busy': 0}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            self._client = httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(retries=self.retries, limits=limits))
+        return self._client
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request('GET', path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request('POST', path, **kwargs)
+
+    async def put(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request('PUT', path, **kwargs)
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        if self._in_flight >= self.max_in_flight:
+            self._counters['busy'] += 1
+            raise UserServiceUnavailable("Too many calls in flight to user service")
+        self._in_flight += 1
+        try:
+            if not self.breaker.allow():
+                raise UserServiceUnavailable("User service circuit breaker is open")
+            self._counters['requests'] += 1
+            read_timeout = READ_TIMEOUTS.get(path, DEFAULT_READ_TIMEOUT)
+            kwargs.setdefault('timeout', httpx.Timeout(read_timeout, connect=self.connect_timeout))
+            for attempt in range(self.retries + 1):
+                try:
+                    response = await self.client.request(method, f"{self.base_url}{path}", **kwargs)
+                except httpx.HTTPError:
+                    self._counters['failures'] += 1
+                    self.breaker.record_failure()
+                    raise
+                if response.status_code not in RETRY_STATUSES or method not in RETRY_METHODS \
+                        or attempt == self.retries:
+                    break
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+        finally:
+            self._in_flight -= 1
+
+        if response.status_code >= 500:
+            self._counters['failures'] += 1
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def metrics(self) -> Dict[str, object]:
+        counters = dict(self._counters)
+        counters['breaker'] = self.breaker.metrics()
+        return counters
+
+
+def forwarded_headers(headers) -> Dict[str, str]:
+    """Only the client's Authorization header goes to user_service, not Host, Content-Length etc."""
+    token = headers.get('Authorization')
+    return {'Authorization': token} if token else {}
+
+
+user_service = UserServiceClient()
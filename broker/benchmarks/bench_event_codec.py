@@ -0,0 +1,59 @@
+"""
+Encode/decode throughput and bytes per event of the JSON and protobuf event formats.
+Runs without Kafka:
+
+    python broker/benchmarks/bench_event_codec.py
+"""
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from broker.event_codec import encode_event, decode_event, EVENT_FORMAT_JSON, EVENT_FORMAT_PROTOBUF
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "100000"))
+
+EVENTS = {
+    'post_viewed': {
+        "event_type": "post_viewed",
+        "timestamp": datetime.now(),
+        "user_id": "1c9a7f0e-4a52-4f43-9f3d-6b1d2c9e8a11",
+        "post_id": "123456"
+    },
+    'post_commented': {
+        "event_type": "post_commented",
+        "timestamp": datetime.now(),
+        "user_id": "1c9a7f0e-4a52-4f43-9f3d-6b1d2c9e8a11",
+        "post_id": "123456",
+        "comment_id": "987654",
+        "text_preview": "Great write-up, thanks for sharing the numbers!"
+    },
+}
+
+
+def run(event_name: str, event_format: str):
+    event = EVENTS[event_name]
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        payload, headers = encode_event(event, event_format)
+    encode_rate = ITERATIONS / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        decode_event(payload, headers)
+    decode_rate = ITERATIONS / (time.perf_counter() - start)
+
+    print(f"{event_name:<16}{event_format:<10}{len(payload):>8}{encode_rate:>14.0f}{decode_rate:>14.0f}")
+
+
+def main():
+    print(f"{'event':<16}{'format':<10}{'bytes':>8}{'encode/sec':>14}{'decode/sec':>14}")
+    for event_name in EVENTS:
+        for event_format in (EVENT_FORMAT_JSON, EVENT_FORMAT_PROTOBUF):
+            run(event_name, event_format)
+
+
+if __name__ == '__main__':
+    main()
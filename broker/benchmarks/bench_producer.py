@@ -0,0 +1,39 @@
+"""
+Producer micro-benchmark: events/sec of send_post_viewed_event with a flush after every event
+(the previous behaviour, KAFKA_PRODUCER_ASYNC=false) versus librdkafka batching.
+
+    KAFKA_BOOTSTRAP_SERVERS=localhost:9092 python broker/benchmarks/bench_producer.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from broker.kafka_producer import KafkaProducer
+
+EVENTS = int(os.getenv("BENCH_EVENTS", "20000"))
+
+
+def run(name: str, async_mode: bool):
+    producer = KafkaProducer(async_mode=async_mode)
+    start = time.perf_counter()
+    for i in range(EVENTS):
+        producer.send_post_viewed_event(f"bench_user_{i % 100}", str(i % 1000))
+    enqueued = time.perf_counter() - start
+    producer.close()
+    total = time.perf_counter() - start
+    metrics = producer.metrics()
+    print(f"{name:<20}{EVENTS / enqueued:>16.0f}{EVENTS / total:>16.0f}"
+          f"{metrics['delivered']:>12}{metrics['failed'] + metrics['dropped']:>10}")
+
+
+def main():
+    print(f"{EVENTS} post_viewed events")
+    print(f"{'mode':<20}{'send() ev/sec':>16}{'delivered ev/s':>16}{'delivered':>12}{'lost':>10}")
+    run("flush per event", async_mode=False)
+    run("async batching", async_mode=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from google.protobuf.message import DecodeError
+from proto import events_pb2
+
+CONTENT_TYPE_HEADER = 'content-type'
+SCHEMA_VERSION_HEADER = 'schema-version'
+EVENT_TYPE_HEADER = 'event-type'
+
+JSON_CONTENT_TYPE = 'application/json'
+PROTOBUF_CONTENT_TYPE = 'application/x-protobuf'
+SCHEMA_VERSION = 1
+
+EVENT_FORMAT_JSON = 'json'
+EVENT_FORMAT_PROTOBUF = 'protobuf'
+
+PROTOBUF_EVENTS = {
+    'post_viewed': events_pb2.PostViewed,
+    'post_liked': events_pb2.PostLiked,
+    'post_commented': events_pb2.PostCommented,
+}
+
+PROTOBUF_FIELDS = {
+    event_type: [field.name for field in message_cls.DESCRIPTOR.fields if field.name != 'timestamp']
+    for event_type, message_cls in PROTOBUF_EVENTS.items()
+}
+
+Headers = List[Tuple[str, bytes]]
+
+
+class EventDecodeError(ValueError):
+    """Raised when a message value cannot be decoded into an event"""
+    pass
+
+
+def _to_micros(value: datetime) -> int:
+    return int(value.timestamp() * 1_000_000)
+
+
+def _from_micros(value: int) -> datetime:
+    return datetime.fromtimestamp(value / 1_000_000)
+
+
+def _serialize_datetime(obj):
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+def encode_event(data: Dict[str, Any], event_format: str = EVENT_FORMAT_PROTOBUF) -> Tuple[bytes, Headers]:
+    """
+    Serializes an event dict for Kafka. Post events go out as protobuf unless event_format is
+    'json'; every other event (e.g. user_registration) is always JSON.
+    """
+    event_type = data['event_type']
+    message_cls = PROTOBUF_EVENTS.get(event_type)
+    if event_format == EVENT_FORMAT_PROTOBUF and message_cls is not None:
+        message = message_cls(timestamp=_to_micros(data['timestamp']))
+        for name in PROTOBUF_FIELDS[event_type]:
+            value = data.get(name)
+            if value is not None:
+                setattr(message, name, value)
+        return message.SerializeToString(), _headers(PROTOBUF_CONTENT_TYPE, event_type)
+
+    payload = json.dumps(data, default=_serialize_datetime).encode('utf-8')
+    return payload, _headers(JSON_CONTENT_TYPE, event_type)
+
+
+def _headers(content_type: str, event_type: str) -> Headers:
+    return [
+        (CONTENT_TYPE_HEADER, content_type.encode('ascii')),
+        (SCHEMA_VERSION_HEADER, b'%d' % SCHEMA_VERSION),
+        (EVENT_TYPE_HEADER, event_type.encode('ascii')),
+    ]
+
+
+def decode_event(value: bytes, headers: Optional[Headers] = None) -> Dict[str, Any]:
+    """
+    Inverse of encode_event. Messages without a content-type header predate the header and
+    are JSON. Returns the same dict shape for both formats, with timestamp as an ISO string.
+    """
+    header_map = {k: v.decode('ascii') for k, v in (headers or [])}
+    content_type = header_map.get(CONTENT_TYPE_HEADER, JSON_CONTENT_TYPE)
+
+    if content_type == JSON_CONTENT_TYPE:
+        try:
+            return json.loads(value)
+        except ValueError as e:
+            raise EventDecodeError("Invalid JSON event") from e
+
+    if content_type != PROTOBUF_CONTENT_TYPE:
+        raise EventDecodeError(f"Unsupported content type {content_type}")
+    if int(header_map.get(SCHEMA_VERSION_HEADER, SCHEMA_VERSION)) > SCHEMA_VERSION:
+        raise EventDecodeError(f"Unsupported schema version {header_map[SCHEMA_VERSION_HEADER]}")
+
+    event_type = header_map.get(EVENT_TYPE_HEADER)
+    message_cls = PROTOBUF_EVENTS.get(event_type)
+    if message_cls is None:
+        raise EventDecodeError(f"Unknown event type {event_type}")
+
+    message = message_cls()
+    try:
+        message.ParseFromString(value)
+    except DecodeError as e:
+        raise EventDecodeError(f"Invalid {event_type} event") from e
+
+    event = {'event_type': event_type, 'timestamp': _from_micros(message.timestamp).isoformat()}
+    for name in PROTOBUF_FIELDS[event_type]:
+        event[name] = getattr(message, name)
+    return event
@@ -1,51 +1,137 @@
-import json
+import atexit
+import logging
 import os
+import threading
+import time
 from datetime import datetime
 from typing import Dict, Any, Optional
 from confluent_kafka import Producer
+from broker.event_codec import encode_event, EVENT_FORMAT_PROTOBUF
 
 KAFKA_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "kafka:9092")
+KAFKA_PRODUCER_ASYNC = os.getenv("KAFKA_PRODUCER_ASYNC", "true").lower() in ("1", "true", "yes")
+KAFKA_LINGER_MS = int(os.getenv("KAFKA_LINGER_MS", "20"))
+KAFKA_BATCH_SIZE = int(os.getenv("KAFKA_BATCH_SIZE", "65536"))
+KAFKA_COMPRESSION = os.getenv("KAFKA_COMPRESSION", "lz4")
+KAFKA_QUEUE_MAX_MESSAGES = int(os.getenv("KAFKA_QUEUE_MAX_MESSAGES", "100000"))
+KAFKA_MAX_BLOCK_SECONDS = float(os.getenv("KAFKA_MAX_BLOCK_SECONDS", "1.0"))
+KAFKA_FLUSH_TIMEOUT_SECONDS = float(os.getenv("KAFKA_FLUSH_TIMEOUT_SECONDS", "10"))
+KAFKA_EVENT_FORMAT = os.getenv("KAFKA_EVENT_FORMAT", EVENT_FORMAT_PROTOBUF)
+
+logger = logging.getLogger('KafkaProducer')
 
 
 class KafkaProducer:
-    def __init__(self):
-        self.producer = Producer({
+    """
+    In async mode (default) produce() only enqueues into librdkafka, which batches per
+    partition (linger.ms, batch.size, compression); a daemon thread serves delivery callbacks
+    and flush happens once, in close(). With async_mode=False every event is flushed before
+    send_event returns, as before.
+    """
+
+    def __init__(self, async_mode: bool = KAFKA_PRODUCER_ASYNC, event_format: str = KAFKA_EVENT_FORMAT):
+        self.async_mode = async_mode
+        self.event_format = event_format
+        config = {
             'bootstrap.servers': KAFKA_BOOTSTRAP_SERVERS,
             'client.id': 'social_network_producer'
-        })
+        }
+        if async_mode:
+            config.update({
+                'linger.ms': KAFKA_LINGER_MS,
+                'batch.size': KAFKA_BATCH_SIZE,
+                'compression.type': KAFKA_COMPRESSION,
+                'queue.buffering.max.messages': KAFKA_QUEUE_MAX_MESSAGES
+            })
+        self.producer = Producer(config)
+        self.max_block_seconds = KAFKA_MAX_BLOCK_SECONDS
+
+        self._lock = threading.Lock()
+        self._counters = {'produced': 0, 'delivered': 0, 'failed': 0, 'dropped': 0}
+        self._poll_thread: Optional[threading.Thread] = None
+        self._closed = threading.Event()
 
         self.USER_REGISTRATIONS_TOPIC = "user_registrations"
+        self.TOKEN_REVOCATIONS_TOPIC = "token_revocations"
         self.POST_VIEWS_TOPIC = "post_views"
         self.POST_LIKES_TOPIC = "post_likes"
         self.POST_COMMENTS_TOPIC = "post_comments"
 
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
     def _delivery_report(self, err, msg):
         """Called once for each message produced to indicate delivery result."""
         if err is not None:
-            print(f'Message delivery failed: {err}')
+            self._count('failed')
+            logger.warning(f"Message delivery to {msg.topic()} failed: {err}")
         else:
-            print(f'Message delivered to {msg.topic()} [{msg.partition()}]')
+            self._count('delivered')
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            counters = dict(self._counters)
+        counters['queued'] = len(self.producer)
+        return counters
+
+    def _ensure_poll_thread(self):
+        if self._poll_thread is None:
+            with self._lock:
+                if self._poll_thread is None:
+                    self._poll_thread = threading.Thread(
+                        target=self._poll_loop, name='kafka-producer-poll', daemon=True
+                    )
+                    self._poll_thread.start()
+
+    def _poll_loop(self):
+        while not self._closed.is_set():
+            self.producer.poll(0.1)
+
+    def _produce(self, **kwargs) -> bool:
+        """Enqueues a message, waiting up to max_block_seconds for room in a full local queue."""
+        deadline = time.monotonic() + self.max_block_seconds
+        while True:
+            try:
+                self.producer.produce(**kwargs)
+                self._count('produced')
+                return True
+            except BufferError:
+                if time.monotonic() >= deadline:
+                    self._count('dropped')
+                    logger.warning(f"Producer queue is full, dropping event for {kwargs['topic']}")
+                    return False
+                self.producer.poll(0.05)
 
-    def _serialize_datetime(self, obj):
-        """JSON serializer for datetime objects."""
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        raise TypeError(f"Type {type(obj)} not serializable")
+    def close(self, timeout: float = KAFKA_FLUSH_TIMEOUT_SECONDS):
+        """Stops the poll thread and waits for queued messages to be delivered."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._poll_thread is not None:
+            self._poll_thread.join()
+        remaining = self.producer.flush(timeout)
+        if remaining:
+            logger.warning(f"{remaining} messages were not delivered before shutdown")
+        logger.info(f"Kafka producer closed: {self.metrics()}")
 
     def send_event(self, topic: str, data: Dict[str, Any], key: Optional[str] = None):
         """Send an event to the specified Kafka topic."""
-        payload = json.dumps(data, default=self._serialize_datetime).encode('utf-8')
-        self.producer.produce(
+        payload, headers = encode_event(data, self.event_format)
+        if self.async_mode:
+            self._ensure_poll_thread()
+        self._produce(
             topic=topic,
             key=key.encode('utf-8') if key else None,
             value=payload,
+            headers=headers,
             callback=self._delivery_report
         )
-        self.producer.flush()
+        if not self.async_mode:
+            self.producer.flush()
 
     def send_user_registration_event(self, user_id: str, email: str, registration_date: datetime):
         """Send event when a user registers."""
-        print(f"!!! Sending registration event for {email}")
         self.send_event(
             topic=self.USER_REGISTRATIONS_TOPIC,
             data={
@@ -57,7 +143,20 @@ class KafkaProducer:
             key=str(user_id)
         )
 
-    def send_post_viewed_event(self, user_id: str, post_id: str):
+    def send_token_revocation_event(self, user_id: str, token_version: int):
+        """Send event when a user's tokens older than token_version are revoked."""
+        self.send_event(
+            topic=self.TOKEN_REVOCATIONS_TOPIC,
+            data={
+                "event_type": "token_revocation",
+                "timestamp": datetime.now(),
+                "user_id": user_id,
+                "token_version": token_version
+            },
+            key=str(user_id)
+        )
+
+    def send_post_viewed_event(self, user_id: str, post_id: str, creator_id: str = ""):
         """Send event when a post is viewed."""
         self.send_event(
             topic=self.POST_VIEWS_TOPIC,
@@ -65,12 +164,13 @@ class KafkaProducer:
                 "event_type": "post_viewed",
                 "timestamp": datetime.now(),
                 "user_id": user_id,
-                "post_id": post_id
+                "post_id": post_id,
+                "creator_id": creator_id
             },
             key=str(post_id)
         )
 
-    def send_post_liked_event(self, user_id: str, post_id: str):
+    def send_post_liked_event(self, user_id: str, post_id: str, creator_id: str = ""):
         """Send event when a post is liked."""
         self.send_event(
             topic=self.POST_LIKES_TOPIC,
@@ -78,19 +178,22 @@ class KafkaProducer:
                 "event_type": "post_liked",
                 "timestamp": datetime.now(),
                 "user_id": user_id,
-                "post_id": post_id
+                "post_id": post_id,
+                "creator_id": creator_id
             },
             key=str(post_id)
         )
 
-    def send_post_commented_event(self, user_id: str, post_id: str, comment_id: str, text: str = None):
+    def send_post_commented_event(self, user_id: str, post_id: str, comment_id: str, text: str = None,
+                                  creator_id: str = ""):
         """Send event when a post is commented."""
         event_data = {
             "event_type": "post_commented",
             "timestamp": datetime.now(),
             "user_id": user_id,
             "post_id": post_id,
-            "comment_id": comment_id
+            "comment_id": comment_id,
+            "creator_id": creator_id
         }
         if text:
             event_data["text_preview"] = text[:100]
@@ -101,3 +204,4 @@ class KafkaProducer:
 
 
 kafka_producer = KafkaProducer()
+atexit.register(kafka_producer.close)
@@ -1,18 +1,30 @@
-import json
+import logging
+import os
 from datetime import datetime
 from confluent_kafka import Consumer, KafkaException, KafkaError
-from sqlalchemy.orm import sessionmaker
+import hashlib
 import time
 import uuid
-from statistic_service.db.clickhouse_models import Event, EventType
+from statistic_service.db.clickhouse_models import EventType
+from broker.event_codec import decode_event, EventDecodeError
+
+STATS_BATCH_MAX_MESSAGES = int(os.getenv("STATS_BATCH_MAX_MESSAGES", "5000"))
+STATS_BATCH_MAX_SECONDS = float(os.getenv("STATS_BATCH_MAX_SECONDS", "1.0"))
+STATS_CONSUMER_GROUP = os.getenv("STATS_CONSUMER_GROUP", "statistics_consumer_group")
+
+# event_id is derived from the message position, so a redelivered message maps to the same row
+EVENT_ID_NAMESPACE = uuid.UUID('6f1c1b7e-5d2a-4a8e-9a57-3f0c2f4b8d10')
+
+logger = logging.getLogger('KafkaStatsConsumer')
 
 
 class KafkaStatsConsumer:
-    def __init__(self, db):
+    def __init__(self, db, batch_size: int = STATS_BATCH_MAX_MESSAGES,
+                 batch_interval: float = STATS_BATCH_MAX_SECONDS, group_id: str = STATS_CONSUMER_GROUP):
         self.db = db
         self.consumer = Consumer({
-            'bootstrap.servers': 'kafka:9092',
-            'group.id': 'statistics_consumer_group',
+            'bootstrap.servers': os.getenv("KAFKA_BOOTSTRAP_SERVERS", "kafka:9092"),
+            'group.id': group_id,
             'auto.offset.reset': 'earliest',
             'enable.auto.commit': False,
             'max.poll.interval.ms': 86400000
@@ -24,6 +36,15 @@ class KafkaStatsConsumer:
         }
         self.max_retries = 10
         self.retry_delay = 10
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self._rows = []
+        self._uncommitted = 0
+        self._batch_started = None
+        # (topic, partition) -> [first, last] offset of the pending batch
+        self._offsets = {}
+        self._assigned_since_flush = False
+        self._running = True
 
     def wait_for_kafka(self):
         """Wait for Kafka to be ready and topics to be available."""
@@ -46,22 +67,55 @@ class KafkaStatsConsumer:
         raise Exception(f"Failed to connect to Kafka after {self.max_retries} retries")
 
     def consume_messages(self):
-        """Main message processing loop."""
+        """
+        Main message processing loop. Messages are collected into a batch that is written with
+        one INSERT once batch_size messages or batch_interval seconds have accumulated; offsets
+        are committed only after that insert succeeds.
+        """
         try:
             self.wait_for_kafka()
-            self.consumer.subscribe(list(self.topic_map.keys()))
-
-            while True:
-                msg = self.consumer.poll(1.0)
-                if msg is None:
-                    continue
-                if msg.error():
-                    self._handle_kafka_error(msg.error())
-                    continue
-                self._process_message(msg)
+            self.consumer.subscribe(
+                list(self.topic_map.keys()),
+                on_assign=self._on_assign,
+                on_revoke=self._on_revoke
+            )
+
+            while self._running:
+                messages = self.consumer.consume(
+                    num_messages=self.batch_size - self._uncommitted,
+                    timeout=self.batch_interval
+                )
+                for msg in messages:
+                    if msg.error():
+                        self._handle_kafka_error(msg.error())
+                        continue
+                    self._process_message(msg)
+                if self._batch_is_due():
+                    self._flush()
+            self._flush()
         finally:
             self._shutdown()
 
+    def shutdown(self):
+        """Asks the loop to flush the current batch and close the consumer."""
+        self._running = False
+
+    def _on_assign(self, consumer, partitions):
+        """
+        A previous owner may have inserted messages after the committed offsets and died before
+        committing them, so the next batch is checked against the stored events.
+        """
+        logger.info(f"Assigned partitions: {[(p.topic, p.partition) for p in partitions]}")
+        self._assigned_since_flush = True
+
+    def _on_revoke(self, consumer, partitions):
+        """
+        Runs inside consume() before the partitions move to another group member: the pending
+        batch is written and committed now, while this consumer still owns its offsets.
+        """
+        logger.info(f"Revoking partitions: {[(p.topic, p.partition) for p in partitions]}")
+        self._flush()
+
     def _handle_kafka_error(self, error: KafkaError):
         """Handle Kafka-specific errors."""
         if error.code() == KafkaError._PARTITION_EOF:
@@ -72,32 +126,74 @@ class KafkaStatsConsumer:
             raise KafkaException(error)
 
     def _process_message(self, msg):
-        """Process a single Kafka message and store it in the database."""
-        Session = sessionmaker(bind=self.db.engine)
-        session = Session()
+        """Adds a Kafka message to the pending batch; undecodable messages are skipped."""
+        if self._batch_started is None:
+            self._batch_started = time.monotonic()
+        self._uncommitted += 1
+        offsets = self._offsets.setdefault((msg.topic(), msg.partition()), [msg.offset(), msg.offset()])
+        offsets[0] = min(offsets[0], msg.offset())
+        offsets[1] = max(offsets[1], msg.offset())
 
         try:
-            message = json.loads(msg.value())
+            message = decode_event(msg.value(), msg.headers())
+            event_time = datetime.fromisoformat(message['timestamp']) if message.get('timestamp') else datetime.now()
+            self._rows.append({
+                'event_id': str(uuid.uuid5(EVENT_ID_NAMESPACE, f"{msg.topic()}:{msg.partition()}:{msg.offset()}")),
+                'post_id': str(message['post_id']),
+                'user_id': message.get('user_id') or '',
+                'creator_id': message.get('creator_id') or '',
+                'event_type': self.topic_map[msg.topic()],
+                'event_time': event_time,
+                'event_date': event_time.date()
+            })
+        except (EventDecodeError, KeyError, ValueError, TypeError):
+            logger.warning(f"Skipping malformed message at {msg.topic()}[{msg.partition()}]@{msg.offset()}")
 
-            event = Event(
-                event_id=str(uuid.uuid4()),
-                post_id=message['post_id'],
-                event_type=self.topic_map[msg.topic()],
-                event_date=datetime.now().date()
-            )
+    def _batch_is_due(self) -> bool:
+        if not self._uncommitted:
+            return False
+        return (self._uncommitted >= self.batch_size
+                or time.monotonic() - self._batch_started >= self.batch_interval)
 
-            session.add(event)
-            session.commit()
-            self.consumer.commit(asynchronous=False)
-        except json.JSONDecodeError:
-            session.rollback()
-        except KeyError:
-            session.rollback()
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+    def _batch_token(self) -> str:
+        """Deduplication token of the pending batch, derived from the offset ranges it covers."""
+        ranges = ','.join(f"{topic}:{partition}:{first}-{last}"
+                          for (topic, partition), (first, last) in sorted(self._offsets.items()))
+        return hashlib.sha1(ranges.encode()).hexdigest()
+
+    def _unstored_rows(self) -> list:
+        if not self._assigned_since_flush:
+            return self._rows
+        stored = self.db.stored_event_ids(self._rows)
+        if stored:
+            logger.info(f"Skipping {len(stored)} events inserted before the last commit")
+        return [row for row in self._rows if row['event_id'] not in stored]
+
+    def _flush(self):
+        """
+        Inserts the pending rows, then commits the consumed offsets. The materialized views count
+        every inserted row, so nothing may reach events twice: a retried insert carries the same
+        deduplication token, and after an assignment rows already stored are left out.
+        """
+        if not self._uncommitted:
+            return
+        token = self._batch_token()
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                self.db.insert_events(self._unstored_rows(), dedup_token=token)
+                break
+            except Exception:
+                logger.error(f"Failed to insert {len(self._rows)} events (attempt {attempt})", exc_info=True)
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.retry_delay)
+
+        self.consumer.commit(asynchronous=False)
+        self._rows = []
+        self._uncommitted = 0
+        self._batch_started = None
+        self._offsets = {}
+        self._assigned_since_flush = False
 
     def _shutdown(self):
         """Clean up the consumer on shutdown."""
@@ -0,0 +1,23 @@
+from concurrent import futures
+from typing import Optional
+import grpc
+
+# Accept the API gateway's keepalive pings on idle connections instead of closing them
+SERVER_OPTIONS = [
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.min_ping_interval_without_data_ms', 10000),
+]
+
+
+def create_server(max_workers: int, reuse_port: bool, max_concurrent_rpcs: Optional[int]) -> grpc.Server:
+    """
+    gRPC server of the post and statistic services. With reuse_port several processes can bind the same
+    port and the kernel spreads connections between them; without it a second process fails to bind
+    instead of silently sharing the port. Calls above max_concurrent_rpcs are rejected with
+    RESOURCE_EXHAUSTED instead of queueing.
+    """
+    return grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_workers),
+        options=SERVER_OPTIONS + [('grpc.so_reuseport', int(reuse_port))],
+        maximum_concurrent_rpcs=max_concurrent_rpcs
+    )
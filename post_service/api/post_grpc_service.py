@@ -1,13 +1,16 @@
+from typing import Optional
 import grpc
 from proto import post_pb2, post_pb2_grpc
 from db.post_db import PostDB, PostDBError, AccessDeniedError, NotFoundError, OutOfRangeError, InvalidArgumentError
+from db.view_buffer import ViewCounterBuffer
 from sqlalchemy.exc import SQLAlchemyError
 from broker.kafka_producer import kafka_producer
 
 
 class PostServiceServicer(post_pb2_grpc.PostServiceServicer):
-    def __init__(self, db: PostDB):
+    def __init__(self, db: PostDB, view_buffer: Optional[ViewCounterBuffer] = None):
         self.db = db
+        self.view_buffer = view_buffer
 
     def _handle_errors(self, context, exception, error_code, response_type=None):
         context.set_code(error_code)
@@ -55,12 +58,43 @@ class PostServiceServicer(post_pb2_grpc.PostServiceServicer):
         except PostDBError as e:
             return self._handle_errors(context, e, grpc.StatusCode.INTERNAL, post_pb2.GetPostResponse)
 
+    def BatchGetPosts(self, request, context):
+        try:
+            return self.db.batch_get_posts(list(request.post_ids), request.user_id, list(request.fields))
+        except InvalidArgumentError as e:
+            return self._handle_errors(context, e, grpc.StatusCode.INVALID_ARGUMENT, post_pb2.BatchGetPostsResponse)
+        except SQLAlchemyError as e:
+            return self._handle_errors(context, e, grpc.StatusCode.INTERNAL, post_pb2.BatchGetPostsResponse)
+        except PostDBError as e:
+            return self._handle_errors(context, e, grpc.StatusCode.INTERNAL, post_pb2.BatchGetPostsResponse)
+
+    def StreamPosts(self, request, context):
+        try:
+            yield from self.db.iter_posts(list(request.post_ids), request.user_id, list(request.fields))
+        except InvalidArgumentError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+        except PostDBError as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+
+    def GetPostCreators(self, request, context):
+        try:
+            return post_pb2.GetPostCreatorsResponse(creator_ids=self.db.get_post_creators(list(request.post_ids)))
+        except InvalidArgumentError as e:
+            return self._handle_errors(context, e, grpc.StatusCode.INVALID_ARGUMENT, post_pb2.GetPostCreatorsResponse)
+        except PostDBError as e:
+            return self._handle_errors(context, e, grpc.StatusCode.INTERNAL, post_pb2.GetPostCreatorsResponse)
+
     def ListPosts(self, request, context):
         try:
             return self.db.list_posts(
                 user_id=request.user_id,
                 page=request.page,
-                per_page=request.per_page
+                per_page=request.per_page,
+                cursor=request.cursor,
+                use_cursor=request.use_cursor,
+                include_total=request.include_total
             )
         except OutOfRangeError as e:
             return self._handle_errors(context, e, grpc.StatusCode.OUT_OF_RANGE, post_pb2.ListPostsResponse)
@@ -73,8 +107,13 @@ class PostServiceServicer(post_pb2_grpc.PostServiceServicer):
 
     def ViewPost(self, request, context):
         try:
-            result = self.db.increment_views_count(request.post_id, request.user_id)
-            kafka_producer.send_post_viewed_event(request.user_id, request.post_id)
+            if self.view_buffer:
+                post_id, creator_id = self.db.check_post_visible(request.post_id, request.user_id)
+                self.view_buffer.add(post_id)
+                result = post_pb2.ViewPostResponse(success=True, post_creator_id=creator_id)
+            else:
+                result = self.db.increment_views_count(request.post_id, request.user_id)
+            kafka_producer.send_post_viewed_event(request.user_id, request.post_id, result.post_creator_id)
             return result
         except NotFoundError as e:
             return self._handle_errors(context, e, grpc.StatusCode.NOT_FOUND, post_pb2.ViewPostResponse)
@@ -86,7 +125,7 @@ class PostServiceServicer(post_pb2_grpc.PostServiceServicer):
     def LikePost(self, request, context):
         try:
             result = self.db.increment_likes_count(request.post_id, request.user_id)
-            kafka_producer.send_post_liked_event(request.user_id, request.post_id)
+            kafka_producer.send_post_liked_event(request.user_id, request.post_id, result.post_creator_id)
             return result
         except NotFoundError as e:
             return self._handle_errors(context, e, grpc.StatusCode.NOT_FOUND, post_pb2.LikePostResponse)
@@ -105,7 +144,8 @@ class PostServiceServicer(post_pb2_grpc.PostServiceServicer):
                 user_id=request.user_id,
                 post_id=request.post_id,
                 comment_id=result.comment_id,
-                text=request.comment[:100]
+                text=request.comment[:100],
+                creator_id=result.post_creator_id
             )
             return result
         except NotFoundError as e:
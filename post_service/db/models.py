@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ARRAY, Sequence, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ARRAY, Sequence, ForeignKey, Index, text
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -27,6 +27,15 @@ class Post(Base):
 
     comments = relationship("Comment", back_populates="post")
 
+    # Every read filters on "is_private = false OR creator_id = :user_id" and pages by
+    # (created_at, post_id); see migrations/versions/0002_post_visibility_indexes.py
+    __table_args__ = (
+        Index('ix_posts_created_at_post_id', 'created_at', 'post_id'),
+        Index('ix_posts_public_created_at', 'created_at', 'post_id',
+              postgresql_where=text('is_private = false')),
+        Index('ix_posts_creator_id_created_at', 'creator_id', 'created_at', 'post_id'),
+    )
+
 
 class Comment(Base):
     __tablename__ = 'comments'
@@ -42,3 +51,7 @@ class Comment(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     post = relationship("Post", back_populates="comments")
+
+    __table_args__ = (
+        Index('ix_comments_post_id_created_at', 'post_id', 'created_at'),
+    )
@@ -1,13 +1,34 @@
-from typing import Optional, List, Tuple, Dict
+from typing import Optional, List, Tuple, Dict, Iterator
+import base64
+import os
 import grpc
 import time
 from datetime import datetime
-from sqlalchemy import create_engine, and_, or_, func
+from sqlalchemy import create_engine, and_, or_, func, tuple_, update, any_, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError, OperationalError
 from sqlalchemy import text
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
 from proto import post_pb2
-from .models import Base, Post, Comment
+from .models import Post, Comment
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'migrations')
+VIEW_DELTAS_PER_STATEMENT = 1000
+MAX_BATCH_GET_POSTS = 5000
+STREAM_POSTS_CHUNK = 1000
+
+POST_FIELDS = {
+    'post_id': Post.post_id,
+    'title': Post.title,
+    'description': Post.description,
+    'creator_id': Post.creator_id,
+    'created_at': Post.created_at,
+    'updated_at': Post.updated_at,
+    'is_private': Post.is_private,
+    'tags': Post.tags,
+}
 
 
 class PostDBError(Exception):
@@ -35,35 +56,56 @@ class InvalidArgumentError(PostDBError):
     pass
 
 
+def _visible_to(user_id: str):
+    """Posts the user may read: every public post plus their own private ones."""
+    return or_(
+        Post.is_private == False,
+        Post.creator_id == user_id
+    )
+
+
+def encode_cursor(created_at: datetime, post_id: int) -> str:
+    """Opaque keyset cursor pointing right after the given (created_at, post_id) row."""
+    raw = f"{created_at.isoformat()}|{post_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, post_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), int(post_id)
+    except ValueError:
+        raise InvalidArgumentError("Invalid cursor")
+
+
+class SchemaVersionError(PostDBError):
+    """Raised when the database is not migrated to the schema this code expects"""
+    pass
+
+
 class PostDB:
-    def __init__(self, db_url: str, retries: int = 5, delay: int = 5):
-        self.engine = None
-        self.Session = None
+    def __init__(self, db_url: str, retries: int = 30, delay: float = 0.5):
+        self.engine = create_engine(db_url)
+        self.Session = sessionmaker(bind=self.engine)
         for i in range(retries):
             try:
-                self.engine = create_engine(db_url)
-                self.Session = sessionmaker(bind=self.engine)
-                self.recreate_tables()
+                self.check_schema()
                 break
             except OperationalError as e:
                 if i == retries - 1:
                     raise RuntimeError(f"Failed to connect to database after {retries} attempts") from e
                 time.sleep(delay)
 
-    def recreate_tables(self):
-        try:
-            Base.metadata.drop_all(self.engine)
-            with self.engine.connect() as conn:
-                conn.execute(text("CREATE SEQUENCE IF NOT EXISTS posts_post_id_seq START 1"))
-                conn.commit()
-
-            Base.metadata.create_all(self.engine)
-
-            with self.engine.connect() as conn:
-                conn.execute(text("ALTER SEQUENCE posts_post_id_seq RESTART WITH 1"))
-                conn.commit()
-        except SQLAlchemyError as e:
-            raise PostDBError("Error recreating tables") from e
+    def check_schema(self):
+        """Fails fast unless `alembic upgrade head` has been applied; never changes the schema."""
+        expected = set(ScriptDirectory(MIGRATIONS_DIR).get_heads())
+        with self.engine.connect() as conn:
+            current = set(MigrationContext.configure(conn).get_current_heads())
+        if current != expected:
+            raise SchemaVersionError(
+                f"Database schema is at {sorted(current) or 'an empty revision'}, expected {sorted(expected)}. "
+                f"Run `alembic -c post_service/alembic.ini upgrade head`"
+            )
 
     def create_post(self, post_data: post_pb2.CreatePostRequest) -> post_pb2.CreatePostResponse:
         session = self.Session()
@@ -101,10 +143,7 @@ class PostDB:
             post = session.query(Post).filter(
                 and_(
                     Post.post_id == post_id_int,
-                    or_(
-                        Post.is_private == False,
-                        Post.creator_id == user_id
-                    )
+                    _visible_to(user_id)
                 )
             ).first()
 
@@ -130,6 +169,100 @@ class PostDB:
         finally:
             session.close()
 
+    def batch_get_posts(self, post_ids: List[str], user_id: str,
+                        fields: List[str] = ()) -> post_pb2.BatchGetPostsResponse:
+        """
+        Up to MAX_BATCH_GET_POSTS posts in one "post_id = ANY(:ids)" query with the same visibility
+        filter as get_post. Posts come back in request order; missing or private ones are listed
+        in missing_post_ids without telling the two apart.
+        """
+        ids = self._parse_post_ids(post_ids)
+        if len(ids) > MAX_BATCH_GET_POSTS:
+            raise InvalidArgumentError(f"At most {MAX_BATCH_GET_POSTS} post IDs per request, use StreamPosts")
+        names = self._post_field_names(fields)
+
+        session = self.Session()
+        try:
+            found = self._fetch_posts(session, ids, user_id, names)
+            return post_pb2.BatchGetPostsResponse(
+                posts=[found[post_id] for post_id in ids if post_id in found],
+                missing_post_ids=[str(post_id) for post_id in ids if post_id not in found]
+            )
+        except SQLAlchemyError as e:
+            raise PostDBError("Database error while fetching posts") from e
+        finally:
+            session.close()
+
+    def iter_posts(self, post_ids: List[str], user_id: str, fields: List[str] = ()) -> Iterator[post_pb2.Post]:
+        """Same as batch_get_posts for any number of IDs, queried STREAM_POSTS_CHUNK at a time."""
+        ids = self._parse_post_ids(post_ids)
+        names = self._post_field_names(fields)
+
+        session = self.Session()
+        try:
+            for start in range(0, len(ids), STREAM_POSTS_CHUNK):
+                chunk = ids[start:start + STREAM_POSTS_CHUNK]
+                found = self._fetch_posts(session, chunk, user_id, names)
+                for post_id in chunk:
+                    if post_id in found:
+                        yield found[post_id]
+        except SQLAlchemyError as e:
+            raise PostDBError("Database error while streaming posts") from e
+        finally:
+            session.close()
+
+    def get_post_creators(self, post_ids: List[str]) -> Dict[str, str]:
+        """
+        post_id -> creator_id of the existing posts among post_ids, private ones included. Only for
+        internal callers: nothing here is checked against the visibility rules.
+        """
+        ids = self._parse_post_ids(post_ids)
+        if len(ids) > MAX_BATCH_GET_POSTS:
+            raise InvalidArgumentError(f"At most {MAX_BATCH_GET_POSTS} post IDs per request")
+
+        session = self.Session()
+        try:
+            rows = session.query(Post.post_id, Post.creator_id).filter(
+                Post.post_id == any_(bindparam('post_ids', ids, type_=ARRAY(Integer)))
+            ).all()
+            return {str(row.post_id): row.creator_id for row in rows}
+        except SQLAlchemyError as e:
+            raise PostDBError("Database error while fetching post creators") from e
+        finally:
+            session.close()
+
+    def _parse_post_ids(self, post_ids: List[str]) -> List[int]:
+        try:
+            return list(dict.fromkeys(int(post_id) for post_id in post_ids))
+        except ValueError:
+            raise InvalidArgumentError("Invalid post ID format")
+
+    def _post_field_names(self, fields: List[str]) -> List[str]:
+        unknown = set(fields) - POST_FIELDS.keys()
+        if unknown:
+            raise InvalidArgumentError(f"Unknown post fields: {', '.join(sorted(unknown))}")
+        return [name for name in POST_FIELDS if name == 'post_id' or not fields or name in fields]
+
+    def _fetch_posts(self, session, ids: List[int], user_id: str, names: List[str]) -> Dict[int, post_pb2.Post]:
+        rows = session.query(*[POST_FIELDS[name] for name in names]).filter(
+            Post.post_id == any_(bindparam('post_ids', ids, type_=ARRAY(Integer))),
+            _visible_to(user_id)
+        ).all()
+        return {row.post_id: self._row_to_pb(row, names) for row in rows}
+
+    def _row_to_pb(self, row, names: List[str]) -> post_pb2.Post:
+        values = {}
+        for name in names:
+            value = getattr(row, name)
+            if name == 'post_id':
+                value = str(value)
+            elif name in ('created_at', 'updated_at'):
+                value = value.isoformat() if value else ""
+            elif value is None:
+                continue
+            values[name] = value
+        return post_pb2.Post(**values)
+
     def update_post(self, post_data: post_pb2.UpdatePostRequest) -> post_pb2.UpdatePostResponse:
         session = self.Session()
         try:
@@ -190,17 +323,18 @@ class PostDB:
         finally:
             session.close()
 
-    def list_posts(self, user_id: str, page: int, per_page: int) -> post_pb2.ListPostsResponse:
+    def list_posts(self, user_id: str, page: int, per_page: int, cursor: str = "",
+                   use_cursor: bool = False, include_total: bool = False) -> post_pb2.ListPostsResponse:
+        if use_cursor or cursor:
+            return self._list_posts_after_cursor(user_id, per_page, cursor, include_total)
+
         session = self.Session()
         try:
             if page <= 0 or per_page <= 0:
                 raise InvalidArgumentError("Page and per_page must be positive integers")
 
             total = session.query(func.count(Post.post_id)).filter(
-                or_(
-                    Post.is_private == False,
-                    Post.creator_id == user_id
-                )
+                _visible_to(user_id)
             ).scalar()
 
             last_page = (total + per_page - 1) // per_page if total > 0 else 1
@@ -209,15 +343,16 @@ class PostDB:
 
             offset = (page - 1) * per_page
             posts = session.query(Post).filter(
-                or_(
-                    Post.is_private == False,
-                    Post.creator_id == user_id
-                )
-            ).order_by(Post.created_at.asc()
+                _visible_to(user_id)
+            ).order_by(Post.created_at.asc(), Post.post_id.asc()
                        ).limit(per_page
                                ).offset(offset
                                         ).all()
 
+            next_cursor = ""
+            if posts and offset + len(posts) < total:
+                next_cursor = encode_cursor(posts[-1].created_at, posts[-1].post_id)
+
             return post_pb2.ListPostsResponse(
                 posts=[self._post_to_list_pb(p) for p in posts],
                 total=total,
@@ -225,7 +360,41 @@ class PostDB:
                 per_page=per_page,
                 last_page=last_page,
                 from_=offset + 1 if total > 0 else 0,
-                to_=min(offset + per_page, total)
+                to_=min(offset + per_page, total),
+                next_cursor=next_cursor
+            )
+        except SQLAlchemyError as e:
+            raise PostDBError("Database error while listing posts") from e
+        finally:
+            session.close()
+
+    def _list_posts_after_cursor(self, user_id: str, per_page: int, cursor: str,
+                                 include_total: bool) -> post_pb2.ListPostsResponse:
+        session = self.Session()
+        try:
+            if per_page <= 0:
+                raise InvalidArgumentError("Per_page must be a positive integer")
+
+            query = session.query(Post).filter(_visible_to(user_id))
+            if cursor:
+                created_at, post_id = decode_cursor(cursor)
+                query = query.filter(tuple_(Post.created_at, Post.post_id) > tuple_(created_at, post_id))
+
+            posts = query.order_by(Post.created_at.asc(), Post.post_id.asc()).limit(per_page + 1).all()
+            has_more = len(posts) > per_page
+            posts = posts[:per_page]
+
+            total = 0
+            if include_total:
+                total = session.query(func.count(Post.post_id)).filter(
+                    _visible_to(user_id)
+                ).scalar()
+
+            return post_pb2.ListPostsResponse(
+                posts=[self._post_to_list_pb(p) for p in posts],
+                total=total,
+                per_page=per_page,
+                next_cursor=encode_cursor(posts[-1].created_at, posts[-1].post_id) if has_more else ""
             )
         except SQLAlchemyError as e:
             raise PostDBError("Database error while listing posts") from e
@@ -267,14 +436,18 @@ class PostDB:
                 created_at=datetime.utcnow()
             )
             session.add(new_comment)
-            session.flush()
-
-            post.comments_count += 1
+            session.execute(
+                update(Post)
+                .where(Post.post_id == post.post_id)
+                .values(comments_count=func.coalesce(Post.comments_count, 0) + 1)
+                .execution_options(synchronize_session=False)
+            )
             session.commit()
 
             return post_pb2.CommentPostResponse(
                 comment_id=str(new_comment.comment_id),
-                created_at=new_comment.created_at.isoformat()
+                created_at=new_comment.created_at.isoformat(),
+                post_creator_id=post.creator_id
             )
         except ValueError:
             raise InvalidArgumentError("Invalid post ID format")
@@ -346,35 +519,110 @@ class PostDB:
             session.close()
 
     def increment_views_count(self, post_id: str, user_id: str) -> post_pb2.ViewPostResponse:
-        session = self.Session()
         try:
-            post = self._check_post_access(session, int(post_id), user_id)
-            post.views_count += 1
-            session.commit()
-            return post_pb2.ViewPostResponse(success=True)
+            creator_id = self._increment_counter(Post.views_count, int(post_id), user_id)
+            return post_pb2.ViewPostResponse(success=True, post_creator_id=creator_id)
         except ValueError:
             raise InvalidArgumentError("Invalid post ID format")
         except SQLAlchemyError as e:
-            session.rollback()
             raise PostDBError("Database error while incrementing views") from e
+
+    def check_post_visible(self, post_id: str, user_id: str) -> Tuple[int, str]:
+        """Primary-key lookup of the visibility columns only; returns the numeric post ID and its creator."""
+        session = self.Session()
+        try:
+            post_id_int = int(post_id)
+            post = session.query(Post.is_private, Post.creator_id).filter(Post.post_id == post_id_int).first()
+            if not post:
+                raise NotFoundError("Post not found")
+            if post.is_private and post.creator_id != user_id:
+                raise AccessDeniedError("Access to post denied")
+            return post_id_int, post.creator_id
+        except ValueError:
+            raise InvalidArgumentError("Invalid post ID format")
+        except SQLAlchemyError as e:
+            raise PostDBError("Database error while checking post access") from e
         finally:
             session.close()
 
-    def increment_likes_count(self, post_id: str, user_id: str) -> post_pb2.LikePostResponse:
+    def apply_view_deltas(self, deltas: Dict[int, int]) -> int:
+        """
+        Adds buffered views with "UPDATE posts ... FROM (VALUES ...)", up to VIEW_DELTAS_PER_STATEMENT
+        posts per statement, in one transaction. Rows are visited in post_id order so concurrent
+        flushers lock them in the same order. Returns the number of posts updated.
+        """
+        if not deltas:
+            return 0
+        items = sorted(deltas.items())
         session = self.Session()
         try:
-            post = self._check_post_access(session, int(post_id), user_id)
-            post.likes_count += 1
+            updated = 0
+            for start in range(0, len(items), VIEW_DELTAS_PER_STATEMENT):
+                chunk = items[start:start + VIEW_DELTAS_PER_STATEMENT]
+                params = {}
+                values = []
+                for i, (post_id, delta) in enumerate(chunk):
+                    params[f'post_id_{i}'] = int(post_id)
+                    params[f'delta_{i}'] = int(delta)
+                    values.append(f"(CAST(:post_id_{i} AS INTEGER), CAST(:delta_{i} AS INTEGER))")
+                result = session.execute(text(
+                    "UPDATE posts SET views_count = COALESCE(posts.views_count, 0) + v.delta "
+                    f"FROM (VALUES {', '.join(values)}) AS v(post_id, delta) "
+                    "WHERE posts.post_id = v.post_id"
+                ), params)
+                updated += result.rowcount
             session.commit()
-            return post_pb2.LikePostResponse(success=True)
+            return updated
+        except SQLAlchemyError as e:
+            session.rollback()
+            raise PostDBError("Database error while applying buffered views") from e
+        finally:
+            session.close()
+
+    def increment_likes_count(self, post_id: str, user_id: str) -> post_pb2.LikePostResponse:
+        try:
+            creator_id = self._increment_counter(Post.likes_count, int(post_id), user_id)
+            return post_pb2.LikePostResponse(success=True, post_creator_id=creator_id)
         except ValueError:
             raise InvalidArgumentError("Invalid post ID format")
         except SQLAlchemyError as e:
-            session.rollback()
             raise PostDBError("Database error while incrementing likes") from e
+
+    def _increment_counter(self, column, post_id: int, user_id: str) -> str:
+        """
+        Single-statement "SET counter = counter + 1 ... RETURNING creator_id" guarded by the
+        visibility filter, so concurrent increments never lose updates and the row lock is
+        held only for the statement itself. Returns the post's creator for the Kafka event.
+        """
+        session = self.Session()
+        try:
+            creator_id = session.execute(
+                update(Post)
+                .where(Post.post_id == post_id, _visible_to(user_id))
+                .values({column: func.coalesce(column, 0) + 1})
+                .returning(Post.creator_id)
+                .execution_options(synchronize_session=False)
+            ).scalar()
+
+            if creator_id is None:
+                session.rollback()
+                raise self._access_error(session, post_id)
+
+            session.commit()
+            return creator_id
+        except SQLAlchemyError:
+            session.rollback()
+            raise
         finally:
             session.close()
 
+    def _access_error(self, session, post_id: int) -> PostDBError:
+        """Tells apart a missing post from a private one after a guarded statement matched no rows."""
+        exists = session.query(Post.post_id).filter(Post.post_id == post_id).first()
+        if not exists:
+            return NotFoundError("Post not found")
+        return AccessDeniedError("Access to post denied")
+
     def close(self):
         if self.engine:
             self.engine.dispose()
@@ -0,0 +1,108 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+from .post_db import PostDB, PostDBError
+
+logger = logging.getLogger('PostService.ViewBuffer')
+
+
+class ViewCounterBuffer:
+    """
+    Write-behind buffer for posts.views_count. ViewPost only merges the view into per-post
+    deltas; a background thread applies them with PostDB.apply_view_deltas every
+    flush_interval seconds, or earlier once max_pending views are waiting.
+    """
+
+    def __init__(self, db: PostDB, flush_interval: float = 1.0, max_pending: int = 10000):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[int, int] = defaultdict(int)
+        self._pending_views = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._flushes = 0
+        self._flush_errors = 0
+        self._flushed_views = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='view-buffer-flusher', daemon=True)
+            self._thread.start()
+        return self
+
+    def add(self, post_id: int, count: int = 1):
+        with self._lock:
+            self._pending[post_id] += count
+            self._pending_views += count
+            full = self._pending_views >= self.max_pending
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Applies everything buffered so far; on failure the deltas are merged back for the next attempt."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                deltas, views = dict(self._pending), self._pending_views
+                self._pending, self._pending_views = defaultdict(int), 0
+
+            started = time.perf_counter()
+            try:
+                self.db.apply_view_deltas(deltas)
+            except PostDBError:
+                with self._lock:
+                    for post_id, delta in deltas.items():
+                        self._pending[post_id] += delta
+                    self._pending_views += views
+                self._flush_errors += 1
+                logger.error(f"Failed to flush {views} views of {len(deltas)} posts", exc_info=True)
+                return 0
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._flushes += 1
+            self._flushed_views += views
+            self._last_flush_ms = elapsed_ms
+            self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+            logger.debug(f"Flushed {views} views of {len(deltas)} posts in {elapsed_ms:.1f} ms")
+            return views
+
+    def close(self):
+        """Stops the flusher and writes out whatever is still buffered."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            pending_posts, pending_views = len(self._pending), self._pending_views
+        return {
+            'pending_posts': pending_posts,
+            'pending_views': pending_views,
+            'flushes': self._flushes,
+            'flush_errors': self._flush_errors,
+            'flushed_views': self._flushed_views,
+            'last_flush_ms': round(self._last_flush_ms, 3),
+            'max_flush_ms': round(self._max_flush_ms, 3),
+            'avg_flush_ms': round(self._total_flush_ms / self._flushes, 3) if self._flushes else 0.0,
+        }
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if not self._stopped.is_set():
+                self.flush()
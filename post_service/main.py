@@ -1,4 +1,6 @@
-from concurrent import futures
+import multiprocessing
+import signal
+import threading
 import time
 import grpc
 from grpc_health.v1 import health, health_pb2, health_pb2_grpc
@@ -6,42 +8,224 @@ from proto import post_pb2_grpc
 from proto.post_pb2_grpc import add_PostServiceServicer_to_server
 from api.post_grpc_service import PostServiceServicer
 from db.post_db import PostDB
+from db.view_buffer import ViewCounterBuffer
+from broker.kafka_producer import kafka_producer, KAFKA_FLUSH_TIMEOUT_SECONDS
+import grpc_server
 import sys
 import os
 import logging
+from typing import Optional
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+GRPC_PORT = int(os.getenv("GRPC_PORT", "50051"))
+GRPC_MAX_WORKERS = int(os.getenv("GRPC_MAX_WORKERS", "10"))
+# Calls above the limit are rejected with RESOURCE_EXHAUSTED instead of queueing; 0 means no limit
+GRPC_MAX_CONCURRENT_RPCS = int(os.getenv("GRPC_MAX_CONCURRENT_RPCS", "0")) or None
+GRPC_SO_REUSEPORT = os.getenv("GRPC_SO_REUSEPORT", "false").lower() in ("1", "true", "yes")
+# More than one process turns main.py into a launcher of that many servers sharing GRPC_PORT
+GRPC_PROCESSES = int(os.getenv("GRPC_PROCESSES", "1"))
+# Every process reports SERVING only while at least this many of them serve (default: a majority),
+# so a single bad process costs capacity rather than availability
+GRPC_MIN_HEALTHY_PROCESSES = int(os.getenv("GRPC_MIN_HEALTHY_PROCESSES", str(GRPC_PROCESSES // 2 + 1)))
+HEALTH_CHECK_INTERVAL_SECONDS = 1
+# A dead server process is restarted after a delay doubling from RESTART_BACKOFF_SECONDS up to
+# RESTART_BACKOFF_MAX_SECONDS; a process that stays up that long starts again from the shortest delay.
+# After MAX_RESTARTS restarts in a row the process is given up on, and the launcher exits with an error
+# once fewer than GRPC_MIN_HEALTHY_PROCESSES processes are left.
+RESTART_BACKOFF_SECONDS = float(os.getenv("GRPC_RESTART_BACKOFF_SECONDS", "1"))
+RESTART_BACKOFF_MAX_SECONDS = float(os.getenv("GRPC_RESTART_BACKOFF_MAX_SECONDS", "30"))
+MAX_RESTARTS = int(os.getenv("GRPC_MAX_RESTARTS", "5"))
+# On SIGTERM health turns NOT_SERVING for DRAIN_SECONDS, then in-flight calls get SHUTDOWN_GRACE_SECONDS
+DRAIN_SECONDS = float(os.getenv("GRPC_DRAIN_SECONDS", "1"))
+SHUTDOWN_GRACE_SECONDS = float(os.getenv("GRPC_SHUTDOWN_GRACE_SECONDS", "5"))
+METRICS_LOG_INTERVAL_SECONDS = 60
 
-def serve():
+
+def create_server() -> grpc.Server:
+    return grpc_server.create_server(GRPC_MAX_WORKERS, GRPC_SO_REUSEPORT or GRPC_PROCESSES > 1,
+                                     GRPC_MAX_CONCURRENT_RPCS)
+
+
+def create_view_buffer(db: PostDB):
+    if os.getenv("VIEW_BUFFER_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return ViewCounterBuffer(
+        db,
+        flush_interval=int(os.getenv("VIEW_BUFFER_FLUSH_INTERVAL_MS", "1000")) / 1000,
+        max_pending=int(os.getenv("VIEW_BUFFER_MAX_PENDING", "10000"))
+    ).start()
+
+
+def setup_logging():
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
-    logger = logging.getLogger('PostService')
+
+
+def group_health(worker_status) -> int:
+    """Health of a group of server processes, the same whichever of them answers the check."""
+    if sum(worker_status) >= GRPC_MIN_HEALTHY_PROCESSES:
+        return health_pb2.HealthCheckResponse.SERVING
+    return health_pb2.HealthCheckResponse.NOT_SERVING
+
+
+def report_group_health(health_servicer: health.HealthServicer, worker_status, stop_event: threading.Event):
+    while not stop_event.wait(HEALTH_CHECK_INTERVAL_SECONDS):
+        health_servicer.set('', group_health(worker_status))
+
+
+def serve(worker_index: Optional[int] = None, worker_status=None):
+    """
+    Runs one gRPC server until SIGTERM/SIGINT. Launched by run_workers, the server marks itself up in
+    worker_status[worker_index] and its health check reports the whole group instead of itself.
+    """
+    setup_logging()
+    logger = logging.getLogger('PostService' if worker_index is None else f'PostService[{worker_index}]')
     server = None
+    health_servicer = None
+    db = None
+    view_buffer = None
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
     try:
         db = PostDB(os.getenv("DATABASE_URL", "postgresql://user:password@db:5432/post_db"))
-        server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-        add_PostServiceServicer_to_server(PostServiceServicer(db), server)
+        view_buffer = create_view_buffer(db)
+        server = create_server()
+        add_PostServiceServicer_to_server(PostServiceServicer(db, view_buffer), server)
         health_servicer = health.HealthServicer()
-        health_servicer.set('', health_pb2.HealthCheckResponse.SERVING)
         health_pb2_grpc.add_HealthServicer_to_server(health_servicer, server)
-        server.add_insecure_port('[::]:50051')
+        server.add_insecure_port(f'[::]:{GRPC_PORT}')
         server.start()
-        logger.info("Server started on port 50051")
-        while True:
-            time.sleep(60)
+        if worker_status is None:
+            health_servicer.set('', health_pb2.HealthCheckResponse.SERVING)
+        else:
+            worker_status[worker_index] = 1
+            health_servicer.set('', group_health(worker_status))
+            threading.Thread(target=report_group_health, args=(health_servicer, worker_status, stop_event),
+                             daemon=True).start()
+        logger.info(f"Server started on port {GRPC_PORT} with {GRPC_MAX_WORKERS} workers")
+        while not stop_event.wait(METRICS_LOG_INTERVAL_SECONDS):
+            if view_buffer:
+                logger.info(f"View buffer: {view_buffer.metrics()}")
+            logger.info(f"Kafka producer: {kafka_producer.metrics()}")
+        logger.info("Shutting down")
 
     except Exception as e:
         logger.error(f"Server failed: {str(e)}", exc_info=True)
         raise
 
     finally:
+        if worker_status is not None:
+            worker_status[worker_index] = 0
+        if health_servicer:
+            # Lets health-checking clients move new calls to other replicas before the port closes
+            health_servicer.enter_graceful_shutdown()
+            time.sleep(DRAIN_SECONDS)
         if server:
-            server.stop(0)
-        db.close()
+            server.stop(SHUTDOWN_GRACE_SECONDS).wait()
+        if view_buffer:
+            view_buffer.close()
+            logger.info(f"View buffer flushed: {view_buffer.metrics()}")
+        kafka_producer.close()
+        if db:
+            db.close()
+
+
+def restart_delay(restarts: int) -> float:
+    return min(RESTART_BACKOFF_SECONDS * 2 ** (restarts - 1), RESTART_BACKOFF_MAX_SECONDS)
+
+
+def supervise(start, workers: list, processes: int, worker_status, stop_event: threading.Event) -> bool:
+    """
+    Starts `processes` workers with start(index) into `workers` and restarts the ones that die until
+    stop_event is set. Returns False if it stopped early, after giving up on too many of them.
+    """
+    logger = logging.getLogger('PostServiceLauncher')
+    workers[:] = [start(i) for i in range(processes)]
+    started = [time.monotonic()] * processes
+    restarts = [0] * processes
+    restart_at = [None] * processes
+    given_up = set()
+    last_report = time.monotonic()
+    while not stop_event.wait(HEALTH_CHECK_INTERVAL_SECONDS):
+        now = time.monotonic()
+        for i, worker in enumerate(workers):
+            if i in given_up or worker.is_alive():
+                continue
+            if restart_at[i] is None:
+                worker_status[i] = 0
+                if now - started[i] >= RESTART_BACKOFF_MAX_SECONDS:
+                    restarts[i] = 0
+                restarts[i] += 1
+                if restarts[i] > MAX_RESTARTS:
+                    given_up.add(i)
+                    logger.error(f"Server process {i} exited with code {worker.exitcode} "
+                                 f"after {MAX_RESTARTS} restarts, giving up on it")
+                    continue
+                restart_at[i] = now + restart_delay(restarts[i])
+                logger.warning(f"Server process {i} exited with code {worker.exitcode}, "
+                               f"restarting in {restart_delay(restarts[i]):g}s")
+            elif now >= restart_at[i]:
+                workers[i] = start(i)
+                started[i] = now
+                restart_at[i] = None
+        if processes - len(given_up) < GRPC_MIN_HEALTHY_PROCESSES:
+            logger.error(f"Only {processes - len(given_up)} of {processes} server processes are left, "
+                         f"{GRPC_MIN_HEALTHY_PROCESSES} are needed")
+            return False
+        if time.monotonic() - last_report >= METRICS_LOG_INTERVAL_SECONDS:
+            last_report = time.monotonic()
+            logger.info(f"Serving processes: {sum(worker_status)}/{processes}")
+    return True
+
+
+def run_workers(processes: int):
+    """
+    Runs `processes` servers on GRPC_PORT with SO_REUSEPORT, so the kernel spreads client connections
+    over them and protobuf/ORM work is not bound to one interpreter's GIL. Each server has its own
+    engine, view buffer and Kafka producer. Workers that die are restarted with backoff (see supervise);
+    SIGTERM/SIGINT is passed on to all of them and they drain as a single server would. Exits with
+    status 1 when too few workers stay up, so the container is restarted instead.
+
+    Workers are spawned rather than forked: the Kafka producer is created on import, and neither
+    librdkafka nor gRPC state survives a fork.
+    """
+    setup_logging()
+    logger = logging.getLogger('PostServiceLauncher')
+    # The launcher itself never sends events
+    kafka_producer.close()
+    context = multiprocessing.get_context('spawn')
+    worker_status = context.Array('b', processes)
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+
+    def start(index: int):
+        worker = context.Process(target=serve, args=(index, worker_status), name=f'post-service-{index}')
+        worker.start()
+        return worker
+
+    logger.info(f"Starting {processes} server processes on port {GRPC_PORT}")
+    workers = []
+    healthy = supervise(start, workers, processes, worker_status, stop_event)
+
+    logger.info("Stopping server processes")
+    for worker in workers:
+        worker.terminate()
+    for worker in workers:
+        worker.join(DRAIN_SECONDS + SHUTDOWN_GRACE_SECONDS + KAFKA_FLUSH_TIMEOUT_SECONDS)
+        if worker.is_alive():
+            logger.warning(f"{worker.name} did not stop in time, killing it")
+            worker.kill()
+    if not healthy:
+        sys.exit(1)
 
 
 if __name__ == '__main__':
-    serve()
+    if GRPC_PROCESSES > 1:
+        run_workers(GRPC_PROCESSES)
+    else:
+        serve()
@@ -0,0 +1,55 @@
+"""Initial posts and comments schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-05-25 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by the former metadata.create_all() at startup already have these tables;
+    # they are left as they are and the revision is recorded on top of them. Offline (--sql)
+    # there is no database to look at, and the script creates everything.
+    existing = set() if op.get_context().as_sql else set(sa.inspect(op.get_bind()).get_table_names())
+    op.execute(sa.schema.CreateSequence(sa.Sequence('posts_post_id_seq', start=1), if_not_exists=True))
+    op.execute(sa.schema.CreateSequence(sa.Sequence('comments_id_seq', start=1), if_not_exists=True))
+
+    if 'posts' not in existing:
+        op.create_table(
+            'posts',
+            sa.Column('post_id', sa.Integer(), sa.Sequence('posts_post_id_seq'), primary_key=True),
+            sa.Column('title', sa.String(255), nullable=False),
+            sa.Column('description', sa.Text()),
+            sa.Column('creator_id', sa.String(50), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.Column('is_private', sa.Boolean()),
+            sa.Column('tags', sa.ARRAY(sa.String()), nullable=False),
+            sa.Column('views_count', sa.Integer()),
+            sa.Column('likes_count', sa.Integer()),
+            sa.Column('comments_count', sa.Integer()),
+        )
+    if 'comments' not in existing:
+        op.create_table(
+            'comments',
+            sa.Column('comment_id', sa.Integer(), sa.Sequence('comments_id_seq'), primary_key=True),
+            sa.Column('post_id', sa.Integer(), sa.ForeignKey('posts.post_id'), nullable=False),
+            sa.Column('user_id', sa.String(50), nullable=False),
+            sa.Column('text', sa.Text(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table('comments')
+    op.drop_table('posts')
+    op.execute(sa.schema.DropSequence(sa.Sequence('comments_id_seq')))
+    op.execute(sa.schema.DropSequence(sa.Sequence('posts_post_id_seq')))
@@ -0,0 +1,41 @@
+"""Indexes for the post visibility filter and comment pages
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-05-26 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY keeps posts/comments writable while the indexes are built,
+    # but it cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_posts_created_at_post_id', 'posts', ['created_at', 'post_id'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_posts_public_created_at', 'posts', ['created_at', 'post_id'],
+                        postgresql_where=sa.text('is_private = false'),
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_posts_creator_id_created_at', 'posts', ['creator_id', 'created_at', 'post_id'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_comments_post_id_created_at', 'comments', ['post_id', 'created_at'],
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_comments_post_id_created_at', table_name='comments',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_posts_creator_id_created_at', table_name='posts',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_posts_public_created_at', table_name='posts',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_posts_created_at_post_id', table_name='posts',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,184 @@
+import threading
+import time
+import grpc
+from grpc_health.v1 import health, health_pb2
+import pytest
+import main
+
+SLOW_SECONDS = 0.3
+
+
+def slow_call(request, context):
+    time.sleep(SLOW_SECONDS)
+    return request
+
+
+@pytest.fixture
+def server_factory(monkeypatch):
+    servers = []
+
+    def create(**settings):
+        for name, value in settings.items():
+            monkeypatch.setattr(main, name, value)
+        server = main.create_server()
+        server.add_generic_rpc_handlers([grpc.method_handlers_generic_handler(
+            'test.Slow', {'Call': grpc.unary_unary_rpc_method_handler(slow_call)}
+        )])
+        servers.append(server)
+        return server
+
+    yield create
+    for server in servers:
+        server.stop(0)
+
+
+def test_calls_above_concurrency_limit_are_rejected(server_factory):
+    server = server_factory(GRPC_MAX_CONCURRENT_RPCS=1)
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    codes = []
+
+    def call():
+        with grpc.insecure_channel(f'127.0.0.1:{port}') as channel:
+            try:
+                channel.unary_unary('/test.Slow/Call')(b'x', timeout=5)
+                codes.append(grpc.StatusCode.OK)
+            except grpc.RpcError as e:
+                codes.append(e.code())
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert codes.count(grpc.StatusCode.OK) >= 1
+    assert grpc.StatusCode.RESOURCE_EXHAUSTED in codes
+
+
+def test_so_reuseport_lets_processes_share_the_port(server_factory):
+    port = server_factory(GRPC_SO_REUSEPORT=True).add_insecure_port('127.0.0.1:0')
+
+    assert server_factory(GRPC_SO_REUSEPORT=True).add_insecure_port(f'127.0.0.1:{port}') == port
+
+
+def test_port_is_not_shared_without_so_reuseport(server_factory):
+    port = server_factory(GRPC_SO_REUSEPORT=False).add_insecure_port('127.0.0.1:0')
+
+    with pytest.raises(RuntimeError):
+        server_factory(GRPC_SO_REUSEPORT=False).add_insecure_port(f'127.0.0.1:{port}')
+
+
+def test_in_flight_call_finishes_during_graceful_stop(server_factory):
+    server = server_factory()
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+
+    with grpc.insecure_channel(f'127.0.0.1:{port}') as channel:
+        future = channel.unary_unary('/test.Slow/Call').future(b'x', timeout=5)
+        time.sleep(SLOW_SECONDS / 3)
+        server.stop(main.SHUTDOWN_GRACE_SECONDS)
+
+        assert future.result() == b'x'
+
+
+def test_group_health_needs_min_healthy_processes(monkeypatch):
+    monkeypatch.setattr(main, 'GRPC_MIN_HEALTHY_PROCESSES', 2)
+
+    assert main.group_health([1, 1, 0]) == health_pb2.HealthCheckResponse.SERVING
+    assert main.group_health([1, 0, 0]) == health_pb2.HealthCheckResponse.NOT_SERVING
+
+
+def test_every_process_reports_group_health_until_shutdown(monkeypatch):
+    monkeypatch.setattr(main, 'GRPC_MIN_HEALTHY_PROCESSES', 2)
+    monkeypatch.setattr(main, 'HEALTH_CHECK_INTERVAL_SECONDS', 0.01)
+    worker_status = [1, 1]
+    health_servicer = health.HealthServicer()
+    stop_event = threading.Event()
+    threading.Thread(target=main.report_group_health, args=(health_servicer, worker_status, stop_event),
+                     daemon=True).start()
+
+    def status():
+        time.sleep(0.1)
+        return health_servicer.Check(health_pb2.HealthCheckRequest(), None).status
+
+    assert status() == health_pb2.HealthCheckResponse.SERVING
+    worker_status[1] = 0
+    assert status() == health_pb2.HealthCheckResponse.NOT_SERVING
+    worker_status[1] = 1
+    assert status() == health_pb2.HealthCheckResponse.SERVING
+
+    health_servicer.enter_graceful_shutdown()
+    assert status() == health_pb2.HealthCheckResponse.NOT_SERVING
+    stop_event.set()
+
+
+class FakeWorker:
+    exitcode = 1
+
+    def __init__(self, lifetime: float):
+        self.dies_at = time.monotonic() + lifetime
+
+    def is_alive(self):
+        return time.monotonic() < self.dies_at
+
+
+@pytest.fixture
+def fast_restarts(monkeypatch):
+    monkeypatch.setattr(main, 'HEALTH_CHECK_INTERVAL_SECONDS', 0.005)
+    monkeypatch.setattr(main, 'RESTART_BACKOFF_SECONDS', 0.02)
+    monkeypatch.setattr(main, 'RESTART_BACKOFF_MAX_SECONDS', 0.16)
+    monkeypatch.setattr(main, 'MAX_RESTARTS', 3)
+    monkeypatch.setattr(main, 'GRPC_MIN_HEALTHY_PROCESSES', 2)
+
+
+def test_crashing_worker_is_restarted_with_backoff_then_given_up(fast_restarts):
+    starts = []
+
+    def start(index):
+        if index == 0:
+            starts.append(time.monotonic())
+            return FakeWorker(0)
+        return FakeWorker(60)
+
+    assert main.supervise(start, [], 2, [0, 0], threading.Event()) is False
+
+    assert len(starts) == 1 + main.MAX_RESTARTS
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert all(gap >= delay * 0.9 for gap, delay in zip(gaps, [0.02, 0.04, 0.08]))
+
+
+def test_given_up_worker_only_costs_capacity_while_a_majority_serves(fast_restarts):
+    stop_event = threading.Event()
+    worker_status = [0, 0, 0]
+
+    def start(index):
+        if index == 0:
+            return FakeWorker(0)
+        worker_status[index] = 1
+        return FakeWorker(60)
+
+    threading.Timer(0.5, stop_event.set).start()
+    assert main.supervise(start, [], 3, worker_status, stop_event) is True
+    assert main.group_health(worker_status) == health_pb2.HealthCheckResponse.SERVING
+
+
+def test_worker_that_stays_up_gets_fresh_restarts(fast_restarts):
+    starts = []
+    stop_event = threading.Event()
+
+    def start(index):
+        if index == 0:
+            starts.append(time.monotonic())
+            if len(starts) == 2 + main.MAX_RESTARTS:
+                stop_event.set()
+            # Outlives RESTART_BACKOFF_MAX_SECONDS, so every death counts as the first
+            return FakeWorker(0.17)
+        return FakeWorker(60)
+
+    assert main.supervise(start, [], 2, [0, 0], stop_event) is True
+    assert len(starts) == 2 + main.MAX_RESTARTS
+
+
+def test_restart_delay_doubles_up_to_the_maximum(fast_restarts):
+    assert [main.restart_delay(n) for n in range(1, 6)] == [0.02, 0.04, 0.08, 0.16, 0.16]
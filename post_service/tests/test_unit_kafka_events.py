@@ -35,7 +35,7 @@ def servicer_with_mock_kafka():
 
 def test_view_post_sends_kafka_event(servicer_with_mock_kafka):
     servicer, mock_db, mock_kafka = servicer_with_mock_kafka
-    mock_db.increment_views_count.return_value = post_pb2.ViewPostResponse(success=True)
+    mock_db.increment_views_count.return_value = post_pb2.ViewPostResponse(success=True, post_creator_id="author1")
 
     request = post_pb2.ViewPostRequest(
         post_id="123",
@@ -44,12 +44,12 @@ def test_view_post_sends_kafka_event(servicer_with_mock_kafka):
 
     response = servicer.ViewPost(request, None)
     assert response.success is True
-    mock_kafka.send_post_viewed_event.assert_called_once_with("user456", "123")
+    mock_kafka.send_post_viewed_event.assert_called_once_with("user456", "123", "author1")
 
 
 def test_like_post_sends_kafka_event(servicer_with_mock_kafka):
     servicer, mock_db, mock_kafka = servicer_with_mock_kafka
-    mock_db.increment_likes_count.return_value = post_pb2.LikePostResponse(success=True)
+    mock_db.increment_likes_count.return_value = post_pb2.LikePostResponse(success=True, post_creator_id="author1")
 
     request = post_pb2.LikePostRequest(
         post_id="123",
@@ -58,14 +58,15 @@ def test_like_post_sends_kafka_event(servicer_with_mock_kafka):
 
     response = servicer.LikePost(request, None)
     assert response.success is True
-    mock_kafka.send_post_liked_event.assert_called_once_with("user456", "123")
+    mock_kafka.send_post_liked_event.assert_called_once_with("user456", "123", "author1")
 
 
 def test_comment_post_sends_kafka_event(servicer_with_mock_kafka):
     servicer, mock_db, mock_kafka = servicer_with_mock_kafka
     mock_db.create_comment.return_value = post_pb2.CommentPostResponse(
         comment_id="789",
-        created_at=datetime.utcnow().isoformat()
+        created_at=datetime.utcnow().isoformat(),
+        post_creator_id="author1"
     )
 
     request = post_pb2.CommentPostRequest(
@@ -80,7 +81,8 @@ def test_comment_post_sends_kafka_event(servicer_with_mock_kafka):
         user_id="user456",
         post_id="123",
         comment_id="789",
-        text="Test comment"
+        text="Test comment",
+        creator_id="author1"
     )
 
 
@@ -114,3 +116,125 @@ def test_comment_post_empty_text(servicer_with_mock_kafka, dummy_context):
 
     assert dummy_context.code == grpc.StatusCode.INVALID_ARGUMENT
     mock_kafka.send_post_commented_event.assert_not_called()
+
+
+def test_view_post_buffered_sends_kafka_event(servicer_with_mock_kafka):
+    servicer, mock_db, mock_kafka = servicer_with_mock_kafka
+    servicer.view_buffer = MagicMock()
+    mock_db.check_post_visible.return_value = (123, "author1")
+
+    response = servicer.ViewPost(post_pb2.ViewPostRequest(post_id="123", user_id="user456"), None)
+    assert response.success is True
+    servicer.view_buffer.add.assert_called_once_with(123)
+    mock_db.increment_views_count.assert_not_called()
+    mock_kafka.send_post_viewed_event.assert_called_once_with("user456", "123", "author1")
+
+
+def test_view_post_buffered_access_denied(servicer_with_mock_kafka, dummy_context):
+    servicer, mock_db, mock_kafka = servicer_with_mock_kafka
+    servicer.view_buffer = MagicMock()
+    mock_db.check_post_visible.side_effect = AccessDeniedError("Access to post denied")
+
+    servicer.ViewPost(post_pb2.ViewPostRequest(post_id="1", user_id="user2"), dummy_context)
+    assert dummy_context.code == grpc.StatusCode.PERMISSION_DENIED
+    servicer.view_buffer.add.assert_not_called()
+    mock_kafka.send_post_viewed_event.assert_not_called()
+
+
+@pytest.fixture
+def mock_confluent_producer():
+    with patch('broker.kafka_producer.Producer') as producer_cls:
+        yield producer_cls
+
+
+def test_async_producer_does_not_flush_per_event(mock_confluent_producer):
+    from broker.kafka_producer import KafkaProducer
+    producer = KafkaProducer(async_mode=True)
+    try:
+        config = mock_confluent_producer.call_args[0][0]
+        assert config['linger.ms'] > 0
+        assert 'compression.type' in config
+
+        producer.send_post_viewed_event("user1", "1")
+        mock_confluent_producer.return_value.produce.assert_called_once()
+        mock_confluent_producer.return_value.flush.assert_not_called()
+        assert producer.metrics()['produced'] == 1
+    finally:
+        producer.close()
+    mock_confluent_producer.return_value.flush.assert_called_once()
+
+
+def test_sync_producer_flushes_per_event(mock_confluent_producer):
+    from broker.kafka_producer import KafkaProducer
+    producer = KafkaProducer(async_mode=False)
+    producer.send_post_liked_event("user1", "1")
+    mock_confluent_producer.return_value.flush.assert_called_once()
+
+
+def test_producer_waits_for_queue_space(mock_confluent_producer):
+    from broker.kafka_producer import KafkaProducer
+    producer = KafkaProducer(async_mode=True)
+    producer._ensure_poll_thread = MagicMock()
+    mock_confluent_producer.return_value.produce.side_effect = [BufferError(), None]
+
+    producer.send_post_viewed_event("user1", "1")
+    assert mock_confluent_producer.return_value.produce.call_count == 2
+    assert producer.metrics()['produced'] == 1
+    assert producer.metrics()['dropped'] == 0
+
+
+def test_producer_drops_event_when_queue_stays_full(mock_confluent_producer):
+    from broker.kafka_producer import KafkaProducer
+    producer = KafkaProducer(async_mode=True)
+    producer._ensure_poll_thread = MagicMock()
+    producer.max_block_seconds = 0
+    mock_confluent_producer.return_value.produce.side_effect = BufferError()
+
+    producer.send_post_viewed_event("user1", "1")
+    assert producer.metrics()['dropped'] == 1
+
+
+def test_delivery_report_counts_results(mock_confluent_producer):
+    from broker.kafka_producer import KafkaProducer
+    producer = KafkaProducer(async_mode=True)
+    producer._delivery_report(None, MagicMock())
+    producer._delivery_report("broker down", MagicMock())
+    assert producer.metrics()['delivered'] == 1
+    assert producer.metrics()['failed'] == 1
+
+
+def test_event_codec_protobuf_round_trip():
+    from broker.event_codec import encode_event, decode_event, PROTOBUF_CONTENT_TYPE
+    timestamp = datetime(2025, 5, 20, 12, 30, 15, 123456)
+    payload, headers = encode_event({
+        "event_type": "post_commented",
+        "timestamp": timestamp,
+        "user_id": "user1",
+        "post_id": "42",
+        "comment_id": "7",
+        "text_preview": "Nice post",
+        "creator_id": "author1"
+    })
+
+    assert dict(headers)['content-type'] == PROTOBUF_CONTENT_TYPE.encode('ascii')
+    event = decode_event(payload, headers)
+    assert event["event_type"] == "post_commented"
+    assert event["post_id"] == "42"
+    assert event["comment_id"] == "7"
+    assert event["text_preview"] == "Nice post"
+    assert event["creator_id"] == "author1"
+    assert datetime.fromisoformat(event["timestamp"]) == timestamp
+
+
+def test_event_codec_decodes_legacy_json():
+    from broker.event_codec import decode_event
+    event = decode_event(b'{"event_type": "post_viewed", "post_id": "1", "user_id": "u"}', None)
+    assert event["post_id"] == "1"
+
+
+def test_event_codec_rejects_garbage():
+    from broker.event_codec import decode_event, EventDecodeError
+    with pytest.raises(EventDecodeError):
+        decode_event(b'not json', [])
+    with pytest.raises(EventDecodeError):
+        decode_event(b'\xff\xff', [('content-type', b'application/x-protobuf'), ('event-type', b'post_viewed')])
@@ -3,7 +3,8 @@ from unittest.mock import MagicMock, patch
 import grpc
 from datetime import datetime
 from proto import post_pb2, post_pb2_grpc
-from db.post_db import PostDB, PostDBError, NotFoundError, InvalidArgumentError, OutOfRangeError, AccessDeniedError
+from db.post_db import (PostDB, PostDBError, NotFoundError, InvalidArgumentError, OutOfRangeError,
+                        AccessDeniedError, SchemaVersionError, MAX_BATCH_GET_POSTS, encode_cursor, decode_cursor)
 
 mock_kafka_producer = MagicMock()
 with patch.dict('sys.modules', {'broker.kafka_producer': mock_kafka_producer}):
@@ -130,6 +131,75 @@ def test_get_post_not_found(servicer, dummy_context):
     assert "Post not found" in dummy_context.details
 
 
+def test_batch_get_posts_success(servicer, dummy_context):
+    service, mock_db = servicer
+    mock_db.batch_get_posts.return_value = post_pb2.BatchGetPostsResponse(
+        posts=[post_pb2.Post(post_id="1", creator_id="user123")],
+        missing_post_ids=["2"]
+    )
+    request = post_pb2.BatchGetPostsRequest(post_ids=["1", "2"], user_id="user123", fields=["creator_id"])
+    response = service.BatchGetPosts(request, dummy_context)
+    assert [post.creator_id for post in response.posts] == ["user123"]
+    assert list(response.missing_post_ids) == ["2"]
+    mock_db.batch_get_posts.assert_called_once_with(["1", "2"], "user123", ["creator_id"])
+    assert dummy_context.code is None
+
+
+def test_batch_get_posts_invalid_argument(servicer, dummy_context):
+    service, mock_db = servicer
+    mock_db.batch_get_posts.side_effect = InvalidArgumentError("Invalid post ID format")
+    request = post_pb2.BatchGetPostsRequest(post_ids=["abc"], user_id="user123")
+    response = service.BatchGetPosts(request, dummy_context)
+    assert isinstance(response, post_pb2.BatchGetPostsResponse)
+    assert dummy_context.code == grpc.StatusCode.INVALID_ARGUMENT
+
+
+def test_get_post_creators(servicer, dummy_context):
+    service, mock_db = servicer
+    mock_db.get_post_creators.return_value = {"1": "user123", "2": "other"}
+    request = post_pb2.GetPostCreatorsRequest(post_ids=["1", "2", "3"])
+    response = service.GetPostCreators(request, dummy_context)
+    assert dict(response.creator_ids) == {"1": "user123", "2": "other"}
+    mock_db.get_post_creators.assert_called_once_with(["1", "2", "3"])
+    assert dummy_context.code is None
+
+
+def test_stream_posts_yields_posts(servicer, dummy_context):
+    service, mock_db = servicer
+    mock_db.iter_posts.return_value = iter([post_pb2.Post(post_id="1"), post_pb2.Post(post_id="3")])
+    request = post_pb2.BatchGetPostsRequest(post_ids=["1", "2", "3"], user_id="user123")
+    posts = list(service.StreamPosts(request, dummy_context))
+    assert [post.post_id for post in posts] == ["1", "3"]
+    assert dummy_context.code is None
+
+
+def test_stream_posts_database_error(servicer, dummy_context):
+    service, mock_db = servicer
+
+    def failing_iter(*args):
+        yield post_pb2.Post(post_id="1")
+        raise PostDBError("Database error while streaming posts")
+
+    mock_db.iter_posts.side_effect = failing_iter
+    request = post_pb2.BatchGetPostsRequest(post_ids=["1", "2"], user_id="user123")
+    posts = list(service.StreamPosts(request, dummy_context))
+    assert len(posts) == 1
+    assert dummy_context.code == grpc.StatusCode.INTERNAL
+
+
+@pytest.mark.parametrize("post_ids, fields", [
+    (["1", "abc"], []),
+    (["1"], ["creator_id", "secret"]),
+    ([str(i) for i in range(MAX_BATCH_GET_POSTS + 1)], []),
+])
+def test_batch_get_posts_rejects_invalid_requests(post_ids, fields):
+    db = PostDB.__new__(PostDB)
+    db.Session = MagicMock()
+    with pytest.raises(InvalidArgumentError):
+        db.batch_get_posts(post_ids, "user123", fields)
+    db.Session.assert_not_called()
+
+
 def test_list_posts_success(servicer, dummy_context):
     service, mock_db = servicer
     mock_response = post_pb2.ListPostsResponse(
@@ -210,6 +280,47 @@ def test_list_private_posts_for_owner(servicer, dummy_context):
     assert response.posts[0].is_private
 
 
+def test_list_posts_cursor_mode(servicer, dummy_context):
+    service, mock_db = servicer
+    mock_db.list_posts.return_value = post_pb2.ListPostsResponse(
+        posts=[post_pb2.Post(post_id="11", title="Post 11", creator_id="user123")],
+        per_page=1,
+        next_cursor="next"
+    )
+    request = post_pb2.ListPostsRequest(
+        user_id="user123",
+        per_page=1,
+        cursor="current",
+        include_total=False
+    )
+    response = service.ListPosts(request, dummy_context)
+    assert response.next_cursor == "next"
+    mock_db.list_posts.assert_called_once_with(
+        user_id="user123",
+        page=0,
+        per_page=1,
+        cursor="current",
+        use_cursor=False,
+        include_total=False
+    )
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 5, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+def test_post_db_requires_migrated_schema():
+    with pytest.raises(SchemaVersionError):
+        PostDB("sqlite://")
+
+
+def test_invalid_cursor():
+    with pytest.raises(InvalidArgumentError):
+        decode_cursor("not a cursor")
+
+
 def test_get_comments_success(servicer, dummy_context):
     service, mock_db = servicer
 
@@ -0,0 +1,62 @@
+import threading
+import pytest
+from unittest.mock import MagicMock
+from db.post_db import PostDB, PostDBError
+from db.view_buffer import ViewCounterBuffer
+
+
+@pytest.fixture
+def mock_db():
+    return MagicMock(spec=PostDB)
+
+
+def test_add_merges_deltas_per_post(mock_db):
+    buffer = ViewCounterBuffer(mock_db)
+    buffer.add(1)
+    buffer.add(1)
+    buffer.add(2)
+
+    assert buffer.metrics()['pending_posts'] == 2
+    assert buffer.metrics()['pending_views'] == 3
+    assert buffer.flush() == 3
+    mock_db.apply_view_deltas.assert_called_once_with({1: 2, 2: 1})
+    assert buffer.metrics()['pending_views'] == 0
+    assert buffer.metrics()['flushed_views'] == 3
+
+
+def test_flush_without_views_skips_database(mock_db):
+    buffer = ViewCounterBuffer(mock_db)
+    assert buffer.flush() == 0
+    mock_db.apply_view_deltas.assert_not_called()
+
+
+def test_failed_flush_keeps_views(mock_db):
+    buffer = ViewCounterBuffer(mock_db)
+    mock_db.apply_view_deltas.side_effect = [PostDBError("Database error"), 1]
+    buffer.add(7)
+    assert buffer.flush() == 0
+    buffer.add(7)
+
+    assert buffer.metrics()['flush_errors'] == 1
+    assert buffer.flush() == 2
+    mock_db.apply_view_deltas.assert_called_with({7: 2})
+
+
+def test_max_pending_triggers_flush(mock_db):
+    flushed = threading.Event()
+    mock_db.apply_view_deltas.side_effect = lambda deltas: flushed.set()
+    buffer = ViewCounterBuffer(mock_db, flush_interval=60, max_pending=3).start()
+    try:
+        for _ in range(3):
+            buffer.add(5)
+        assert flushed.wait(5)
+        mock_db.apply_view_deltas.assert_called_once_with({5: 3})
+    finally:
+        buffer.close()
+
+
+def test_close_flushes_pending_views(mock_db):
+    buffer = ViewCounterBuffer(mock_db, flush_interval=60).start()
+    buffer.add(3)
+    buffer.close()
+    mock_db.apply_view_deltas.assert_called_once_with({3: 1})
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: proto/events.proto
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import message as _message
+from google.protobuf import reflection as _reflection
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x12proto/events.proto\x12\x06\x65vents\"U\n\nPostViewed\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0f\n\x07post_id\x18\x02 \x01(\t\x12\x11\n\ttimestamp\x18\x03 \x01(\x03\x12\x12\n\ncreator_id\x18\x04 \x01(\t\"T\n\tPostLiked\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0f\n\x07post_id\x18\x02 \x01(\t\x12\x11\n\ttimestamp\x18\x03 \x01(\x03\x12\x12\n\ncreator_id\x18\x04 \x01(\t\"\x82\x01\n\rPostCommented\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0f\n\x07post_id\x18\x02 \x01(\t\x12\x11\n\ttimestamp\x18\x03 \x01(\x03\x12\x12\n\ncomment_id\x18\x04 \x01(\t\x12\x14\n\x0ctext_preview\x18\x05 \x01(\t\x12\x12\n\ncreator_id\x18\x06 \x01(\tb\x06proto3')
+
+
+
+_POSTVIEWED = DESCRIPTOR.message_types_by_name['PostViewed']
+_POSTLIKED = DESCRIPTOR.message_types_by_name['PostLiked']
+_POSTCOMMENTED = DESCRIPTOR.message_types_by_name['PostCommented']
+PostViewed = _reflection.GeneratedProtocolMessageType('PostViewed', (_message.Message,), {
+  'DESCRIPTOR' : _POSTVIEWED,
+  '__module__' : 'proto.events_pb2'
+  # @@protoc_insertion_point(class_scope:events.PostViewed)
+  })
+_sym_db.RegisterMessage(PostViewed)
+
+PostLiked = _reflection.GeneratedProtocolMessageType('PostLiked', (_message.Message,), {
+  'DESCRIPTOR' : _POSTLIKED,
+  '__module__' : 'proto.events_pb2'
+  # @@protoc_insertion_point(class_scope:events.PostLiked)
+  })
+_sym_db.RegisterMessage(PostLiked)
+
+PostCommented = _reflection.GeneratedProtocolMessageType('PostCommented', (_message.Message,), {
+  'DESCRIPTOR' : _POSTCOMMENTED,
+  '__module__' : 'proto.events_pb2'
+  # @@protoc_insertion_point(class_scope:events.PostCommented)
+  })
+_sym_db.RegisterMessage(PostCommented)
+
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _POSTVIEWED._serialized_start=30
+  _POSTVIEWED._serialized_end=115
+  _POSTLIKED._serialized_start=117
+  _POSTLIKED._serialized_end=201
+  _POSTCOMMENTED._serialized_start=204
+  _POSTCOMMENTED._serialized_end=334
+# @@protoc_insertion_point(module_scope)
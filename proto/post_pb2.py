@@ -14,7 +14,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10proto/post.proto\x12\x04post\"m\n\x11\x43reatePostRequest\x12\r\n\x05title\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x02 \x01(\t\x12\x12\n\ncreator_id\x18\x03 \x01(\t\x12\x12\n\nis_private\x18\x04 \x01(\x08\x12\x0c\n\x04tags\x18\x05 \x03(\t\"9\n\x12\x43reatePostResponse\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x12\n\ncreated_at\x18\x02 \x01(\t\"5\n\x11\x44\x65letePostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"%\n\x12\x44\x65letePostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"{\n\x11UpdatePostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\r\n\x05title\x18\x03 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x04 \x01(\t\x12\x12\n\nis_private\x18\x05 \x01(\x08\x12\x0c\n\x04tags\x18\x06 \x03(\t\"(\n\x12UpdatePostResponse\x12\x12\n\nupdated_at\x18\x01 \x01(\t\"2\n\x0eGetPostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"+\n\x0fGetPostResponse\x12\x18\n\x04post\x18\x01 \x01(\x0b\x32\n.post.Post\"C\n\x10ListPostsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0c\n\x04page\x18\x02 \x01(\x05\x12\x10\n\x08per_page\x18\x03 \x01(\x05\"\x8c\x01\n\x11ListPostsResponse\x12\x19\n\x05posts\x18\x01 \x03(\x0b\x32\n.post.Post\x12\r\n\x05total\x18\x02 \x01(\x05\x12\x0c\n\x04page\x18\x03 \x01(\x05\x12\x10\n\x08per_page\x18\x04 \x01(\x05\x12\x11\n\tlast_page\x18\x05 \x01(\x05\x12\r\n\x05\x66rom_\x18\x06 \x01(\x05\x12\x0b\n\x03to_\x18\x07 \x01(\x05\"\x99\x01\n\x04Post\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\x12\x12\n\ncreator_id\x18\x04 \x01(\t\x12\x12\n\ncreated_at\x18\x05 \x01(\t\x12\x12\n\nupdated_at\x18\x06 \x01(\t\x12\x12\n\nis_private\x18\x07 \x01(\x08\x12\x0c\n\x04tags\x18\x08 \x03(\t\"3\n\x0fViewPostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"#\n\x10ViewPostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"3\n\x0fLikePostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"#\n\x10LikePostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"G\n\x12\x43ommentPostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x0f\n\x07\x63omment\x18\x03 \x01(\t\"=\n\x13\x43ommentPostResponse\x12\x12\n\ncomment_id\x18\x01 \x01(\t\x12\x12\n\ncreated_at\x18\x02 \x01(\t\"V\n\x12GetCommentsRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x0c\n\x04page\x18\x03 \x01(\x05\x12\x10\n\x08per_page\x18\x04 \x01(\x05\"P\n\x13GetCommentsResponse\x12\x1f\n\x08\x63omments\x18\x01 \x03(\x0b\x32\r.post.Comment\x12\x18\n\x04meta\x18\x02 \x01(\x0b\x32\n.post.Meta\"P\n\x07\x43omment\x12\x12\n\ncomment_id\x18\x01 \x01(\t\x12\x0c\n\x04text\x18\x02 \x01(\t\x12\x0f\n\x07user_id\x18\x03 \x01(\t\x12\x12\n\ncreated_at\x18\x04 \x01(\t\"H\n\x04Meta\x12\r\n\x05total\x18\x01 \x01(\x05\x12\x0c\n\x04page\x18\x02 \x01(\x05\x12\x10\n\x08per_page\x18\x03 \x01(\x05\x12\x11\n\tlast_page\x18\x04 \x01(\x05\x32\xc4\x04\n\x0bPostService\x12?\n\nCreatePost\x12\x17.post.CreatePostRequest\x1a\x18.post.CreatePostResponse\x12?\n\nDeletePost\x12\x17.post.DeletePostRequest\x1a\x18.post.DeletePostResponse\x12?\n\nUpdatePost\x12\x17.post.UpdatePostRequest\x1a\x18.post.UpdatePostResponse\x12\x36\n\x07GetPost\x12\x14.post.GetPostRequest\x1a\x15.post.GetPostResponse\x12<\n\tListPosts\x12\x16.post.ListPostsRequest\x1a\x17.post.ListPostsResponse\x12\x39\n\x08ViewPost\x12\x15.post.ViewPostRequest\x1a\x16.post.ViewPostResponse\x12\x39\n\x08LikePost\x12\x15.post.LikePostRequest\x1a\x16.post.LikePostResponse\x12\x42\n\x0b\x43ommentPost\x12\x18.post.CommentPostRequest\x1a\x19.post.CommentPostResponse\x12\x42\n\x0bGetComments\x12\x18.post.GetCommentsRequest\x1a\x19.post.GetCommentsResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10proto/post.proto\x12\x04post\"m\n\x11\x43reatePostRequest\x12\r\n\x05title\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x02 \x01(\t\x12\x12\n\ncreator_id\x18\x03 \x01(\t\x12\x12\n\nis_private\x18\x04 \x01(\x08\x12\x0c\n\x04tags\x18\x05 \x03(\t\"9\n\x12\x43reatePostResponse\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x12\n\ncreated_at\x18\x02 \x01(\t\"5\n\x11\x44\x65letePostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"%\n\x12\x44\x65letePostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"{\n\x11UpdatePostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\r\n\x05title\x18\x03 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x04 \x01(\t\x12\x12\n\nis_private\x18\x05 \x01(\x08\x12\x0c\n\x04tags\x18\x06 \x03(\t\"(\n\x12UpdatePostResponse\x12\x12\n\nupdated_at\x18\x01 \x01(\t\"2\n\x0eGetPostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"+\n\x0fGetPostResponse\x12\x18\n\x04post\x18\x01 \x01(\x0b\x32\n.post.Post\"I\n\x14\x42\x61tchGetPostsRequest\x12\x10\n\x08post_ids\x18\x01 \x03(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x0e\n\x06\x66ields\x18\x03 \x03(\t\"L\n\x15\x42\x61tchGetPostsResponse\x12\x19\n\x05posts\x18\x01 \x03(\x0b\x32\n.post.Post\x12\x18\n\x10missing_post_ids\x18\x02 \x03(\t\"*\n\x16GetPostCreatorsRequest\x12\x10\n\x08post_ids\x18\x01 \x03(\t\"\x90\x01\n\x17GetPostCreatorsResponse\x12\x42\n\x0b\x63reator_ids\x18\x01 \x03(\x0b\x32-.post.GetPostCreatorsResponse.CreatorIdsEntry\x1a\x31\n\x0f\x43reatorIdsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"~\n\x10ListPostsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0c\n\x04page\x18\x02 \x01(\x05\x12\x10\n\x08per_page\x18\x03 \x01(\x05\x12\x0e\n\x06\x63ursor\x18\x04 \x01(\t\x12\x12\n\nuse_cursor\x18\x05 \x01(\x08\x12\x15\n\rinclude_total\x18\x06 \x01(\x08\"\xa1\x01\n\x11ListPostsResponse\x12\x19\n\x05posts\x18\x01 \x03(\x0b\x32\n.post.Post\x12\r\n\x05total\x18\x02 \x01(\x05\x12\x0c\n\x04page\x18\x03 \x01(\x05\x12\x10\n\x08per_page\x18\x04 \x01(\x05\x12\x11\n\tlast_page\x18\x05 \x01(\x05\x12\r\n\x05\x66rom_\x18\x06 \x01(\x05\x12\x0b\n\x03to_\x18\x07 \x01(\x05\x12\x13\n\x0bnext_cursor\x18\x08 \x01(\t\"\x99\x01\n\x04Post\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\x12\x12\n\ncreator_id\x18\x04 \x01(\t\x12\x12\n\ncreated_at\x18\x05 \x01(\t\x12\x12\n\nupdated_at\x18\x06 \x01(\t\x12\x12\n\nis_private\x18\x07 \x01(\x08\x12\x0c\n\x04tags\x18\x08 \x03(\t\"3\n\x0fViewPostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"<\n\x10ViewPostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x17\n\x0fpost_creator_id\x18\x02 \x01(\t\"3\n\x0fLikePostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"<\n\x10LikePostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x17\n\x0fpost_creator_id\x18\x02 \x01(\t\"G\n\x12\x43ommentPostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x0f\n\x07\x63omment\x18\x03 \x01(\t\"V\n\x13\x43ommentPostResponse\x12\x12\n\ncomment_id\x18\x01 \x01(\t\x12\x12\n\ncreated_at\x18\x02 \x01(\t\x12\x17\n\x0fpost_creator_id\x18\x03 \x01(\t\"V\n\x12GetCommentsRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x0c\n\x04page\x18\x03 \x01(\x05\x12\x10\n\x08per_page\x18\x04 \x01(\x05\"P\n\x13GetCommentsResponse\x12\x1f\n\x08\x63omments\x18\x01 \x03(\x0b\x32\r.post.Comment\x12\x18\n\x04meta\x18\x02 \x01(\x0b\x32\n.post.Meta\"P\n\x07\x43omment\x12\x12\n\ncomment_id\x18\x01 \x01(\t\x12\x0c\n\x04text\x18\x02 \x01(\t\x12\x0f\n\x07user_id\x18\x03 \x01(\t\x12\x12\n\ncreated_at\x18\x04 \x01(\t\"H\n\x04Meta\x12\r\n\x05total\x18\x01 \x01(\x05\x12\x0c\n\x04page\x18\x02 \x01(\x05\x12\x10\n\x08per_page\x18\x03 \x01(\x05\x12\x11\n\tlast_page\x18\x04 \x01(\x05\x32\x97\x06\n\x0bPostService\x12?\n\nCreatePost\x12\x17.post.CreatePostRequest\x1a\x18.post.CreatePostResponse\x12?\n\nDeletePost\x12\x17.post.DeletePostRequest\x1a\x18.post.DeletePostResponse\x12?\n\nUpdatePost\x12\x17.post.UpdatePostRequest\x1a\x18.post.UpdatePostResponse\x12\x36\n\x07GetPost\x12\x14.post.GetPostRequest\x1a\x15.post.GetPostResponse\x12H\n\rBatchGetPosts\x12\x1a.post.BatchGetPostsRequest\x1a\x1b.post.BatchGetPostsResponse\x12\x37\n\x0bStreamPosts\x12\x1a.post.BatchGetPostsRequest\x1a\n.post.Post0\x01\x12N\n\x0fGetPostCreators\x12\x1c.post.GetPostCreatorsRequest\x1a\x1d.post.GetPostCreatorsResponse\x12<\n\tListPosts\x12\x16.post.ListPostsRequest\x1a\x17.post.ListPostsResponse\x12\x39\n\x08ViewPost\x12\x15.post.ViewPostRequest\x1a\x16.post.ViewPostResponse\x12\x39\n\x08LikePost\x12\x15.post.LikePostRequest\x1a\x16.post.LikePostResponse\x12\x42\n\x0b\x43ommentPost\x12\x18.post.CommentPostRequest\x1a\x19.post.CommentPostResponse\x12\x42\n\x0bGetComments\x12\x18.post.GetCommentsRequest\x1a\x19.post.GetCommentsResponseb\x06proto3')
 
 
 
@@ -26,6 +26,11 @@ _UPDATEPOSTREQUEST = DESCRIPTOR.message_types_by_name['UpdatePostRequest']
 _UPDATEPOSTRESPONSE = DESCRIPTOR.message_types_by_name['UpdatePostResponse']
 _GETPOSTREQUEST = DESCRIPTOR.message_types_by_name['GetPostRequest']
 _GETPOSTRESPONSE = DESCRIPTOR.message_types_by_name['GetPostResponse']
+_BATCHGETPOSTSREQUEST = DESCRIPTOR.message_types_by_name['BatchGetPostsRequest']
+_BATCHGETPOSTSRESPONSE = DESCRIPTOR.message_types_by_name['BatchGetPostsResponse']
+_GETPOSTCREATORSREQUEST = DESCRIPTOR.message_types_by_name['GetPostCreatorsRequest']
+_GETPOSTCREATORSRESPONSE = DESCRIPTOR.message_types_by_name['GetPostCreatorsResponse']
+_GETPOSTCREATORSRESPONSE_CREATORIDSENTRY = _GETPOSTCREATORSRESPONSE.nested_types_by_name['CreatorIdsEntry']
 _LISTPOSTSREQUEST = DESCRIPTOR.message_types_by_name['ListPostsRequest']
 _LISTPOSTSRESPONSE = DESCRIPTOR.message_types_by_name['ListPostsResponse']
 _POST = DESCRIPTOR.message_types_by_name['Post']
@@ -95,6 +100,42 @@ GetPostResponse = _reflection.GeneratedProtocolMessageType('GetPostResponse', (_
   })
 _sym_db.RegisterMessage(GetPostResponse)
 
+BatchGetPostsRequest = _reflection.GeneratedProtocolMessageType('BatchGetPostsRequest', (_message.Message,), {
+  'DESCRIPTOR' : _BATCHGETPOSTSREQUEST,
+  '__module__' : 'proto.post_pb2'
+  # @@protoc_insertion_point(class_scope:post.BatchGetPostsRequest)
+  })
+_sym_db.RegisterMessage(BatchGetPostsRequest)
+
+BatchGetPostsResponse = _reflection.GeneratedProtocolMessageType('BatchGetPostsResponse', (_message.Message,), {
+  'DESCRIPTOR' : _BATCHGETPOSTSRESPONSE,
+  '__module__' : 'proto.post_pb2'
+  # @@protoc_insertion_point(class_scope:post.BatchGetPostsResponse)
+  })
+_sym_db.RegisterMessage(BatchGetPostsResponse)
+
+GetPostCreatorsRequest = _reflection.GeneratedProtocolMessageType('GetPostCreatorsRequest', (_message.Message,), {
+  'DESCRIPTOR' : _GETPOSTCREATORSREQUEST,
+  '__module__' : 'proto.post_pb2'
+  # @@protoc_insertion_point(class_scope:post.GetPostCreatorsRequest)
+  })
+_sym_db.RegisterMessage(GetPostCreatorsRequest)
+
+GetPostCreatorsResponse = _reflection.GeneratedProtocolMessageType('GetPostCreatorsResponse', (_message.Message,), {
+
+  'CreatorIdsEntry' : _reflection.GeneratedProtocolMessageType('CreatorIdsEntry', (_message.Message,), {
+    'DESCRIPTOR' : _GETPOSTCREATORSRESPONSE_CREATORIDSENTRY,
+    '__module__' : 'proto.post_pb2'
+    # @@protoc_insertion_point(class_scope:post.GetPostCreatorsResponse.CreatorIdsEntry)
+    })
+  ,
+  'DESCRIPTOR' : _GETPOSTCREATORSRESPONSE,
+  '__module__' : 'proto.post_pb2'
+  # @@protoc_insertion_point(class_scope:post.GetPostCreatorsResponse)
+  })
+_sym_db.RegisterMessage(GetPostCreatorsResponse)
+_sym_db.RegisterMessage(GetPostCreatorsResponse.CreatorIdsEntry)
+
 ListPostsRequest = _reflection.GeneratedProtocolMessageType('ListPostsRequest', (_message.Message,), {
   'DESCRIPTOR' : _LISTPOSTSREQUEST,
   '__module__' : 'proto.post_pb2'
@@ -190,6 +231,8 @@ _POSTSERVICE = DESCRIPTOR.services_by_name['PostService']
 if _descriptor._USE_C_DESCRIPTORS == False:
 
   DESCRIPTOR._options = None
+  _GETPOSTCREATORSRESPONSE_CREATORIDSENTRY._options = None
+  _GETPOSTCREATORSRESPONSE_CREATORIDSENTRY._serialized_options = b'8\001'
   _CREATEPOSTREQUEST._serialized_start=26
   _CREATEPOSTREQUEST._serialized_end=135
   _CREATEPOSTRESPONSE._serialized_start=137
@@ -206,32 +249,42 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _GETPOSTREQUEST._serialized_end=507
   _GETPOSTRESPONSE._serialized_start=509
   _GETPOSTRESPONSE._serialized_end=552
-  _LISTPOSTSREQUEST._serialized_start=554
-  _LISTPOSTSREQUEST._serialized_end=621
-  _LISTPOSTSRESPONSE._serialized_start=624
-  _LISTPOSTSRESPONSE._serialized_end=764
-  _POST._serialized_start=767
-  _POST._serialized_end=920
-  _VIEWPOSTREQUEST._serialized_start=922
-  _VIEWPOSTREQUEST._serialized_end=973
-  _VIEWPOSTRESPONSE._serialized_start=975
-  _VIEWPOSTRESPONSE._serialized_end=1010
-  _LIKEPOSTREQUEST._serialized_start=1012
-  _LIKEPOSTREQUEST._serialized_end=1063
-  _LIKEPOSTRESPONSE._serialized_start=1065
-  _LIKEPOSTRESPONSE._serialized_end=1100
-  _COMMENTPOSTREQUEST._serialized_start=1102
-  _COMMENTPOSTREQUEST._serialized_end=1173
-  _COMMENTPOSTRESPONSE._serialized_start=1175
-  _COMMENTPOSTRESPONSE._serialized_end=1236
-  _GETCOMMENTSREQUEST._serialized_start=1238
-  _GETCOMMENTSREQUEST._serialized_end=1324
-  _GETCOMMENTSRESPONSE._serialized_start=1326
-  _GETCOMMENTSRESPONSE._serialized_end=1406
-  _COMMENT._serialized_start=1408
-  _COMMENT._serialized_end=1488
-  _META._serialized_start=1490
-  _META._serialized_end=1562
-  _POSTSERVICE._serialized_start=1565
-  _POSTSERVICE._serialized_end=2145
+  _BATCHGETPOSTSREQUEST._serialized_start=554
+  _BATCHGETPOSTSREQUEST._serialized_end=627
+  _BATCHGETPOSTSRESPONSE._serialized_start=629
+  _BATCHGETPOSTSRESPONSE._serialized_end=705
+  _GETPOSTCREATORSREQUEST._serialized_start=707
+  _GETPOSTCREATORSREQUEST._serialized_end=749
+  _GETPOSTCREATORSRESPONSE._serialized_start=752
+  _GETPOSTCREATORSRESPONSE._serialized_end=896
+  _GETPOSTCREATORSRESPONSE_CREATORIDSENTRY._serialized_start=847
+  _GETPOSTCREATORSRESPONSE_CREATORIDSENTRY._serialized_end=896
+  _LISTPOSTSREQUEST._serialized_start=898
+  _LISTPOSTSREQUEST._serialized_end=1024
+  _LISTPOSTSRESPONSE._serialized_start=1027
+  _LISTPOSTSRESPONSE._serialized_end=1188
+  _POST._serialized_start=1191
+  _POST._serialized_end=1344
+  _VIEWPOSTREQUEST._serialized_start=1346
+  _VIEWPOSTREQUEST._serialized_end=1397
+  _VIEWPOSTRESPONSE._serialized_start=1399
+  _VIEWPOSTRESPONSE._serialized_end=1459
+  _LIKEPOSTREQUEST._serialized_start=1461
+  _LIKEPOSTREQUEST._serialized_end=1512
+  _LIKEPOSTRESPONSE._serialized_start=1514
+  _LIKEPOSTRESPONSE._serialized_end=1574
+  _COMMENTPOSTREQUEST._serialized_start=1576
+  _COMMENTPOSTREQUEST._serialized_end=1647
+  _COMMENTPOSTRESPONSE._serialized_start=1649
+  _COMMENTPOSTRESPONSE._serialized_end=1735
+  _GETCOMMENTSREQUEST._serialized_start=1737
+  _GETCOMMENTSREQUEST._serialized_end=1823
+  _GETCOMMENTSRESPONSE._serialized_start=1825
+  _GETCOMMENTSRESPONSE._serialized_end=1905
+  _COMMENT._serialized_start=1907
+  _COMMENT._serialized_end=1987
+  _META._serialized_start=1989
+  _META._serialized_end=2061
+  _POSTSERVICE._serialized_start=2064
+  _POSTSERVICE._serialized_end=2855
 # @@protoc_insertion_point(module_scope)
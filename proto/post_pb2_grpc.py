@@ -34,6 +34,21 @@ class PostServiceStub(object):
                 request_serializer=proto_dot_post__pb2.GetPostRequest.SerializeToString,
                 response_deserializer=proto_dot_post__pb2.GetPostResponse.FromString,
                 )
+        self.BatchGetPosts = channel.unary_unary(
+                '/post.PostService/BatchGetPosts',
+                request_serializer=proto_dot_post__pb2.BatchGetPostsRequest.SerializeToString,
+                response_deserializer=proto_dot_post__pb2.BatchGetPostsResponse.FromString,
+                )
+        self.StreamPosts = channel.unary_stream(
+                '/post.PostService/StreamPosts',
+                request_serializer=proto_dot_post__pb2.BatchGetPostsRequest.SerializeToString,
+                response_deserializer=proto_dot_post__pb2.Post.FromString,
+                )
+        self.GetPostCreators = channel.unary_unary(
+                '/post.PostService/GetPostCreators',
+                request_serializer=proto_dot_post__pb2.GetPostCreatorsRequest.SerializeToString,
+                response_deserializer=proto_dot_post__pb2.GetPostCreatorsResponse.FromString,
+                )
         self.ListPosts = channel.unary_unary(
                 '/post.PostService/ListPosts',
                 request_serializer=proto_dot_post__pb2.ListPostsRequest.SerializeToString,
@@ -88,6 +103,24 @@ class PostServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def BatchGetPosts(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamPosts(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetPostCreators(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def ListPosts(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -141,6 +174,21 @@ def add_PostServiceServicer_to_server(servicer, server):
                     request_deserializer=proto_dot_post__pb2.GetPostRequest.FromString,
                     response_serializer=proto_dot_post__pb2.GetPostResponse.SerializeToString,
             ),
+            'BatchGetPosts': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatchGetPosts,
+                    request_deserializer=proto_dot_post__pb2.BatchGetPostsRequest.FromString,
+                    response_serializer=proto_dot_post__pb2.BatchGetPostsResponse.SerializeToString,
+            ),
+            'StreamPosts': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamPosts,
+                    request_deserializer=proto_dot_post__pb2.BatchGetPostsRequest.FromString,
+                    response_serializer=proto_dot_post__pb2.Post.SerializeToString,
+            ),
+            'GetPostCreators': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetPostCreators,
+                    request_deserializer=proto_dot_post__pb2.GetPostCreatorsRequest.FromString,
+                    response_serializer=proto_dot_post__pb2.GetPostCreatorsResponse.SerializeToString,
+            ),
             'ListPosts': grpc.unary_unary_rpc_method_handler(
                     servicer.ListPosts,
                     request_deserializer=proto_dot_post__pb2.ListPostsRequest.FromString,
@@ -244,6 +292,57 @@ class PostService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def BatchGetPosts(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/post.PostService/BatchGetPosts',
+            proto_dot_post__pb2.BatchGetPostsRequest.SerializeToString,
+            proto_dot_post__pb2.BatchGetPostsResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamPosts(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/post.PostService/StreamPosts',
+            proto_dot_post__pb2.BatchGetPostsRequest.SerializeToString,
+            proto_dot_post__pb2.Post.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetPostCreators(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/post.PostService/GetPostCreators',
+            proto_dot_post__pb2.GetPostCreatorsRequest.SerializeToString,
+            proto_dot_post__pb2.GetPostCreatorsResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def ListPosts(request,
             target,
@@ -14,7 +14,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x15proto/statistic.proto\x12\tstatistic\"4\n\x10PostStatsRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"i\n\x11PostStatsResponse\x12\x13\n\x0bviews_count\x18\x01 \x01(\x04\x12\x13\n\x0blikes_count\x18\x02 \x01(\x04\x12\x16\n\x0e\x63omments_count\x18\x03 \x01(\x04\x12\x12\n\nupdated_at\x18\x04 \x01(\t\"\x9a\x01\n\x12PostDynamicRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x34\n\x06metric\x18\x03 \x01(\x0e\x32$.statistic.PostDynamicRequest.Metric\",\n\x06Metric\x12\t\n\x05VIEWS\x10\x00\x12\t\n\x05LIKES\x10\x01\x12\x0c\n\x08\x43OMMENTS\x10\x02\"(\n\tDailyStat\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x04\":\n\x13PostDynamicResponse\x12#\n\x05stats\x18\x01 \x03(\x0b\x32\x14.statistic.DailyStat\"r\n\x0fTopPostsRequest\x12\x31\n\x06metric\x18\x01 \x01(\x0e\x32!.statistic.TopPostsRequest.Metric\",\n\x06Metric\x12\t\n\x05VIEWS\x10\x00\x12\t\n\x05LIKES\x10\x01\x12\x0c\n\x08\x43OMMENTS\x10\x02\")\n\x07TopPost\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x04\"5\n\x10TopPostsResponse\x12!\n\x05posts\x18\x01 \x03(\x0b\x32\x12.statistic.TopPost\"r\n\x0fTopUsersRequest\x12\x31\n\x06metric\x18\x01 \x01(\x0e\x32!.statistic.TopUsersRequest.Metric\",\n\x06Metric\x12\t\n\x05VIEWS\x10\x00\x12\t\n\x05LIKES\x10\x01\x12\x0c\n\x08\x43OMMENTS\x10\x02\")\n\x07TopUser\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x04\"5\n\x10TopUsersResponse\x12!\n\x05users\x18\x01 \x03(\x0b\x32\x12.statistic.TopUser2\xc6\x02\n\x10StatisticService\x12K\n\x0cGetPostStats\x12\x1b.statistic.PostStatsRequest\x1a\x1c.statistic.PostStatsResponse\"\x00\x12Q\n\x0eGetPostDynamic\x12\x1d.statistic.PostDynamicRequest\x1a\x1e.statistic.PostDynamicResponse\"\x00\x12H\n\x0bGetTopPosts\x12\x1a.statistic.TopPostsRequest\x1a\x1b.statistic.TopPostsResponse\"\x00\x12H\n\x0bGetTopUsers\x12\x1a.statistic.TopUsersRequest\x1a\x1b.statistic.TopUsersResponse\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x15proto/statistic.proto\x12\tstatistic\"4\n\x10PostStatsRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"U\n\x11PostStatsResponse\x12\x13\n\x0bviews_count\x18\x01 \x01(\x04\x12\x13\n\x0blikes_count\x18\x02 \x01(\x04\x12\x16\n\x0e\x63omments_count\x18\x03 \x01(\x04\"\xb9\x02\n\x12PostDynamicRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x34\n\x06metric\x18\x03 \x01(\x0e\x32$.statistic.PostDynamicRequest.Metric\x12>\n\x0bgranularity\x18\x04 \x01(\x0e\x32).statistic.PostDynamicRequest.Granularity\x12\r\n\x05\x66rom_\x18\x05 \x01(\t\x12\x0b\n\x03to_\x18\x06 \x01(\t\x12\x13\n\x0b\x61ll_metrics\x18\x07 \x01(\x08\",\n\x06Metric\x12\t\n\x05VIEWS\x10\x00\x12\t\n\x05LIKES\x10\x01\x12\x0c\n\x08\x43OMMENTS\x10\x02\",\n\x0bGranularity\x12\x07\n\x03\x44\x41Y\x10\x00\x12\x08\n\x04HOUR\x10\x01\x12\n\n\x06MINUTE\x10\x02\"(\n\tDailyStat\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x04\"y\n\x13PostDynamicResponse\x12#\n\x05stats\x18\x01 \x03(\x0b\x32\x14.statistic.DailyStat\x12\r\n\x05\x64\x61tes\x18\x02 \x03(\t\x12\r\n\x05views\x18\x03 \x03(\x04\x12\r\n\x05likes\x18\x04 \x03(\x04\x12\x10\n\x08\x63omments\x18\x05 \x03(\x04\"\x90\x02\n\x0fTopPostsRequest\x12\x31\n\x06metric\x18\x01 \x01(\x0e\x32!.statistic.TopPostsRequest.Metric\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\r\n\x05limit\x18\x03 \x01(\r\x12\x31\n\x06window\x18\x04 \x01(\x0e\x32!.statistic.TopPostsRequest.Window\x12\x14\n\x0cwindow_hours\x18\x05 \x01(\r\",\n\x06Metric\x12\t\n\x05VIEWS\x10\x00\x12\t\n\x05LIKES\x10\x01\x12\x0c\n\x08\x43OMMENTS\x10\x02\"3\n\x06Window\x12\x0c\n\x08\x41LL_TIME\x10\x00\x12\x07\n\x03\x44\x41Y\x10\x01\x12\x08\n\x04WEEK\x10\x02\x12\x08\n\x04HOUR\x10\x03\")\n\x07TopPost\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x04\"5\n\x10TopPostsResponse\x12!\n\x05posts\x18\x01 \x03(\x0b\x32\x12.statistic.TopPost\"\x90\x02\n\x0fTopUsersRequest\x12\x31\n\x06metric\x18\x01 \x01(\x0e\x32!.statistic.TopUsersRequest.Metric\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\r\n\x05limit\x18\x03 \x01(\r\x12\x31\n\x06window\x18\x04 \x01(\x0e\x32!.statistic.TopUsersRequest.Window\x12\x14\n\x0cwindow_hours\x18\x05 \x01(\r\",\n\x06Metric\x12\t\n\x05VIEWS\x10\x00\x12\t\n\x05LIKES\x10\x01\x12\x0c\n\x08\x43OMMENTS\x10\x02\"3\n\x06Window\x12\x0c\n\x08\x41LL_TIME\x10\x00\x12\x07\n\x03\x44\x41Y\x10\x01\x12\x08\n\x04WEEK\x10\x02\x12\x08\n\x04HOUR\x10\x03\")\n\x07TopUser\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x04\"5\n\x10TopUsersResponse\x12!\n\x05users\x18\x01 \x03(\x0b\x32\x12.statistic.TopUser\"\xcb\x01\n\x14TrendingPostsRequest\x12\x36\n\x06metric\x18\x01 \x01(\x0e\x32&.statistic.TrendingPostsRequest.Metric\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\r\n\x05limit\x18\x03 \x01(\r\x12\x14\n\x0cwindow_hours\x18\x04 \x01(\r\x12\x17\n\x0fhalf_life_hours\x18\x05 \x01(\r\",\n\x06Metric\x12\t\n\x05VIEWS\x10\x00\x12\t\n\x05LIKES\x10\x01\x12\x0c\n\x08\x43OMMENTS\x10\x02\"=\n\x0cTrendingPost\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\r\n\x05score\x18\x02 \x01(\x01\x12\r\n\x05\x63ount\x18\x03 \x01(\x04\"?\n\x15TrendingPostsResponse\x12&\n\x05posts\x18\x01 \x03(\x0b\x32\x17.statistic.TrendingPost\"\x13\n\x11GetPostIdsRequest\"&\n\x12GetPostIdsResponse\x12\x10\n\x08post_ids\x18\x01 \x03(\t\"2\n\x0bPostCreator\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x12\n\ncreator_id\x18\x02 \x01(\t\"A\n\x15\x41ggregateBatchRequest\x12(\n\x08\x63reators\x18\x01 \x03(\x0b\x32\x16.statistic.PostCreator\"I\n\x16\x41ggregateBatchResponse\x12\x10\n\x08recorded\x18\x01 \x01(\x04\x12\x1d\n\x15unattributed_post_ids\x18\x02 \x03(\t2\x9d\x05\n\x10StatisticService\x12K\n\x0cGetPostStats\x12\x1b.statistic.PostStatsRequest\x1a\x1c.statistic.PostStatsResponse\"\x00\x12Q\n\x0eGetPostDynamic\x12\x1d.statistic.PostDynamicRequest\x1a\x1e.statistic.PostDynamicResponse\"\x00\x12V\n\x11StreamPostDynamic\x12\x1d.statistic.PostDynamicRequest\x1a\x1e.statistic.PostDynamicResponse\"\x00\x30\x01\x12H\n\x0bGetTopPosts\x12\x1a.statistic.TopPostsRequest\x1a\x1b.statistic.TopPostsResponse\"\x00\x12H\n\x0bGetTopUsers\x12\x1a.statistic.TopUsersRequest\x1a\x1b.statistic.TopUsersResponse\"\x00\x12W\n\x10GetTrendingPosts\x12\x1f.statistic.TrendingPostsRequest\x1a .statistic.TrendingPostsResponse\"\x00\x12K\n\nGetPostIds\x12\x1c.statistic.GetPostIdsRequest\x1a\x1d.statistic.GetPostIdsResponse\"\x00\x12W\n\x0e\x41ggregateBatch\x12 .statistic.AggregateBatchRequest\x1a!.statistic.AggregateBatchResponse\"\x00\x62\x06proto3')
 
 
 
@@ -29,9 +29,21 @@ _TOPPOSTSRESPONSE = DESCRIPTOR.message_types_by_name['TopPostsResponse']
 _TOPUSERSREQUEST = DESCRIPTOR.message_types_by_name['TopUsersRequest']
 _TOPUSER = DESCRIPTOR.message_types_by_name['TopUser']
 _TOPUSERSRESPONSE = DESCRIPTOR.message_types_by_name['TopUsersResponse']
+_TRENDINGPOSTSREQUEST = DESCRIPTOR.message_types_by_name['TrendingPostsRequest']
+_TRENDINGPOST = DESCRIPTOR.message_types_by_name['TrendingPost']
+_TRENDINGPOSTSRESPONSE = DESCRIPTOR.message_types_by_name['TrendingPostsResponse']
+_GETPOSTIDSREQUEST = DESCRIPTOR.message_types_by_name['GetPostIdsRequest']
+_GETPOSTIDSRESPONSE = DESCRIPTOR.message_types_by_name['GetPostIdsResponse']
+_POSTCREATOR = DESCRIPTOR.message_types_by_name['PostCreator']
+_AGGREGATEBATCHREQUEST = DESCRIPTOR.message_types_by_name['AggregateBatchRequest']
+_AGGREGATEBATCHRESPONSE = DESCRIPTOR.message_types_by_name['AggregateBatchResponse']
 _POSTDYNAMICREQUEST_METRIC = _POSTDYNAMICREQUEST.enum_types_by_name['Metric']
+_POSTDYNAMICREQUEST_GRANULARITY = _POSTDYNAMICREQUEST.enum_types_by_name['Granularity']
 _TOPPOSTSREQUEST_METRIC = _TOPPOSTSREQUEST.enum_types_by_name['Metric']
+_TOPPOSTSREQUEST_WINDOW = _TOPPOSTSREQUEST.enum_types_by_name['Window']
 _TOPUSERSREQUEST_METRIC = _TOPUSERSREQUEST.enum_types_by_name['Metric']
+_TOPUSERSREQUEST_WINDOW = _TOPUSERSREQUEST.enum_types_by_name['Window']
+_TRENDINGPOSTSREQUEST_METRIC = _TRENDINGPOSTSREQUEST.enum_types_by_name['Metric']
 PostStatsRequest = _reflection.GeneratedProtocolMessageType('PostStatsRequest', (_message.Message,), {
   'DESCRIPTOR' : _POSTSTATSREQUEST,
   '__module__' : 'proto.statistic_pb2'
@@ -109,6 +121,62 @@ TopUsersResponse = _reflection.GeneratedProtocolMessageType('TopUsersResponse',
   })
 _sym_db.RegisterMessage(TopUsersResponse)
 
+TrendingPostsRequest = _reflection.GeneratedProtocolMessageType('TrendingPostsRequest', (_message.Message,), {
+  'DESCRIPTOR' : _TRENDINGPOSTSREQUEST,
+  '__module__' : 'proto.statistic_pb2'
+  # @@protoc_insertion_point(class_scope:statistic.TrendingPostsRequest)
+  })
+_sym_db.RegisterMessage(TrendingPostsRequest)
+
+TrendingPost = _reflection.GeneratedProtocolMessageType('TrendingPost', (_message.Message,), {
+  'DESCRIPTOR' : _TRENDINGPOST,
+  '__module__' : 'proto.statistic_pb2'
+  # @@protoc_insertion_point(class_scope:statistic.TrendingPost)
+  })
+_sym_db.RegisterMessage(TrendingPost)
+
+TrendingPostsResponse = _reflection.GeneratedProtocolMessageType('TrendingPostsResponse', (_message.Message,), {
+  'DESCRIPTOR' : _TRENDINGPOSTSRESPONSE,
+  '__module__' : 'proto.statistic_pb2'
+  # @@protoc_insertion_point(class_scope:statistic.TrendingPostsResponse)
+  })
+_sym_db.RegisterMessage(TrendingPostsResponse)
+
+GetPostIdsRequest = _reflection.GeneratedProtocolMessageType('GetPostIdsRequest', (_message.Message,), {
+  'DESCRIPTOR' : _GETPOSTIDSREQUEST,
+  '__module__' : 'proto.statistic_pb2'
+  # @@protoc_insertion_point(class_scope:statistic.GetPostIdsRequest)
+  })
+_sym_db.RegisterMessage(GetPostIdsRequest)
+
+GetPostIdsResponse = _reflection.GeneratedProtocolMessageType('GetPostIdsResponse', (_message.Message,), {
+  'DESCRIPTOR' : _GETPOSTIDSRESPONSE,
+  '__module__' : 'proto.statistic_pb2'
+  # @@protoc_insertion_point(class_scope:statistic.GetPostIdsResponse)
+  })
+_sym_db.RegisterMessage(GetPostIdsResponse)
+
+PostCreator = _reflection.GeneratedProtocolMessageType('PostCreator', (_message.Message,), {
+  'DESCRIPTOR' : _POSTCREATOR,
+  '__module__' : 'proto.statistic_pb2'
+  # @@protoc_insertion_point(class_scope:statistic.PostCreator)
+  })
+_sym_db.RegisterMessage(PostCreator)
+
+AggregateBatchRequest = _reflection.GeneratedProtocolMessageType('AggregateBatchRequest', (_message.Message,), {
+  'DESCRIPTOR' : _AGGREGATEBATCHREQUEST,
+  '__module__' : 'proto.statistic_pb2'
+  # @@protoc_insertion_point(class_scope:statistic.AggregateBatchRequest)
+  })
+_sym_db.RegisterMessage(AggregateBatchRequest)
+
+AggregateBatchResponse = _reflection.GeneratedProtocolMessageType('AggregateBatchResponse', (_message.Message,), {
+  'DESCRIPTOR' : _AGGREGATEBATCHRESPONSE,
+  '__module__' : 'proto.statistic_pb2'
+  # @@protoc_insertion_point(class_scope:statistic.AggregateBatchResponse)
+  })
+_sym_db.RegisterMessage(AggregateBatchResponse)
+
 _STATISTICSERVICE = DESCRIPTOR.services_by_name['StatisticService']
 if _descriptor._USE_C_DESCRIPTORS == False:
 
@@ -116,31 +184,55 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _POSTSTATSREQUEST._serialized_start=36
   _POSTSTATSREQUEST._serialized_end=88
   _POSTSTATSRESPONSE._serialized_start=90
-  _POSTSTATSRESPONSE._serialized_end=195
-  _POSTDYNAMICREQUEST._serialized_start=198
-  _POSTDYNAMICREQUEST._serialized_end=352
-  _POSTDYNAMICREQUEST_METRIC._serialized_start=308
-  _POSTDYNAMICREQUEST_METRIC._serialized_end=352
-  _DAILYSTAT._serialized_start=354
-  _DAILYSTAT._serialized_end=394
-  _POSTDYNAMICRESPONSE._serialized_start=396
-  _POSTDYNAMICRESPONSE._serialized_end=454
-  _TOPPOSTSREQUEST._serialized_start=456
-  _TOPPOSTSREQUEST._serialized_end=570
-  _TOPPOSTSREQUEST_METRIC._serialized_start=308
-  _TOPPOSTSREQUEST_METRIC._serialized_end=352
-  _TOPPOST._serialized_start=572
-  _TOPPOST._serialized_end=613
-  _TOPPOSTSRESPONSE._serialized_start=615
-  _TOPPOSTSRESPONSE._serialized_end=668
-  _TOPUSERSREQUEST._serialized_start=670
-  _TOPUSERSREQUEST._serialized_end=784
-  _TOPUSERSREQUEST_METRIC._serialized_start=308
-  _TOPUSERSREQUEST_METRIC._serialized_end=352
-  _TOPUSER._serialized_start=786
-  _TOPUSER._serialized_end=827
-  _TOPUSERSRESPONSE._serialized_start=829
-  _TOPUSERSRESPONSE._serialized_end=882
-  _STATISTICSERVICE._serialized_start=885
-  _STATISTICSERVICE._serialized_end=1211
+  _POSTSTATSRESPONSE._serialized_end=175
+  _POSTDYNAMICREQUEST._serialized_start=178
+  _POSTDYNAMICREQUEST._serialized_end=491
+  _POSTDYNAMICREQUEST_METRIC._serialized_start=401
+  _POSTDYNAMICREQUEST_METRIC._serialized_end=445
+  _POSTDYNAMICREQUEST_GRANULARITY._serialized_start=447
+  _POSTDYNAMICREQUEST_GRANULARITY._serialized_end=491
+  _DAILYSTAT._serialized_start=493
+  _DAILYSTAT._serialized_end=533
+  _POSTDYNAMICRESPONSE._serialized_start=535
+  _POSTDYNAMICRESPONSE._serialized_end=656
+  _TOPPOSTSREQUEST._serialized_start=659
+  _TOPPOSTSREQUEST._serialized_end=931
+  _TOPPOSTSREQUEST_METRIC._serialized_start=401
+  _TOPPOSTSREQUEST_METRIC._serialized_end=445
+  _TOPPOSTSREQUEST_WINDOW._serialized_start=880
+  _TOPPOSTSREQUEST_WINDOW._serialized_end=931
+  _TOPPOST._serialized_start=933
+  _TOPPOST._serialized_end=974
+  _TOPPOSTSRESPONSE._serialized_start=976
+  _TOPPOSTSRESPONSE._serialized_end=1029
+  _TOPUSERSREQUEST._serialized_start=1032
+  _TOPUSERSREQUEST._serialized_end=1304
+  _TOPUSERSREQUEST_METRIC._serialized_start=401
+  _TOPUSERSREQUEST_METRIC._serialized_end=445
+  _TOPUSERSREQUEST_WINDOW._serialized_start=880
+  _TOPUSERSREQUEST_WINDOW._serialized_end=931
+  _TOPUSER._serialized_start=1306
+  _TOPUSER._serialized_end=1347
+  _TOPUSERSRESPONSE._serialized_start=1349
+  _TOPUSERSRESPONSE._serialized_end=1402
+  _TRENDINGPOSTSREQUEST._serialized_start=1405
+  _TRENDINGPOSTSREQUEST._serialized_end=1608
+  _TRENDINGPOSTSREQUEST_METRIC._serialized_start=401
+  _TRENDINGPOSTSREQUEST_METRIC._serialized_end=445
+  _TRENDINGPOST._serialized_start=1610
+  _TRENDINGPOST._serialized_end=1671
+  _TRENDINGPOSTSRESPONSE._serialized_start=1673
+  _TRENDINGPOSTSRESPONSE._serialized_end=1736
+  _GETPOSTIDSREQUEST._serialized_start=1738
+  _GETPOSTIDSREQUEST._serialized_end=1757
+  _GETPOSTIDSRESPONSE._serialized_start=1759
+  _GETPOSTIDSRESPONSE._serialized_end=1797
+  _POSTCREATOR._serialized_start=1799
+  _POSTCREATOR._serialized_end=1849
+  _AGGREGATEBATCHREQUEST._serialized_start=1851
+  _AGGREGATEBATCHREQUEST._serialized_end=1916
+  _AGGREGATEBATCHRESPONSE._serialized_start=1918
+  _AGGREGATEBATCHRESPONSE._serialized_end=1991
+  _STATISTICSERVICE._serialized_start=1994
+  _STATISTICSERVICE._serialized_end=2663
 # @@protoc_insertion_point(module_scope)
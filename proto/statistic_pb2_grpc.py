@@ -24,6 +24,11 @@ class StatisticServiceStub(object):
                 request_serializer=proto_dot_statistic__pb2.PostDynamicRequest.SerializeToString,
                 response_deserializer=proto_dot_statistic__pb2.PostDynamicResponse.FromString,
                 )
+        self.StreamPostDynamic = channel.unary_stream(
+                '/statistic.StatisticService/StreamPostDynamic',
+                request_serializer=proto_dot_statistic__pb2.PostDynamicRequest.SerializeToString,
+                response_deserializer=proto_dot_statistic__pb2.PostDynamicResponse.FromString,
+                )
         self.GetTopPosts = channel.unary_unary(
                 '/statistic.StatisticService/GetTopPosts',
                 request_serializer=proto_dot_statistic__pb2.TopPostsRequest.SerializeToString,
@@ -34,6 +39,21 @@ class StatisticServiceStub(object):
                 request_serializer=proto_dot_statistic__pb2.TopUsersRequest.SerializeToString,
                 response_deserializer=proto_dot_statistic__pb2.TopUsersResponse.FromString,
                 )
+        self.GetTrendingPosts = channel.unary_unary(
+                '/statistic.StatisticService/GetTrendingPosts',
+                request_serializer=proto_dot_statistic__pb2.TrendingPostsRequest.SerializeToString,
+                response_deserializer=proto_dot_statistic__pb2.TrendingPostsResponse.FromString,
+                )
+        self.GetPostIds = channel.unary_unary(
+                '/statistic.StatisticService/GetPostIds',
+                request_serializer=proto_dot_statistic__pb2.GetPostIdsRequest.SerializeToString,
+                response_deserializer=proto_dot_statistic__pb2.GetPostIdsResponse.FromString,
+                )
+        self.AggregateBatch = channel.unary_unary(
+                '/statistic.StatisticService/AggregateBatch',
+                request_serializer=proto_dot_statistic__pb2.AggregateBatchRequest.SerializeToString,
+                response_deserializer=proto_dot_statistic__pb2.AggregateBatchResponse.FromString,
+                )
 
 
 class StatisticServiceServicer(object):
@@ -51,6 +71,12 @@ class StatisticServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamPostDynamic(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetTopPosts(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -63,6 +89,24 @@ class StatisticServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetTrendingPosts(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetPostIds(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def AggregateBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_StatisticServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -76,6 +120,11 @@ def add_StatisticServiceServicer_to_server(servicer, server):
                     request_deserializer=proto_dot_statistic__pb2.PostDynamicRequest.FromString,
                     response_serializer=proto_dot_statistic__pb2.PostDynamicResponse.SerializeToString,
             ),
+            'StreamPostDynamic': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamPostDynamic,
+                    request_deserializer=proto_dot_statistic__pb2.PostDynamicRequest.FromString,
+                    response_serializer=proto_dot_statistic__pb2.PostDynamicResponse.SerializeToString,
+            ),
             'GetTopPosts': grpc.unary_unary_rpc_method_handler(
                     servicer.GetTopPosts,
                     request_deserializer=proto_dot_statistic__pb2.TopPostsRequest.FromString,
@@ -86,6 +135,21 @@ def add_StatisticServiceServicer_to_server(servicer, server):
                     request_deserializer=proto_dot_statistic__pb2.TopUsersRequest.FromString,
                     response_serializer=proto_dot_statistic__pb2.TopUsersResponse.SerializeToString,
             ),
+            'GetTrendingPosts': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetTrendingPosts,
+                    request_deserializer=proto_dot_statistic__pb2.TrendingPostsRequest.FromString,
+                    response_serializer=proto_dot_statistic__pb2.TrendingPostsResponse.SerializeToString,
+            ),
+            'GetPostIds': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetPostIds,
+                    request_deserializer=proto_dot_statistic__pb2.GetPostIdsRequest.FromString,
+                    response_serializer=proto_dot_statistic__pb2.GetPostIdsResponse.SerializeToString,
+            ),
+            'AggregateBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.AggregateBatch,
+                    request_deserializer=proto_dot_statistic__pb2.AggregateBatchRequest.FromString,
+                    response_serializer=proto_dot_statistic__pb2.AggregateBatchResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'statistic.StatisticService', rpc_method_handlers)
@@ -130,6 +194,23 @@ class StatisticService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def StreamPostDynamic(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/statistic.StatisticService/StreamPostDynamic',
+            proto_dot_statistic__pb2.PostDynamicRequest.SerializeToString,
+            proto_dot_statistic__pb2.PostDynamicResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def GetTopPosts(request,
             target,
@@ -163,3 +244,54 @@ class StatisticService(object):
             proto_dot_statistic__pb2.TopUsersResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetTrendingPosts(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/statistic.StatisticService/GetTrendingPosts',
+            proto_dot_statistic__pb2.TrendingPostsRequest.SerializeToString,
+            proto_dot_statistic__pb2.TrendingPostsResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetPostIds(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/statistic.StatisticService/GetPostIds',
+            proto_dot_statistic__pb2.GetPostIdsRequest.SerializeToString,
+            proto_dot_statistic__pb2.GetPostIdsResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def AggregateBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/statistic.StatisticService/AggregateBatch',
+            proto_dot_statistic__pb2.AggregateBatchRequest.SerializeToString,
+            proto_dot_statistic__pb2.AggregateBatchResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
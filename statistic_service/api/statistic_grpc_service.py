@@ -1,18 +1,52 @@
 import grpc
+from datetime import datetime, timedelta
+from typing import Optional
 from proto import statistic_pb2, statistic_pb2_grpc
-from statistic_service.db.statistic_db import StatisticDB
+from statistic_service.db.statistic_db import StatisticDB, DYNAMIC_ROLLUPS, align_range
+from statistic_service.db.clickhouse_models import HOURLY_STATS_TTL_DAYS, MINUTE_STATS_TTL_DAYS
+from statistic_service.db.leaderboard import Leaderboard, LEADERBOARD_SIZE, WINDOW_HOURS
+from statistic_service.db.ttl_cache import TTLCache
+
+DEFAULT_TOP_LIMIT = 10
+DEFAULT_TRENDING_WINDOW_HOURS = 48
+DEFAULT_HALF_LIFE_HOURS = 6
+# Windows longer than the hourly rollups are kept cannot be answered
+MAX_WINDOW_HOURS = HOURLY_STATS_TTL_DAYS * 24
+GRANULARITY_NAMES = {
+    statistic_pb2.PostDynamicRequest.DAY: 'day',
+    statistic_pb2.PostDynamicRequest.HOUR: 'hour',
+    statistic_pb2.PostDynamicRequest.MINUTE: 'minute'
+}
+# Range used when only to_ (or nothing, for hours and minutes) is given
+DEFAULT_DYNAMIC_SPAN = {'day': timedelta(days=30), 'hour': timedelta(hours=24), 'minute': timedelta(minutes=60)}
+# Longer ranges have to be read with StreamPostDynamic
+MAX_DYNAMIC_POINTS = 10000
+# Hourly and per-minute points are only kept this long, so older ranges would come back as zeros
+DYNAMIC_RETENTION = {'hour': timedelta(days=HOURLY_STATS_TTL_DAYS), 'minute': timedelta(days=MINUTE_STATS_TTL_DAYS)}
+WINDOW_NAMES = {
+    statistic_pb2.TopPostsRequest.ALL_TIME: 'all',
+    statistic_pb2.TopPostsRequest.HOUR: 'hour',
+    statistic_pb2.TopPostsRequest.DAY: 'day',
+    statistic_pb2.TopPostsRequest.WEEK: 'week'
+}
 
 
 class StatisticServiceServicer(statistic_pb2_grpc.StatisticServiceServicer):
-    def __init__(self, db: StatisticDB):
+    """
+    Read RPCs only read: counters come from the tables the materialized views maintain, and
+    events carry creator_id, so per-user totals need no attribution from the caller.
+    """
+
+    def __init__(self, db: StatisticDB, leaderboard: Optional[Leaderboard] = None,
+                 cache: Optional[TTLCache] = None):
         self.db = db
+        self.leaderboard = leaderboard
+        self.cache = cache
 
     def GetPostStats(self, request, context):
         session = self.db.get_session()
         try:
-            self.db.aggregate_events(session, request.post_id, request.user_id)
             stats = self.db.get_post_stats(session, request.post_id)
-            session.commit()
 
             return statistic_pb2.PostStatsResponse(
                 views_count=int(stats["views_count"]),
@@ -20,7 +54,6 @@ class StatisticServiceServicer(statistic_pb2_grpc.StatisticServiceServicer):
                 comments_count=int(stats["comments_count"])
             )
         except Exception as e:
-            session.rollback()
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(f"Post stats operation failed: {e}")
             return statistic_pb2.PostStatsResponse()
@@ -30,22 +63,40 @@ class StatisticServiceServicer(statistic_pb2_grpc.StatisticServiceServicer):
     def GetPostDynamic(self, request, context):
         session = self.db.get_session()
         try:
-            self.db.aggregate_events(session, request.post_id, request.user_id)
-
             metric_map = {
                 statistic_pb2.PostDynamicRequest.VIEWS: 'views',
                 statistic_pb2.PostDynamicRequest.LIKES: 'likes',
                 statistic_pb2.PostDynamicRequest.COMMENTS: 'comments'
             }
+            try:
+                granularity, start, end = self._dynamic_range(request)
+            except ValueError as e:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details(str(e))
+                return statistic_pb2.PostDynamicResponse()
+            if start is not None and self._points(granularity, start, end) > MAX_DYNAMIC_POINTS:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details(f"Range exceeds {MAX_DYNAMIC_POINTS} points, use StreamPostDynamic")
+                return statistic_pb2.PostDynamicResponse()
+
+            if request.all_metrics:
+                return self._columns_response(self.db.get_post_dynamic_columns(
+                    session,
+                    post_id=request.post_id,
+                    granularity=granularity,
+                    start=start,
+                    end=end
+                ))
 
             dynamic = self.db.get_post_dynamic(
                 session,
                 post_id=request.post_id,
-                metric=metric_map[request.metric]
+                metric=metric_map[request.metric],
+                granularity=granularity,
+                start=start,
+                end=end
             )
 
-            session.commit()
-
             return statistic_pb2.PostDynamicResponse(
                 stats=[statistic_pb2.DailyStat(
                     date=item['date'],
@@ -53,25 +104,96 @@ class StatisticServiceServicer(statistic_pb2_grpc.StatisticServiceServicer):
                 ) for item in dynamic]
             )
         except Exception as e:
-            session.rollback()
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(f"get_post_dynamic failed: {e}")
             return statistic_pb2.PostDynamicResponse()
         finally:
             session.close()
 
-    def GetTopPosts(self, request, context):
+    def StreamPostDynamic(self, request, context):
+        """GetPostDynamic for ranges of any length, sent as one response per chunk of buckets."""
+        metric_map = {
+            statistic_pb2.PostDynamicRequest.VIEWS: 'views',
+            statistic_pb2.PostDynamicRequest.LIKES: 'likes',
+            statistic_pb2.PostDynamicRequest.COMMENTS: 'comments'
+        }
+        try:
+            granularity, start, end = self._dynamic_range(request)
+            if start is None:
+                raise ValueError("StreamPostDynamic needs from_ or to_")
+        except ValueError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return
+
+        metric = None if request.all_metrics else metric_map[request.metric]
         session = self.db.get_session()
         try:
-            metric_map = {
-                statistic_pb2.TopPostsRequest.VIEWS: 'views',
-                statistic_pb2.TopPostsRequest.LIKES: 'likes',
-                statistic_pb2.TopPostsRequest.COMMENTS: 'comments'
-            }
-            top_posts = self.db.get_top_posts(
-                session,
-                metric=metric_map[request.metric]
-            )
+            for chunk in self.db.iter_post_dynamic(session, request.post_id, metric, granularity, start, end):
+                if metric is None:
+                    yield self._columns_response(chunk)
+                else:
+                    yield statistic_pb2.PostDynamicResponse(
+                        stats=[statistic_pb2.DailyStat(date=item['date'], count=item['count']) for item in chunk]
+                    )
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(f"stream_post_dynamic failed: {e}")
+        finally:
+            session.close()
+
+    @staticmethod
+    def _columns_response(columns: dict):
+        return statistic_pb2.PostDynamicResponse(
+            dates=columns['dates'],
+            views=columns['views'],
+            likes=columns['likes'],
+            comments=columns['comments']
+        )
+
+    @staticmethod
+    def _dynamic_range(request):
+        """
+        Granularity and [start, end) of a PostDynamicRequest; start is None when all days are
+        requested. Raises ValueError for malformed or empty ranges and for ranges starting before
+        the oldest kept hourly or per-minute point.
+        """
+        granularity = GRANULARITY_NAMES[request.granularity]
+        if granularity == 'day' and not request.from_ and not request.to_:
+            return granularity, None, None
+
+        def parse(value: str, name: str) -> datetime:
+            try:
+                parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except ValueError:
+                raise ValueError(f"Invalid {name}: {value}")
+            # Event times are stored as naive local time
+            return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+        end = parse(request.to_, 'to_') if request.to_ else datetime.now()
+        start = parse(request.from_, 'from_') if request.from_ else end - DEFAULT_DYNAMIC_SPAN[granularity]
+        if start >= end:
+            raise ValueError("from_ must be before to_")
+        retention = DYNAMIC_RETENTION.get(granularity)
+        if retention is not None and start < datetime.now() - retention:
+            raise ValueError(f"Points by {granularity} are only kept for {retention.days} days")
+        return granularity, start, end
+
+    @staticmethod
+    def _points(granularity: str, start: datetime, end: datetime) -> int:
+        start, end = align_range(granularity, start, end)
+        return (end - start) // DYNAMIC_ROLLUPS[granularity][2]
+
+    def GetTopPosts(self, request, context):
+        metric_map = {
+            statistic_pb2.TopPostsRequest.VIEWS: 'views',
+            statistic_pb2.TopPostsRequest.LIKES: 'likes',
+            statistic_pb2.TopPostsRequest.COMMENTS: 'comments'
+        }
+        try:
+            top_posts = self._top('posts', self.db.get_top_posts, metric_map[request.metric], request, context)
+            if top_posts is None:
+                return statistic_pb2.TopPostsResponse()
 
             return statistic_pb2.TopPostsResponse(
                 posts=[statistic_pb2.TopPost(
@@ -83,21 +205,17 @@ class StatisticServiceServicer(statistic_pb2_grpc.StatisticServiceServicer):
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(f"get_top_posts failed: {e}")
             return statistic_pb2.TopPostsResponse()
-        finally:
-            session.close()
 
     def GetTopUsers(self, request, context):
-        session = self.db.get_session()
+        metric_map = {
+            statistic_pb2.TopUsersRequest.VIEWS: 'views',
+            statistic_pb2.TopUsersRequest.LIKES: 'likes',
+            statistic_pb2.TopUsersRequest.COMMENTS: 'comments'
+        }
         try:
-            metric_map = {
-                statistic_pb2.TopUsersRequest.VIEWS: 'views',
-                statistic_pb2.TopUsersRequest.LIKES: 'likes',
-                statistic_pb2.TopUsersRequest.COMMENTS: 'comments'
-            }
-            top_users = self.db.get_top_users(
-                session,
-                metric=metric_map[request.metric]
-            )
+            top_users = self._top('users', self.db.get_top_users, metric_map[request.metric], request, context)
+            if top_users is None:
+                return statistic_pb2.TopUsersResponse()
 
             return statistic_pb2.TopUsersResponse(
                 users=[statistic_pb2.TopUser(
@@ -109,8 +227,78 @@ class StatisticServiceServicer(statistic_pb2_grpc.StatisticServiceServicer):
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(f"get_top_users failed: {e}")
             return statistic_pb2.TopUsersResponse()
-        finally:
-            session.close()
+
+    def GetTrendingPosts(self, request, context):
+        metric_map = {
+            statistic_pb2.TrendingPostsRequest.VIEWS: 'views',
+            statistic_pb2.TrendingPostsRequest.LIKES: 'likes',
+            statistic_pb2.TrendingPostsRequest.COMMENTS: 'comments'
+        }
+        try:
+            limit = request.limit or DEFAULT_TOP_LIMIT
+            window_hours = request.window_hours or DEFAULT_TRENDING_WINDOW_HOURS
+            half_life_hours = request.half_life_hours or DEFAULT_HALF_LIFE_HOURS
+            if not self._valid_range(limit, window_hours, context):
+                return statistic_pb2.TrendingPostsResponse()
+            metric = metric_map[request.metric]
+
+            trending = self._cached(
+                ('trending', metric, limit, window_hours, half_life_hours),
+                lambda session: self.db.get_trending_posts(session, metric, limit, window_hours, half_life_hours)
+            )
+            return statistic_pb2.TrendingPostsResponse(
+                posts=[statistic_pb2.TrendingPost(
+                    post_id=item['post_id'],
+                    score=item['score'],
+                    count=item['count']
+                ) for item in trending]
+            )
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(f"get_trending_posts failed: {e}")
+            return statistic_pb2.TrendingPostsResponse()
+
+    def _top(self, kind: str, query, metric: str, request, context):
+        """
+        The fixed windows are served from the in-memory leaderboard; other windows, and the fixed
+        ones while the leaderboard is not ready, are queried from ClickHouse through the TTL cache.
+        """
+        limit = request.limit or DEFAULT_TOP_LIMIT
+        hours = request.window_hours or WINDOW_HOURS[WINDOW_NAMES[request.window]]
+        if not self._valid_range(limit, hours, context):
+            return None
+
+        window = next((name for name, window_hours in WINDOW_HOURS.items() if window_hours == hours), None)
+        if self.leaderboard is not None and window is not None:
+            top = self.leaderboard.top(kind, metric, window, limit)
+            if top is not None:
+                return top
+
+        return self._cached((kind, metric, limit, hours), lambda session: query(session, metric, limit, hours))
+
+    def _cached(self, key, load):
+        def query():
+            session = self.db.get_session()
+            try:
+                return load(session)
+            finally:
+                session.close()
+
+        if self.cache is None:
+            return query()
+        return self.cache.get_or_load(key, query)
+
+    @staticmethod
+    def _valid_range(limit: int, window_hours: int, context) -> bool:
+        if limit > LEADERBOARD_SIZE:
+            message = f"limit must not exceed {LEADERBOARD_SIZE}"
+        elif window_hours > MAX_WINDOW_HOURS:
+            message = f"window must not exceed {MAX_WINDOW_HOURS} hours"
+        else:
+            return True
+        context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+        context.set_details(message)
+        return False
 
     def GetPostIds(self, request, context):
         session = self.db.get_session()
@@ -123,3 +311,26 @@ class StatisticServiceServicer(statistic_pb2_grpc.StatisticServiceServicer):
             return statistic_pb2.GetPostIdsResponse()
         finally:
             session.close()
+
+    def AggregateBatch(self, request, context):
+        """
+        Attribution of counts from events without creator_id. Without creators it lists the posts
+        that still have such counts; otherwise the given creators are credited with their posts'
+        unattributed counts and recorded, and nothing is listed.
+        """
+        session = self.db.get_session()
+        try:
+            if not request.creators:
+                return statistic_pb2.AggregateBatchResponse(
+                    unattributed_post_ids=self.db.get_unattributed_post_ids(session)
+                )
+            return statistic_pb2.AggregateBatchResponse(recorded=self.db.attribute_posts([
+                {'post_id': item.post_id, 'creator_id': item.creator_id, 'updated_at': datetime.now()}
+                for item in request.creators
+            ]))
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(f"aggregate_batch failed: {e}")
+            return statistic_pb2.AggregateBatchResponse()
+        finally:
+            session.close()
@@ -0,0 +1,72 @@
+import logging
+import multiprocessing
+import signal
+import threading
+from typing import List, Optional
+from statistic_service.db.statistic_db import StatisticDB
+from broker.kafka_stats_consumer import KafkaStatsConsumer
+
+logger = logging.getLogger('ConsumerPool')
+
+
+def run_consumer_worker(db_url: str, stop_event, group_id: Optional[str] = None):
+    """
+    Entry point of a worker process: its own ClickHouse engine and Kafka consumer in the shared
+    consumer group. Signals are left to the parent, which stops workers through stop_event.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(processName)s - %(name)s - %(message)s')
+
+    db = StatisticDB(db_url)
+    consumer = KafkaStatsConsumer(db, group_id=group_id) if group_id else KafkaStatsConsumer(db)
+    threading.Thread(target=lambda: (stop_event.wait(), consumer.shutdown()), daemon=True).start()
+    try:
+        consumer.consume_messages()
+    finally:
+        db.close()
+
+
+class ConsumerPool:
+    """Runs `workers` consumer processes; Kafka spreads the topic partitions between them."""
+
+    def __init__(self, db_url: str, workers: int, group_id: Optional[str] = None):
+        self.db_url = db_url
+        self.workers = workers
+        self.group_id = group_id
+        self._context = multiprocessing.get_context('spawn')
+        self._stop_event = self._context.Event()
+        self._processes: List[multiprocessing.Process] = []
+
+    def start(self):
+        self._processes = [self._spawn(i) for i in range(self.workers)]
+        return self
+
+    def _spawn(self, index: int):
+        process = self._context.Process(
+            target=run_consumer_worker,
+            args=(self.db_url, self._stop_event, self.group_id),
+            name=f'stats-consumer-{index}',
+            daemon=True
+        )
+        process.start()
+        return process
+
+    def check(self) -> int:
+        """Restarts workers that exited; returns how many were restarted."""
+        restarted = 0
+        for index, process in enumerate(self._processes):
+            if not process.is_alive() and not self._stop_event.is_set():
+                logger.error(f"{process.name} exited with code {process.exitcode}, restarting")
+                self._processes[index] = self._spawn(index)
+                restarted += 1
+        return restarted
+
+    def stop(self, timeout: float = 30):
+        """Each worker flushes and commits its batch; the group then rebalances its partitions away."""
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"{process.name} did not stop in {timeout}s, terminating")
+                process.terminate()
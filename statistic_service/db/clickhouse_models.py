@@ -1,11 +1,25 @@
+import os
 import uuid
-from sqlalchemy import Column, PrimaryKeyConstraint
+from sqlalchemy import Column, PrimaryKeyConstraint, text
 from sqlalchemy.orm import declarative_base
-from clickhouse_sqlalchemy import types as ch_types, engines
+from sqlalchemy import func
+from clickhouse_sqlalchemy import types as ch_types, engines, select, MaterializedView
 from enum import Enum
 
 Base = declarative_base()
 
+# Raw events are kept for this long; the aggregate tables are not affected by the TTL
+EVENTS_TTL_DAYS = int(os.getenv("EVENTS_TTL_DAYS", "365"))
+# Hourly rollups only serve windowed rankings, so they are kept for a shorter time
+HOURLY_STATS_TTL_DAYS = int(os.getenv("HOURLY_STATS_TTL_DAYS", "30"))
+# Per-minute points are only needed for real-time charts
+MINUTE_STATS_TTL_DAYS = int(os.getenv("MINUTE_STATS_TTL_DAYS", "7"))
+# Tokens of this many recent inserts into events are remembered, so a repeated insert is dropped
+# before the materialized views count it again
+EVENTS_DEDUPLICATION_WINDOW = int(os.getenv("EVENTS_DEDUPLICATION_WINDOW", "1000"))
+# Same for the tables AggregateBatch writes to, which get one insert per call
+ATTRIBUTION_DEDUPLICATION_WINDOW = int(os.getenv("ATTRIBUTION_DEDUPLICATION_WINDOW", "100"))
+
 
 class EventType(Enum):
     VIEW = 1
@@ -19,17 +33,29 @@ class Event(Base):
     event_id = Column(ch_types.UUID, primary_key=True, default=lambda: str(uuid.uuid4()))
     post_id = Column(ch_types.String)
     event_type = Column(ch_types.Enum8(EventType))
-    event_date = Column(ch_types.Date)
+    event_date = Column(ch_types.Date, clickhouse_codec=('DoubleDelta', 'ZSTD(1)'))
+    # Actor and post author as sent by post_service; empty for events produced before they were added
+    user_id = Column(ch_types.String, clickhouse_codec='ZSTD(1)')
+    creator_id = Column(ch_types.String, clickhouse_codec='ZSTD(1)')
+    event_time = Column(ch_types.DateTime64(6), clickhouse_codec=('Delta', 'ZSTD(1)'))
 
+    # Raw events are append-only and never mutated; post_stats_mv and post_daily_stats_mv
+    # aggregate each inserted block. Sorted by post so per-post queries read only that post's
+    # granules; event_id ends the key so rows redelivered by the consumer collapse on merge. The
+    # views are not fed by merges, so the consumer also keeps repeated inserts out of this table.
     __table_args__ = (
-        engines.MergeTree(
-            order_by=('event_id', 'post_id'),
-            primary_key='event_id'
+        engines.ReplacingMergeTree(
+            order_by=('post_id', 'event_type', 'event_time', 'event_id'),
+            primary_key=('post_id', 'event_type', 'event_time'),
+            partition_by=func.toYYYYMM(text('event_date')),
+            ttl=text(f'event_date + INTERVAL {EVENTS_TTL_DAYS} DAY'),
+            non_replicated_deduplication_window=EVENTS_DEDUPLICATION_WINDOW
         ),
     )
 
 
 class PostStats(Base):
+    """Running totals per post, fed by post_stats_mv; rows are summed on merge, so read with sum()."""
     __tablename__ = 'post_stats'
 
     post_id = Column(ch_types.String, primary_key=True)
@@ -39,7 +65,8 @@ class PostStats(Base):
     updated_at = Column(ch_types.DateTime)
 
     __table_args__ = (
-        engines.MergeTree(
+        engines.SummingMergeTree(
+            columns=('views_count', 'likes_count', 'comments_count'),
             order_by=('post_id',),
             primary_key='post_id'
         ),
@@ -47,6 +74,7 @@ class PostStats(Base):
 
 
 class PostDailyStats(Base):
+    """Per post and day totals, fed by post_daily_stats_mv; read with sum()."""
     __tablename__ = 'post_daily_stats'
 
     post_id = Column(ch_types.String)
@@ -57,7 +85,8 @@ class PostDailyStats(Base):
 
     __table_args__ = (
         PrimaryKeyConstraint('post_id', 'date', name='post_daily_stats_pkey'),
-        engines.MergeTree(
+        engines.SummingMergeTree(
+            columns=('views_count', 'likes_count', 'comments_count'),
             order_by=('post_id', 'date'),
             primary_key=('post_id', 'date')
         ),
@@ -65,6 +94,10 @@ class PostDailyStats(Base):
 
 
 class UserStats(Base):
+    """
+    Totals per post author, fed by user_stats_mv from events that carry creator_id and by
+    AggregateBatch with the counts of post_unattributed_stats; read with sum().
+    """
     __tablename__ = 'user_stats'
 
     user_id = Column(ch_types.String, primary_key=True)
@@ -74,8 +107,185 @@ class UserStats(Base):
     updated_at = Column(ch_types.DateTime)
 
     __table_args__ = (
-        engines.MergeTree(
+        engines.SummingMergeTree(
+            columns=('views_count', 'likes_count', 'comments_count'),
             order_by=('user_id',),
-            primary_key='user_id'
+            primary_key='user_id',
+            non_replicated_deduplication_window=ATTRIBUTION_DEDUPLICATION_WINDOW
         ),
     )
+
+
+class PostUnattributedStats(Base):
+    """
+    Counts per post not yet credited to its author in user_stats: events without creator_id (via
+    post_unattributed_stats_mv) and totals of the legacy tables. AggregateBatch credits them and
+    writes the same counts back negated, so a post is settled once its sums are zero; read with sum().
+    """
+    __tablename__ = 'post_unattributed_stats'
+
+    post_id = Column(ch_types.String, primary_key=True)
+    views_count = Column(ch_types.Int64, default=0)
+    likes_count = Column(ch_types.Int64, default=0)
+    comments_count = Column(ch_types.Int64, default=0)
+
+    __table_args__ = (
+        engines.SummingMergeTree(
+            columns=('views_count', 'likes_count', 'comments_count'),
+            order_by=('post_id',),
+            primary_key='post_id',
+            non_replicated_deduplication_window=ATTRIBUTION_DEDUPLICATION_WINDOW
+        ),
+    )
+
+
+class PostHourlyStats(Base):
+    """Per post and hour totals for windowed rankings, fed by post_hourly_stats_mv; read with sum()."""
+    __tablename__ = 'post_hourly_stats'
+
+    post_id = Column(ch_types.String)
+    hour = Column(ch_types.DateTime)
+    views_count = Column(ch_types.UInt64, default=0)
+    likes_count = Column(ch_types.UInt64, default=0)
+    comments_count = Column(ch_types.UInt64, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('post_id', 'hour', name='post_hourly_stats_pkey'),
+        engines.SummingMergeTree(
+            columns=('views_count', 'likes_count', 'comments_count'),
+            order_by=('post_id', 'hour'),
+            primary_key=('post_id', 'hour'),
+            partition_by=func.toYYYYMMDD(text('hour')),
+            ttl=text(f'hour + INTERVAL {HOURLY_STATS_TTL_DAYS} DAY')
+        ),
+    )
+
+
+class PostMinuteStats(Base):
+    """Per post and minute totals for real-time charts, fed by post_minute_stats_mv; read with sum()."""
+    __tablename__ = 'post_minute_stats'
+
+    post_id = Column(ch_types.String)
+    minute = Column(ch_types.DateTime)
+    views_count = Column(ch_types.UInt64, default=0)
+    likes_count = Column(ch_types.UInt64, default=0)
+    comments_count = Column(ch_types.UInt64, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('post_id', 'minute', name='post_minute_stats_pkey'),
+        engines.SummingMergeTree(
+            columns=('views_count', 'likes_count', 'comments_count'),
+            order_by=('post_id', 'minute'),
+            primary_key=('post_id', 'minute'),
+            partition_by=func.toYYYYMMDD(text('minute')),
+            ttl=text(f'minute + INTERVAL {MINUTE_STATS_TTL_DAYS} DAY')
+        ),
+    )
+
+
+class UserHourlyStats(Base):
+    """Per post author and hour totals, fed by user_hourly_stats_mv; read with sum()."""
+    __tablename__ = 'user_hourly_stats'
+
+    user_id = Column(ch_types.String)
+    hour = Column(ch_types.DateTime)
+    views_count = Column(ch_types.UInt64, default=0)
+    likes_count = Column(ch_types.UInt64, default=0)
+    comments_count = Column(ch_types.UInt64, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('user_id', 'hour', name='user_hourly_stats_pkey'),
+        engines.SummingMergeTree(
+            columns=('views_count', 'likes_count', 'comments_count'),
+            order_by=('user_id', 'hour'),
+            primary_key=('user_id', 'hour'),
+            partition_by=func.toYYYYMMDD(text('hour')),
+            ttl=text(f'hour + INTERVAL {HOURLY_STATS_TTL_DAYS} DAY')
+        ),
+    )
+
+
+class PostCreator(Base):
+    """
+    Which user created a post; the latest attribution wins (read with argMax). Fed by
+    post_creators_mv, and by AggregateBatch for posts with events without creator_id.
+    """
+    __tablename__ = 'post_creators'
+
+    post_id = Column(ch_types.String, primary_key=True)
+    creator_id = Column(ch_types.String)
+    updated_at = Column(ch_types.DateTime)
+
+    __table_args__ = (
+        engines.ReplacingMergeTree(
+            version='updated_at',
+            order_by=('post_id',),
+            primary_key='post_id'
+        ),
+    )
+
+
+def _event_counts(*keys):
+    return select(
+        *keys,
+        func.countIf(Event.event_type == EventType.VIEW).label('views_count'),
+        func.countIf(Event.event_type == EventType.LIKE).label('likes_count'),
+        func.countIf(Event.event_type == EventType.COMMENT).label('comments_count')
+    )
+
+
+post_stats_mv = MaterializedView(
+    PostStats,
+    _event_counts(Event.post_id, func.now().label('updated_at')).group_by(Event.post_id),
+    use_to=True
+)
+
+post_daily_stats_mv = MaterializedView(
+    PostDailyStats,
+    _event_counts(Event.post_id, Event.event_date.label('date')).group_by(Event.post_id, Event.event_date),
+    use_to=True
+)
+
+user_stats_mv = MaterializedView(
+    UserStats,
+    _event_counts(Event.creator_id.label('user_id'), func.now().label('updated_at'))
+    .where(Event.creator_id != '').group_by(Event.creator_id),
+    use_to=True
+)
+
+post_unattributed_stats_mv = MaterializedView(
+    PostUnattributedStats,
+    _event_counts(Event.post_id).where(Event.creator_id == '').group_by(Event.post_id),
+    use_to=True
+)
+
+post_hourly_stats_mv = MaterializedView(
+    PostHourlyStats,
+    _event_counts(Event.post_id, func.toStartOfHour(Event.event_time).label('hour'))
+    .group_by(Event.post_id, text('hour')),
+    use_to=True
+)
+
+post_minute_stats_mv = MaterializedView(
+    PostMinuteStats,
+    _event_counts(Event.post_id, func.toStartOfMinute(Event.event_time).label('minute'))
+    .group_by(Event.post_id, text('minute')),
+    use_to=True
+)
+
+user_hourly_stats_mv = MaterializedView(
+    UserHourlyStats,
+    _event_counts(Event.creator_id.label('user_id'), func.toStartOfHour(Event.event_time).label('hour'))
+    .where(Event.creator_id != '').group_by(Event.creator_id, text('hour')),
+    use_to=True
+)
+
+post_creators_mv = MaterializedView(
+    PostCreator,
+    select(
+        Event.post_id,
+        func.argMax(Event.creator_id, Event.event_time).label('creator_id'),
+        func.now().label('updated_at')
+    ).where(Event.creator_id != '').group_by(Event.post_id),
+    use_to=True
+)
@@ -0,0 +1,95 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from .statistic_db import StatisticDB, METRICS
+
+logger = logging.getLogger('StatisticService.Leaderboard')
+
+# Ranking window -> hours of hourly rollups it covers; 0 is all time
+WINDOW_HOURS = {'all': 0, 'hour': 1, 'day': 24, 'week': 24 * 7}
+LEADERBOARD_SIZE = 100
+
+
+class Leaderboard:
+    """
+    Top LEADERBOARD_SIZE posts and users per metric and window, kept in memory. A background
+    thread recomputes every board from the rollup tables each refresh_interval seconds and
+    swaps them in at once, so a request only slices a ready list. Boards older than max_age
+    are not served and callers fall back to querying ClickHouse.
+    """
+
+    def __init__(self, db: StatisticDB, size: int = LEADERBOARD_SIZE, refresh_interval: float = 10.0,
+                 max_age: Optional[float] = None):
+        self.db = db
+        self.size = size
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age if max_age is not None else refresh_interval * 6
+        self._boards: Dict[Tuple[str, str, str], List[dict]] = {}
+        self._refreshed_at = 0.0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._refreshes = 0
+        self._refresh_errors = 0
+        self._hits = 0
+        self._misses = 0
+        self._last_refresh_ms = 0.0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='leaderboard-refresher', daemon=True)
+            self._thread.start()
+        return self
+
+    def top(self, kind: str, metric: str, window: str, limit: int) -> Optional[List[dict]]:
+        """The first limit entries of a board, or None when it is missing or stale."""
+        board = self._boards.get((kind, metric, window))
+        if board is None or time.monotonic() - self._refreshed_at > self.max_age:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return board[:limit]
+
+    def refresh(self) -> bool:
+        started = time.perf_counter()
+        boards = {}
+        session = self.db.get_session()
+        try:
+            for metric in METRICS:
+                for window, hours in WINDOW_HOURS.items():
+                    boards[('posts', metric, window)] = self.db.get_top_posts(session, metric, self.size, hours)
+                    boards[('users', metric, window)] = self.db.get_top_users(session, metric, self.size, hours)
+        except Exception:
+            self._refresh_errors += 1
+            logger.error("Failed to refresh leaderboards", exc_info=True)
+            return False
+        finally:
+            session.close()
+
+        self._boards = boards
+        self._refreshed_at = time.monotonic()
+        self._refreshes += 1
+        self._last_refresh_ms = (time.perf_counter() - started) * 1000
+        return True
+
+    def close(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            'boards': len(self._boards),
+            'age_seconds': round(time.monotonic() - self._refreshed_at, 3) if self._refreshes else -1,
+            'refreshes': self._refreshes,
+            'refresh_errors': self._refresh_errors,
+            'hits': self._hits,
+            'misses': self._misses,
+            'last_refresh_ms': round(self._last_refresh_ms, 3),
+        }
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.refresh()
+            self._stopped.wait(self.refresh_interval)
@@ -1,10 +1,43 @@
-import grpc
-from datetime import datetime
-from sqlalchemy import create_engine, func, desc, distinct
+import hashlib
+import math
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Set
+from collections import defaultdict
+from sqlalchemy import create_engine, func, desc, distinct, or_, select, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
-from .clickhouse_models import (Event, PostStats, PostDailyStats, UserStats, EventType)
-from sqlalchemy import text
+from .clickhouse_models import (Event, PostStats, PostDailyStats, UserStats, PostHourlyStats, PostMinuteStats,
+                                UserHourlyStats, PostCreator, PostUnattributedStats)
+
+# Granularity -> (rollup table, its time column, bucket length)
+DYNAMIC_ROLLUPS = {
+    'day': (PostDailyStats, 'date', timedelta(days=1)),
+    'hour': (PostHourlyStats, 'hour', timedelta(hours=1)),
+    'minute': (PostMinuteStats, 'minute', timedelta(minutes=1)),
+}
+STREAM_DYNAMIC_CHUNK = 1440
+METRICS = ('views', 'likes', 'comments')
+
+
+def align_range(granularity: str, start: datetime, end: datetime):
+    """Widens [start, end) to whole buckets."""
+    step = DYNAMIC_ROLLUPS[granularity][2]
+    epoch = datetime(1970, 1, 1)
+    aligned_start = epoch + (start - epoch) // step * step
+    aligned_end = epoch + -((epoch - end) // step) * step
+    return aligned_start, aligned_end
+
+
+def insert_statement(table, dialect, dedup_token: Optional[str] = None) -> str:
+    """
+    Multi-row INSERT into table; one repeating the dedup_token of a recent insert is dropped by tables
+    with non_replicated_deduplication_window, before their materialized views see it.
+    """
+    insert = str(table.insert().compile(dialect=dialect))
+    if dedup_token:
+        # The HTTP driver appends execution_options settings after the VALUES, so they go in the query
+        insert = insert.replace(" VALUES ", f" SETTINGS insert_deduplication_token='{dedup_token}' VALUES ", 1)
+    return insert
 
 
 class StatisticDB:
@@ -15,124 +48,83 @@ class StatisticDB:
     def get_session(self):
         return self.Session()
 
-    def aggregate_events(self, session, post_id, user_id):
-        try:
-            total_query = session.query(
-                Event.post_id,
-                func.count(func.if_(Event.event_type == EventType.VIEW, 1, None)).label("views"),
-                func.count(func.if_(Event.event_type == EventType.LIKE, 1, None)).label("likes"),
-                func.count(func.if_(Event.event_type == EventType.COMMENT, 1, None)).label("comments")
-            )
-
-            total_query = total_query.filter(Event.post_id == post_id)
-            total_query = total_query.group_by(Event.post_id)
-            total_stats = total_query.all()
-
-            for stat in total_stats:
-                stats_dict = {
-                    'post_id': stat.post_id,
-                    'views': stat.views,
-                    'likes': stat.likes,
-                    'comments': stat.comments
-                }
-                self._update_post_stats(session, stats_dict)
-                self._update_user_stats(session, user_id, stats_dict)
-
-            daily_query = session.query(
-                Event.post_id,
-                Event.event_date,
-                func.count(func.if_(Event.event_type == EventType.VIEW, 1, None)).label("views"),
-                func.count(func.if_(Event.event_type == EventType.LIKE, 1, None)).label("likes"),
-                func.count(func.if_(Event.event_type == EventType.COMMENT, 1, None)).label("comments")
-            )
+    def insert_events(self, rows: List[dict], dedup_token: Optional[str] = None) -> int:
+        """Writes a consumer batch with a single multi-row INSERT, i.e. one part in ClickHouse."""
+        if not rows:
+            return 0
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(insert_statement(Event.__table__, self.engine.dialect, dedup_token), rows)
+        return len(rows)
 
-            daily_query = daily_query.filter(Event.post_id == post_id)
-            daily_query = daily_query.group_by(Event.post_id, Event.event_date)
-            daily_stats = daily_query.all()
-
-            for stat in daily_stats:
-                stats_dict = {
-                    'post_id': stat.post_id,
-                    'event_date': stat.event_date,
-                    'views': stat.views,
-                    'likes': stat.likes,
-                    'comments': stat.comments
-                }
-                self._update_daily_stats(session, stats_dict)
+    def stored_event_ids(self, rows: List[dict]) -> Set[str]:
+        """event_ids of the given rows that are already in events."""
+        if not rows:
+            return set()
+        with self.engine.connect() as conn:
+            stored = conn.execute(select(Event.event_id).where(
+                Event.post_id.in_({row['post_id'] for row in rows}),
+                Event.event_id.in_([row['event_id'] for row in rows])
+            )).fetchall()
+        return {str(event_id) for event_id, in stored}
 
-            stmt = text("ALTER TABLE events DELETE WHERE post_id = :post_id")
-            session.execute(stmt, {"post_id": post_id})
-            session.commit()
-            return True
+    def attribute_posts(self, rows: List[dict]) -> int:
+        """
+        Records post -> creator for posts with counts in post_unattributed_stats and moves those
+        counts to the creators in user_stats. Returns the number of posts attributed.
 
-        except Exception as e:
-            print(f"Error in aggregate_events: {str(e)}")
-            session.rollback()
-            raise
+        ClickHouse has no transactions, so the credit is written first and the counts are settled
+        after it: a call that fails in between leaves the post listed, and its repetition finds the
+        same counts, so both inserts carry the same deduplication token and are dropped.
+        """
+        if not rows:
+            return 0
+        creators = {row['post_id']: row['creator_id'] for row in rows}
+        with self.engine.begin() as conn:
+            counts = conn.execute(select(
+                PostUnattributedStats.post_id,
+                func.sum(PostUnattributedStats.views_count),
+                func.sum(PostUnattributedStats.likes_count),
+                func.sum(PostUnattributedStats.comments_count)
+            ).where(
+                PostUnattributedStats.post_id.in_(list(creators))
+            ).group_by(PostUnattributedStats.post_id)).fetchall()
+            counts = sorted((post_id, views, likes, comments) for post_id, views, likes, comments in counts
+                            if views > 0 or likes > 0 or comments > 0)
 
-    def _update_daily_stats(self, session, stats):
-        existing = session.query(PostDailyStats).filter(
-            PostDailyStats.post_id == stats['post_id'],
-            PostDailyStats.date == stats['event_date']
-        ).first()
-
-        if existing:
-            existing.views_count += stats['views']
-            existing.likes_count += stats['likes']
-            existing.comments_count += stats['comments']
-        else:
-            new_stat = PostDailyStats(
-                post_id=stats['post_id'],
-                date=stats['event_date'],
-                views_count=stats['views'],
-                likes_count=stats['likes'],
-                comments_count=stats['comments']
-            )
-            session.add(new_stat)
-
-    def _update_post_stats(self, session, stats):
-        existing = session.query(PostStats).filter(
-            PostStats.post_id == stats['post_id']
-        ).first()
-
-        if existing:
-            existing.views_count += stats['views']
-            existing.likes_count += stats['likes']
-            existing.comments_count += stats['comments']
-            existing.updated_at = datetime.now()
-        else:
-            new_stat = PostStats(
-                post_id=stats['post_id'],
-                views_count=stats['views'],
-                likes_count=stats['likes'],
-                comments_count=stats['comments'],
-                updated_at=datetime.now()
-            )
-            session.add(new_stat)
-
-    def _update_user_stats(self, session, user_id, stats):
-        existing = session.query(UserStats).filter(
-            UserStats.user_id == user_id
-        ).first()
-
-        if existing:
-            existing.views_count += stats['views']
-            existing.likes_count += stats['likes']
-            existing.comments_count += stats['comments']
-            existing.updated_at = datetime.now()
-        else:
-            new_stat = UserStats(
-                user_id=user_id,
-                views_count=stats['views'],
-                likes_count=stats['likes'],
-                comments_count=stats['comments'],
-                updated_at=datetime.now()
-            )
-            session.add(new_stat)
+            if counts:
+                token = hashlib.sha1(repr([(count, creators[count[0]]) for count in counts]).encode()).hexdigest()
+                per_user = defaultdict(lambda: [0, 0, 0])
+                for post_id, views, likes, comments in counts:
+                    user_totals = per_user[creators[post_id]]
+                    user_totals[0] += views
+                    user_totals[1] += likes
+                    user_totals[2] += comments
+                now = datetime.now()
+                conn.exec_driver_sql(insert_statement(UserStats.__table__, self.engine.dialect, token), [{
+                    'user_id': user_id,
+                    'views_count': views,
+                    'likes_count': likes,
+                    'comments_count': comments,
+                    'updated_at': now
+                } for user_id, (views, likes, comments) in sorted(per_user.items())])
+                conn.exec_driver_sql(insert_statement(PostUnattributedStats.__table__, self.engine.dialect, token), [{
+                    'post_id': post_id,
+                    'views_count': -views,
+                    'likes_count': -likes,
+                    'comments_count': -comments
+                } for post_id, views, likes, comments in counts])
+            conn.execute(PostCreator.__table__.insert(), rows)
+        return len(rows)
 
     def get_post_stats(self, session, post_id: str) -> dict:
         try:
-            stats = session.query(PostStats).filter_by(post_id=post_id).first()
+            stats = session.query(
+                func.sum(PostStats.views_count).label('views_count'),
+                func.sum(PostStats.likes_count).label('likes_count'),
+                func.sum(PostStats.comments_count).label('comments_count')
+            ).filter(
+                PostStats.post_id == post_id
+            ).first()
 
             if not stats:
                 return {
@@ -151,61 +143,167 @@ class StatisticDB:
             print(f"Database error in get_post_stats: {str(e)}")
             raise RuntimeError(f"Database error: {str(e)}")
 
-    def get_post_dynamic(self, session, post_id: str, metric: str):
+    def get_post_dynamic(self, session, post_id: str, metric: str, granularity: str = 'day',
+                         start: Optional[datetime] = None, end: Optional[datetime] = None):
+        """
+        Per day, hour or minute counts of a post from the matching rollup. With a [start, end)
+        range ClickHouse fills the buckets without events (WITH FILL), so every bucket is returned.
+        """
         try:
-            stats = session.query(
-                PostDailyStats.date,
-                getattr(PostDailyStats, f"{metric}_count")
-            ).filter(
-                PostDailyStats.post_id == post_id
-            ).order_by(
-                PostDailyStats.date
-            ).all()
-
-            return [{'date': stat.date.isoformat(), 'count': getattr(stat, f"{metric}_count")}
-                    for stat in stats]
+            stats = self._dynamic(session, post_id, [metric], granularity, start, end)
+            return [{'date': stat.bucket.isoformat(), 'count': getattr(stat, metric)} for stat in stats]
         except SQLAlchemyError as e:
             print(f"Database error in get_post_dynamic: {str(e)}")
             raise
 
-    def get_top_posts(self, session, metric: str, limit: int = 10):
+    def get_post_dynamic_columns(self, session, post_id: str, granularity: str = 'day',
+                                 start: Optional[datetime] = None, end: Optional[datetime] = None) -> dict:
+        """get_post_dynamic for views, likes and comments at once, as parallel lists per bucket."""
         try:
-            column = getattr(PostStats, f"{metric}_count")
+            stats = self._dynamic(session, post_id, list(METRICS), granularity, start, end)
+            columns = {'dates': [stat.bucket.isoformat() for stat in stats]}
+            for metric in METRICS:
+                columns[metric] = [getattr(stat, metric) for stat in stats]
+            return columns
+        except SQLAlchemyError as e:
+            print(f"Database error in get_post_dynamic_columns: {str(e)}")
+            raise
 
-            top = session.query(
-                PostStats.post_id,
-                column
-            ).order_by(
-                desc(column)
-            ).limit(limit).all()
+    def iter_post_dynamic(self, session, post_id: str, metric: Optional[str], granularity: str, start: datetime,
+                          end: datetime, chunk_size: int = STREAM_DYNAMIC_CHUNK) -> Iterator:
+        """
+        get_post_dynamic over a long range, one query and one list per chunk_size buckets; with
+        metric None the chunks are get_post_dynamic_columns results.
+        """
+        start, end = align_range(granularity, start, end)
+        chunk = DYNAMIC_ROLLUPS[granularity][2] * chunk_size
+        while start < end:
+            chunk_end = min(start + chunk, end)
+            if metric is None:
+                yield self.get_post_dynamic_columns(session, post_id, granularity, start, chunk_end)
+            else:
+                yield self.get_post_dynamic(session, post_id, metric, granularity, start, chunk_end)
+            start = chunk_end
+
+    def _dynamic(self, session, post_id: str, metrics: List[str], granularity: str,
+                 start: Optional[datetime], end: Optional[datetime]):
+        model, column, step = DYNAMIC_ROLLUPS[granularity]
+        bucket = getattr(model, column)
+        query = session.query(
+            bucket.label('bucket'),
+            *[func.sum(getattr(model, f"{metric}_count")).label(metric) for metric in metrics]
+        ).filter(
+            model.post_id == post_id
+        )
+        if start is None:
+            return query.group_by(bucket).order_by(bucket).all()
+
+        start, end = align_range(granularity, start, end)
+        return query.filter(
+            bucket >= self._bucket_value(granularity, start),
+            bucket < self._bucket_value(granularity, end)
+        ).group_by(
+            bucket
+        ).order_by(
+            text(self._fill_clause(granularity, start, end, step))
+        ).all()
 
-            return [{'post_id': post_id, 'count': count} for post_id, count in top]
+    @staticmethod
+    def _bucket_value(granularity: str, value: datetime):
+        return value.date() if granularity == 'day' else value
+
+    @staticmethod
+    def _fill_clause(granularity: str, start: datetime, end: datetime, step: timedelta) -> str:
+        # start and end are datetimes built by the caller, so formatting them into SQL is safe
+        if granularity == 'day':
+            return f"bucket WITH FILL FROM toDate('{start:%Y-%m-%d}') TO toDate('{end:%Y-%m-%d}')"
+        return (f"bucket WITH FILL FROM toDateTime('{start:%Y-%m-%d %H:%M:%S}') "
+                f"TO toDateTime('{end:%Y-%m-%d %H:%M:%S}') STEP {int(step.total_seconds())}")
+
+    def get_top_posts(self, session, metric: str, limit: int = 10, window_hours: int = 0):
+        """All-time ranking from post_stats, or over the last window_hours hours from post_hourly_stats."""
+        try:
+            return [{'post_id': post_id, 'count': count} for post_id, count in
+                    self._top(session, PostStats, PostHourlyStats, 'post_id', metric, limit, window_hours)]
         except SQLAlchemyError as e:
             print(f"Database error in get_top_posts: {str(e)}")
             raise
 
-    def get_top_users(self, session, metric: str, limit: int = 10):
+    def get_top_users(self, session, metric: str, limit: int = 10, window_hours: int = 0):
+        """All-time ranking from user_stats, or over the last window_hours hours from user_hourly_stats."""
         try:
-            column = getattr(UserStats, f"{metric}_count")
+            return [{'user_id': user_id, 'count': count} for user_id, count in
+                    self._top(session, UserStats, UserHourlyStats, 'user_id', metric, limit, window_hours)]
+        except SQLAlchemyError as e:
+            print(f"Database error in get_top_users: {str(e)}")
+            raise
 
-            top = session.query(
-                UserStats.user_id,
-                column
+    def get_trending_posts(self, session, metric: str, limit: int = 10, window_hours: int = 48,
+                           half_life_hours: int = 6):
+        """
+        Posts ranked by decayed velocity over the last window_hours of post_hourly_stats: each hour's
+        count is halved every half_life_hours of age, and the sum is scaled to events per hour.
+        """
+        try:
+            counts = getattr(PostHourlyStats, f"{metric}_count")
+            age = func.dateDiff('hour', PostHourlyStats.hour, func.toStartOfHour(func.now()))
+            score = func.sum(counts * func.exp2(age * (-1.0 / half_life_hours))).label('score')
+
+            trending = session.query(
+                PostHourlyStats.post_id,
+                score,
+                func.sum(counts).label('total')
+            ).filter(
+                PostHourlyStats.hour >= func.toStartOfHour(func.now() - func.toIntervalHour(window_hours - 1))
+            ).group_by(
+                PostHourlyStats.post_id
             ).order_by(
-                desc(column)
+                desc(score)
             ).limit(limit).all()
 
-            return [{'user_id': user_id, 'count': count} for user_id, count in top]
+            velocity = math.log(2) / half_life_hours
+            return [{'post_id': post_id, 'score': score * velocity, 'count': total}
+                    for post_id, score, total in trending]
         except SQLAlchemyError as e:
-            print(f"Database error in get_top_users: {str(e)}")
+            print(f"Database error in get_trending_posts: {str(e)}")
             raise
 
+    @staticmethod
+    def _top(session, totals_model, hourly_model, key: str, metric: str, limit: int, window_hours: int):
+        model = hourly_model if window_hours else totals_model
+        total = func.sum(getattr(model, f"{metric}_count")).label('total')
+        query = session.query(getattr(model, key), total)
+        if window_hours:
+            query = query.filter(
+                model.hour >= func.toStartOfHour(func.now() - func.toIntervalHour(window_hours - 1))
+            )
+        return query.group_by(
+            getattr(model, key)
+        ).order_by(
+            desc(total)
+        ).limit(limit).all()
+
     def get_unique_post_ids(self, session):
         try:
-            post_ids = session.query(distinct(Event.post_id)).all()
+            post_ids = session.query(distinct(PostStats.post_id)).all()
             return [post_id[0] for post_id in post_ids if post_id[0]]
         except Exception as e:
-            print(f"Failed to get post ids from events: {str(e)}")
+            print(f"Failed to get post ids from post_stats: {str(e)}")
+            raise
+
+    def get_unattributed_post_ids(self, session):
+        """Posts with counts not yet credited to their author, from post_unattributed_stats."""
+        try:
+            post_ids = session.query(PostUnattributedStats.post_id).group_by(
+                PostUnattributedStats.post_id
+            ).having(or_(
+                func.sum(PostUnattributedStats.views_count) > 0,
+                func.sum(PostUnattributedStats.likes_count) > 0,
+                func.sum(PostUnattributedStats.comments_count) > 0
+            )).all()
+            return [post_id[0] for post_id in post_ids if post_id[0]]
+        except SQLAlchemyError as e:
+            print(f"Database error in get_unattributed_post_ids: {str(e)}")
             raise
 
     def close(self):
@@ -0,0 +1,75 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Keeps query results for ttl seconds. Concurrent misses for the same key wait for one load
+    instead of each querying ClickHouse; failed loads are not cached. Once max_entries keys are
+    stored, expired entries are dropped, and if none have expired the oldest one is.
+    """
+
+    def __init__(self, ttl: float = 5.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        # Key -> [lock held by the loading thread, threads using it]; dropped once the last one leaves
+        self._loading: Dict[Hashable, List] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        with self._lock:
+            value = self._fresh(key)
+            if value is not _MISSING:
+                return value
+            loading = self._loading.setdefault(key, [threading.Lock(), 0])
+            loading[1] += 1
+        try:
+            with loading[0]:
+                with self._lock:
+                    value = self._fresh(key)
+                    if value is not _MISSING:
+                        return value
+                    self._misses += 1
+                value = load()
+                with self._lock:
+                    self._evict()
+                    self._entries[key] = (time.monotonic() + self.ttl, value)
+                return value
+        finally:
+            with self._lock:
+                loading[1] -= 1
+                if not loading[1]:
+                    del self._loading[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'hits': self._hits,
+            'misses': self._misses,
+        }
+
+    def _fresh(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return _MISSING
+        self._hits += 1
+        return entry[1]
+
+    def _evict(self):
+        if len(self._entries) < self.max_entries:
+            return
+        now = time.monotonic()
+        for key in [key for key, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        if len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
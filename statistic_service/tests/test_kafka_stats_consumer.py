@@ -0,0 +1,197 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from broker.event_codec import encode_event
+from statistic_service.db.clickhouse_models import EventType
+from broker.kafka_stats_consumer import KafkaStatsConsumer
+from datetime import datetime
+
+
+def make_message(topic, offset, post_id="post1", partition=0, timestamp=None):
+    payload, headers = encode_event({
+        "event_type": "post_viewed",
+        "timestamp": timestamp or datetime.now(),
+        "user_id": "user1",
+        "post_id": post_id,
+        "creator_id": "author1"
+    })
+    msg = MagicMock()
+    msg.error.return_value = None
+    msg.topic.return_value = topic
+    msg.partition.return_value = partition
+    msg.offset.return_value = offset
+    msg.value.return_value = payload
+    msg.headers.return_value = headers
+    return msg
+
+
+@pytest.fixture
+def consumer():
+    with patch('broker.kafka_stats_consumer.Consumer'):
+        consumer = KafkaStatsConsumer(MagicMock(), batch_size=3, batch_interval=60)
+        consumer.retry_delay = 0
+        yield consumer
+
+
+def test_batch_is_inserted_once_and_then_committed(consumer):
+    for offset in range(3):
+        consumer._process_message(make_message('post_views', offset))
+    assert consumer._batch_is_due()
+
+    consumer._flush()
+    consumer.db.insert_events.assert_called_once()
+    rows = consumer.db.insert_events.call_args[0][0]
+    assert len(rows) == 3
+    assert rows[0]['event_type'] == EventType.VIEW
+    consumer.consumer.commit.assert_called_once_with(asynchronous=False)
+    assert not consumer._batch_is_due()
+
+
+def test_row_carries_actor_creator_and_event_time(consumer):
+    timestamp = datetime(2025, 5, 20, 23, 59, 59, 250000)
+    consumer._process_message(make_message('post_views', 0, timestamp=timestamp))
+
+    row = consumer._rows[0]
+    assert row['user_id'] == "user1"
+    assert row['creator_id'] == "author1"
+    assert row['event_time'] == timestamp
+    assert row['event_date'] == timestamp.date()
+
+
+def test_legacy_json_event_without_creator(consumer):
+    msg = make_message('post_likes', 0)
+    msg.value.return_value = b'{"event_type": "post_liked", "post_id": "7", "user_id": "u"}'
+    msg.headers.return_value = None
+    consumer._process_message(msg)
+
+    assert consumer._rows[0]['creator_id'] == ''
+    assert consumer._rows[0]['post_id'] == "7"
+
+
+def test_offsets_not_committed_when_insert_fails(consumer):
+    consumer.max_retries = 2
+    consumer.db.insert_events.side_effect = RuntimeError("ClickHouse unavailable")
+    consumer._process_message(make_message('post_likes', 0))
+
+    with pytest.raises(RuntimeError):
+        consumer._flush()
+    assert consumer.db.insert_events.call_count == 2
+    consumer.consumer.commit.assert_not_called()
+
+
+def test_event_id_is_stable_for_redelivered_message(consumer):
+    consumer._process_message(make_message('post_views', 42, partition=1))
+    consumer._process_message(make_message('post_views', 42, partition=1))
+    consumer._process_message(make_message('post_views', 43, partition=1))
+    ids = [row['event_id'] for row in consumer._rows]
+    assert ids[0] == ids[1]
+    assert ids[0] != ids[2]
+
+
+def test_malformed_message_is_skipped_but_committed(consumer):
+    msg = make_message('post_views', 0)
+    msg.value.return_value = b'\xff'
+    consumer._process_message(msg)
+    assert consumer._rows == []
+
+    consumer._flush()
+    consumer.consumer.commit.assert_called_once_with(asynchronous=False)
+
+
+def test_revoke_flushes_pending_batch(consumer):
+    consumer._process_message(make_message('post_comments', 5))
+    consumer._on_revoke(consumer.consumer, [])
+
+    consumer.db.insert_events.assert_called_once()
+    consumer.consumer.commit.assert_called_once_with(asynchronous=False)
+    assert consumer._rows == []
+
+
+def test_pool_restarts_dead_workers():
+    from statistic_service.consumer_pool import ConsumerPool
+    pool = ConsumerPool("clickhouse://mock", workers=2)
+    dead, alive = MagicMock(), MagicMock()
+    dead.is_alive.return_value = False
+    alive.is_alive.return_value = True
+    pool._processes = [dead, alive]
+    pool._spawn = MagicMock(return_value="respawned")
+
+    assert pool.check() == 1
+    pool._spawn.assert_called_once_with(0)
+    assert pool._processes == ["respawned", alive]
+
+
+class EventStore:
+    """events plus a view counting every inserted row, with ClickHouse's insert deduplication."""
+
+    def __init__(self):
+        self.event_ids = set()
+        self.tokens = set()
+        self.views_count = 0
+        self.fail_after_insert = False
+
+    def insert_events(self, rows, dedup_token=None):
+        if dedup_token not in self.tokens:
+            self.tokens.add(dedup_token)
+            self.event_ids.update(row['event_id'] for row in rows)
+            self.views_count += len(rows)
+        if self.fail_after_insert:
+            self.fail_after_insert = False
+            raise TimeoutError("response lost")
+        return len(rows)
+
+    def stored_event_ids(self, rows):
+        return {row['event_id'] for row in rows} & self.event_ids
+
+
+def make_consumer(db):
+    with patch('broker.kafka_stats_consumer.Consumer'):
+        consumer = KafkaStatsConsumer(db, batch_size=10, batch_interval=60)
+    consumer.retry_delay = 0
+    return consumer
+
+
+def test_batch_replayed_after_crash_before_commit_is_counted_once():
+    store = EventStore()
+    crashed = make_consumer(store)
+    crashed.consumer.commit.side_effect = RuntimeError("killed")
+    for offset in range(3):
+        crashed._process_message(make_message('post_views', offset))
+    with pytest.raises(RuntimeError):
+        crashed._flush()
+    assert store.views_count == 3
+
+    # The next owner starts from the committed offset and cuts a larger batch
+    replay = make_consumer(store)
+    replay._on_assign(replay.consumer, [])
+    for offset in range(5):
+        replay._process_message(make_message('post_views', offset))
+    replay._flush()
+
+    assert store.views_count == 5
+    replay.consumer.commit.assert_called_once_with(asynchronous=False)
+
+
+def test_retried_insert_is_deduplicated_by_token():
+    store = EventStore()
+    store.fail_after_insert = True
+    consumer = make_consumer(store)
+    for offset in range(3):
+        consumer._process_message(make_message('post_views', offset))
+
+    consumer._flush()
+
+    assert store.views_count == 3
+    assert len(store.tokens) == 1
+
+
+def test_batch_token_follows_offset_ranges(consumer):
+    consumer._process_message(make_message('post_views', 7, partition=1))
+    consumer._process_message(make_message('post_likes', 3))
+    token = consumer._batch_token()
+    consumer._flush()
+
+    consumer._process_message(make_message('post_likes', 3))
+    consumer._process_message(make_message('post_views', 7, partition=1))
+    assert consumer._batch_token() == token
+    consumer._process_message(make_message('post_views', 8, partition=1))
+    assert consumer._batch_token() != token
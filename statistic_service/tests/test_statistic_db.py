@@ -10,29 +10,65 @@ def db():
 
 
 class TestStatisticDB:
-    def test_aggregate_events(self, db):
-        mock_session = MagicMock()
-
-        mock_total_stat = MagicMock()
-        mock_total_stat.post_id = "post1"
-        mock_total_stat.views = 10
-        mock_total_stat.likes = 5
-        mock_total_stat.comments = 3
-
-        mock_daily_stat = MagicMock()
-        mock_daily_stat.post_id = "post1"
-        mock_daily_stat.event_date = datetime.now().date()
-        mock_daily_stat.views = 10
-        mock_daily_stat.likes = 5
-        mock_daily_stat.comments = 3
-
-        mock_session.query().filter().group_by().all.return_value = [mock_total_stat]
-        mock_session.query().group_by().all.return_value = [mock_daily_stat]
-
-        db.aggregate_events(mock_session, "post1", "user1")
-
-        assert mock_session.commit.called
-        assert mock_session.execute.called
+    def test_attribute_posts_credits_unattributed_counts_before_recording_creators(self, db):
+        conn = MagicMock()
+        conn.execute.return_value.fetchall.return_value = [("post1", 10, 2, 1), ("post2", 5, 0, 0), ("post3", 0, 0, 0)]
+        dialect = db.engine.dialect
+        db.engine = MagicMock(dialect=dialect)
+        db.engine.begin.return_value.__enter__.return_value = conn
+        rows = [{"post_id": "post1", "creator_id": "user1", "updated_at": datetime.now()},
+                {"post_id": "post2", "creator_id": "user1", "updated_at": datetime.now()},
+                {"post_id": "post3", "creator_id": "user2", "updated_at": datetime.now()}]
+
+        assert db.attribute_posts(rows) == 3
+
+        (user_stats_insert, credited), (settle_insert, settled) = [call[0] for call in conn.exec_driver_sql.call_args_list]
+        assert user_stats_insert.startswith("INSERT INTO user_stats ")
+        assert credited == [{
+            "user_id": "user1", "views_count": 15, "likes_count": 2, "comments_count": 1,
+            "updated_at": credited[0]["updated_at"]
+        }]
+        assert settle_insert.startswith("INSERT INTO post_unattributed_stats ")
+        assert settled == [
+            {"post_id": "post1", "views_count": -10, "likes_count": -2, "comments_count": -1},
+            {"post_id": "post2", "views_count": -5, "likes_count": 0, "comments_count": 0}
+        ]
+        _, creators_insert = conn.execute.call_args_list
+        assert creators_insert[0][1] == rows
+
+    def test_attribute_posts_repeated_call_reuses_deduplication_token(self, db):
+        dialect = db.engine.dialect
+        tokens = []
+        for _ in range(2):
+            conn = MagicMock()
+            conn.execute.return_value.fetchall.return_value = [("post1", 10, 2, 1)]
+            db.engine = MagicMock(dialect=dialect)
+            db.engine.begin.return_value.__enter__.return_value = conn
+            db.attribute_posts([{"post_id": "post1", "creator_id": "user1", "updated_at": datetime.now()}])
+            tokens.append([call[0][0].split("insert_deduplication_token='")[1][:40]
+                           for call in conn.exec_driver_sql.call_args_list])
+
+        assert tokens[0] == tokens[1]
+
+    def test_insert_events_passes_deduplication_token(self, db):
+        conn = MagicMock()
+        dialect = db.engine.dialect
+        db.engine = MagicMock(dialect=dialect)
+        db.engine.begin.return_value.__enter__.return_value = conn
+        rows = [{"event_id": "e1", "post_id": "post1"}]
+
+        assert db.insert_events(rows, dedup_token="abc") == 1
+
+        query, params = conn.exec_driver_sql.call_args[0]
+        assert query.startswith("INSERT INTO events (")
+        assert ") SETTINGS insert_deduplication_token='abc' VALUES (" in query
+        assert params == rows
+
+    def test_attribute_posts_empty(self, db):
+        db.engine = MagicMock()
+
+        assert db.attribute_posts([]) == 0
+        db.engine.begin.assert_not_called()
 
     def test_get_post_stats(self, db):
         mock_session = MagicMock()
@@ -41,7 +77,7 @@ class TestStatisticDB:
         mock_stats.likes_count = 50
         mock_stats.comments_count = 30
 
-        mock_session.query().filter_by().first.return_value = mock_stats
+        mock_session.query().filter().first.return_value = mock_stats
 
         result = db.get_post_stats(mock_session, "post1")
 
@@ -49,15 +85,28 @@ class TestStatisticDB:
         assert result["likes_count"] == 50
         assert result["comments_count"] == 30
 
+    def test_get_post_stats_without_rows(self, db):
+        mock_session = MagicMock()
+        mock_stats = Mock()
+        mock_stats.views_count = None
+        mock_stats.likes_count = None
+        mock_stats.comments_count = None
+
+        mock_session.query().filter().first.return_value = mock_stats
+
+        result = db.get_post_stats(mock_session, "post1")
+
+        assert result == {"views_count": 0, "likes_count": 0, "comments_count": 0}
+
     def test_get_post_dynamic(self, db):
         mock_session = MagicMock()
         mock_date = datetime.now().date()
 
         mock_stat = MagicMock()
-        mock_stat.date = mock_date
-        mock_stat.views_count = 10
+        mock_stat.bucket = mock_date
+        mock_stat.views = 10
 
-        mock_session.query().filter().order_by().all.return_value = [mock_stat]
+        mock_session.query().filter().group_by().order_by().all.return_value = [mock_stat]
 
         result = db.get_post_dynamic(mock_session, "post1", "views")
 
@@ -65,9 +114,55 @@ class TestStatisticDB:
         assert result[0]["date"] == mock_date.isoformat()
         assert result[0]["count"] == 10
 
+    def test_get_post_dynamic_range_is_filled_in_clickhouse(self, db):
+        mock_session = MagicMock()
+        mock_stat = MagicMock()
+        mock_stat.bucket = datetime(2025, 5, 20, 13, 5)
+        mock_stat.likes = 0
+        mock_session.query().filter().filter().group_by().order_by().all.return_value = [mock_stat]
+
+        result = db.get_post_dynamic(mock_session, "post1", "likes", "minute",
+                                     datetime(2025, 5, 20, 13, 5, 30), datetime(2025, 5, 20, 14, 0))
+
+        assert result == [{"date": "2025-05-20T13:05:00", "count": 0}]
+        order = str(mock_session.query().filter().filter().group_by().order_by.call_args[0][0])
+        assert order == ("bucket WITH FILL FROM toDateTime('2025-05-20 13:05:00') "
+                         "TO toDateTime('2025-05-20 14:00:00') STEP 60")
+
+    def test_get_post_dynamic_columns_in_one_query(self, db):
+        mock_session = MagicMock()
+        mock_session.query().filter().group_by().order_by().all.return_value = [
+            MagicMock(bucket=datetime(2025, 5, 20).date(), views=10, likes=2, comments=1),
+            MagicMock(bucket=datetime(2025, 5, 21).date(), views=7, likes=0, comments=3)
+        ]
+
+        result = db.get_post_dynamic_columns(mock_session, "post1")
+
+        assert result == {
+            "dates": ["2025-05-20", "2025-05-21"],
+            "views": [10, 7],
+            "likes": [2, 0],
+            "comments": [1, 3]
+        }
+        labels = [column.name for column in
+                  next(call[0] for call in mock_session.query.call_args_list if call[0])]
+        assert labels == ["bucket", "views", "likes", "comments"]
+
+    def test_iter_post_dynamic_splits_range_into_chunks(self, db):
+        db.get_post_dynamic = MagicMock(return_value=[])
+        start = datetime(2025, 5, 20, 0, 30)
+
+        chunks = list(db.iter_post_dynamic(MagicMock(), "post1", "views", "hour", start,
+                                           datetime(2025, 5, 22, 0, 0), chunk_size=24))
+
+        assert len(chunks) == 2
+        ranges = [call[0][4:6] for call in db.get_post_dynamic.call_args_list]
+        assert ranges == [(datetime(2025, 5, 20), datetime(2025, 5, 21)),
+                          (datetime(2025, 5, 21), datetime(2025, 5, 22))]
+
     def test_get_top_posts(self, db):
         mock_session = MagicMock()
-        mock_session.query().order_by().limit().all.return_value = [
+        mock_session.query().group_by().order_by().limit().all.return_value = [
             ("post1", 100),
             ("post2", 90)
         ]
@@ -80,7 +175,7 @@ class TestStatisticDB:
 
     def test_get_top_users(self, db):
         mock_session = MagicMock()
-        mock_session.query().order_by().limit().all.return_value = [
+        mock_session.query().group_by().order_by().limit().all.return_value = [
             ("user1", 200),
             ("user2", 150)
         ]
@@ -91,6 +186,27 @@ class TestStatisticDB:
         assert result[0]["user_id"] == "user1"
         assert result[0]["count"] == 200
 
+    def test_get_top_posts_over_window_reads_hourly_rollup(self, db):
+        mock_session = MagicMock()
+        mock_session.query().filter().group_by().order_by().limit().all.return_value = [("post1", 7)]
+
+        result = db.get_top_posts(mock_session, "likes", limit=5, window_hours=24)
+
+        assert result == [{"post_id": "post1", "count": 7}]
+        mock_session.query().filter().group_by().order_by().limit.assert_called_with(5)
+        query_args = next(call[0] for call in mock_session.query.call_args_list if call[0])
+        assert str(query_args[0]) == "PostHourlyStats.post_id"
+
+    def test_get_trending_posts_scales_score_to_events_per_hour(self, db):
+        mock_session = MagicMock()
+        mock_session.query().filter().group_by().order_by().limit().all.return_value = [("post1", 60.0, 80)]
+
+        result = db.get_trending_posts(mock_session, "views", limit=3, window_hours=24, half_life_hours=6)
+
+        assert result[0]["post_id"] == "post1"
+        assert result[0]["count"] == 80
+        assert result[0]["score"] == pytest.approx(60.0 * 0.6931 / 6, rel=1e-3)
+
     def test_get_unique_post_ids(self, db):
         mock_session = MagicMock()
         mock_session.query().all.return_value = [
@@ -100,3 +216,13 @@ class TestStatisticDB:
 
         result = db.get_unique_post_ids(mock_session)
         assert result == ["post1", "post2"]
+
+    def test_get_unattributed_post_ids(self, db):
+        mock_session = MagicMock()
+        mock_session.query().group_by().having().all.return_value = [
+            ("post1",),
+            ("",)
+        ]
+
+        result = db.get_unattributed_post_ids(mock_session)
+        assert result == ["post1"]
@@ -1,4 +1,5 @@
 import pytest
+from datetime import datetime, timedelta
 from unittest.mock import Mock
 import grpc
 import sys
@@ -10,6 +11,8 @@ sys.path.insert(0, PROTO_PATH)
 from proto import statistic_pb2, statistic_pb2_grpc
 from statistic_service.api.statistic_grpc_service import StatisticServiceServicer
 from statistic_service.db.statistic_db import StatisticDB
+from statistic_service.db.leaderboard import Leaderboard
+from statistic_service.db.ttl_cache import TTLCache
 
 TEST_POST_ID = "test_post_1"
 TEST_USER_ID = "test_user_1"
@@ -38,6 +41,9 @@ def mock_db():
         {"user_id": "user1", "count": 200},
         {"user_id": "user2", "count": 150}
     ]
+    db.get_trending_posts.return_value = [
+        {"post_id": "post3", "score": 12.5, "count": 40}
+    ]
     db.get_unique_post_ids.return_value = TEST_POST_IDS
     return db
 
@@ -60,11 +66,11 @@ class TestGetPostStats:
         assert response.views_count == 100
         assert response.likes_count == 50
         assert response.comments_count == 30
-        mock_db.aggregate_events.assert_called_once()
-        mock_db.get_post_stats.assert_called_once()
+        mock_db.get_post_stats.assert_called_once_with(mock_db.get_session.return_value, TEST_POST_ID)
+        mock_db.get_session.return_value.commit.assert_not_called()
 
     def test_db_error(self, statistic_service, mock_db):
-        mock_db.aggregate_events.side_effect = Exception("DB error")
+        mock_db.get_post_stats.side_effect = Exception("DB error")
         request = statistic_pb2.PostStatsRequest(
             post_id=TEST_POST_ID,
             user_id=TEST_USER_ID
@@ -91,7 +97,6 @@ class TestGetPostDynamic:
         assert len(response.stats) == 2
         assert response.stats[0].date == "2023-01-01"
         assert response.stats[0].count == 10
-        mock_db.aggregate_events.assert_called_once()
         mock_db.get_post_dynamic.assert_called_once()
 
     def test_invalid_metric(self, statistic_service, mock_db):
@@ -108,6 +113,96 @@ class TestGetPostDynamic:
         assert response == statistic_pb2.PostDynamicResponse()
         context.set_code.assert_called_with(grpc.StatusCode.INTERNAL)
 
+    def test_granularity_and_range(self, statistic_service, mock_db):
+        end = datetime.now().replace(minute=0, second=0, microsecond=0)
+        request = statistic_pb2.PostDynamicRequest(
+            post_id=TEST_POST_ID,
+            granularity=statistic_pb2.PostDynamicRequest.HOUR,
+            from_=(end - timedelta(days=1)).isoformat(),
+            to_=end.isoformat()
+        )
+
+        statistic_service.GetPostDynamic(request, Mock())
+
+        kwargs = mock_db.get_post_dynamic.call_args[1]
+        assert kwargs['granularity'] == 'hour'
+        assert kwargs['start'] == end - timedelta(days=1)
+        assert kwargs['end'] == end
+
+    def test_range_older_than_the_rollup_is_kept_is_rejected(self, statistic_service, mock_db):
+        context = Mock()
+        request = statistic_pb2.PostDynamicRequest(
+            post_id=TEST_POST_ID,
+            granularity=statistic_pb2.PostDynamicRequest.MINUTE,
+            from_=(datetime.now() - timedelta(days=8)).isoformat(),
+            to_=(datetime.now() - timedelta(days=8) + timedelta(hours=1)).isoformat()
+        )
+
+        assert list(statistic_service.StreamPostDynamic(request, context)) == []
+
+        context.set_code.assert_called_with(grpc.StatusCode.INVALID_ARGUMENT)
+        context.set_details.assert_called_with("Points by minute are only kept for 7 days")
+        mock_db.iter_post_dynamic.assert_not_called()
+
+    def test_invalid_range(self, statistic_service, mock_db):
+        for from_, to_ in [("yesterday", ""), ("2025-05-21T00:00:00", "2025-05-20T00:00:00")]:
+            context = Mock()
+            request = statistic_pb2.PostDynamicRequest(post_id=TEST_POST_ID, from_=from_, to_=to_)
+
+            statistic_service.GetPostDynamic(request, context)
+
+            context.set_code.assert_called_with(grpc.StatusCode.INVALID_ARGUMENT)
+        mock_db.get_post_dynamic.assert_not_called()
+
+    def test_too_many_points_for_unary_call(self, statistic_service, mock_db):
+        context = Mock()
+        request = statistic_pb2.PostDynamicRequest(
+            post_id=TEST_POST_ID,
+            granularity=statistic_pb2.PostDynamicRequest.MINUTE,
+            from_=(datetime.now() - timedelta(days=7) + timedelta(hours=1)).isoformat()
+        )
+
+        statistic_service.GetPostDynamic(request, context)
+
+        context.set_code.assert_called_with(grpc.StatusCode.INVALID_ARGUMENT)
+        context.set_details.assert_called_with("Range exceeds 10000 points, use StreamPostDynamic")
+        mock_db.get_post_dynamic.assert_not_called()
+
+    def test_all_metrics_in_columns(self, statistic_service, mock_db):
+        mock_db.get_post_dynamic_columns.return_value = {
+            "dates": ["2023-01-01", "2023-01-02"], "views": [10, 20], "likes": [1, 0], "comments": [0, 3]
+        }
+        request = statistic_pb2.PostDynamicRequest(post_id=TEST_POST_ID, all_metrics=True)
+
+        response = statistic_service.GetPostDynamic(request, Mock())
+
+        assert list(response.dates) == ["2023-01-01", "2023-01-02"]
+        assert list(response.views) == [10, 20]
+        assert list(response.likes) == [1, 0]
+        assert list(response.comments) == [0, 3]
+        assert len(response.stats) == 0
+        mock_db.get_post_dynamic.assert_not_called()
+
+    def test_stream_all_metrics(self, statistic_service, mock_db):
+        mock_db.iter_post_dynamic.return_value = iter([
+            {"dates": ["2023-01-01"], "views": [4], "likes": [2], "comments": [1]}
+        ])
+        request = statistic_pb2.PostDynamicRequest(post_id=TEST_POST_ID, from_="2023-01-01", all_metrics=True)
+
+        responses = list(statistic_service.StreamPostDynamic(request, Mock()))
+
+        assert list(responses[0].likes) == [2]
+        assert mock_db.iter_post_dynamic.call_args[0][2] is None
+
+    def test_stream(self, statistic_service, mock_db):
+        mock_db.iter_post_dynamic.return_value = iter([TEST_DAILY_STATS, [{"date": "2023-01-03", "count": 5}]])
+        request = statistic_pb2.PostDynamicRequest(post_id=TEST_POST_ID, from_="2023-01-01", to_="2023-01-04")
+
+        responses = list(statistic_service.StreamPostDynamic(request, Mock()))
+
+        assert [len(response.stats) for response in responses] == [2, 1]
+        assert mock_db.iter_post_dynamic.call_args[0][3:] == ('day', datetime(2023, 1, 1), datetime(2023, 1, 4))
+
 
 class TestGetTopPosts:
     def test_success(self, statistic_service, mock_db):
@@ -137,6 +232,106 @@ class TestGetTopPosts:
         assert response == statistic_pb2.TopPostsResponse()
         context.set_code.assert_called_with(grpc.StatusCode.INTERNAL)
 
+    def test_limit_and_window_are_passed_to_db(self, statistic_service, mock_db):
+        request = statistic_pb2.TopPostsRequest(
+            metric=statistic_pb2.TopPostsRequest.LIKES,
+            limit=50,
+            window=statistic_pb2.TopPostsRequest.WEEK
+        )
+
+        statistic_service.GetTopPosts(request, Mock())
+
+        mock_db.get_top_posts.assert_called_once_with(mock_db.get_session.return_value, 'likes', 50, 168)
+
+    def test_limit_too_large(self, statistic_service, mock_db):
+        context = Mock()
+
+        response = statistic_service.GetTopPosts(statistic_pb2.TopPostsRequest(limit=1000), context)
+
+        assert response == statistic_pb2.TopPostsResponse()
+        context.set_code.assert_called_with(grpc.StatusCode.INVALID_ARGUMENT)
+        mock_db.get_top_posts.assert_not_called()
+
+    def test_served_from_leaderboard(self, mock_db):
+        leaderboard = Leaderboard(mock_db)
+        leaderboard.refresh()
+        mock_db.get_top_posts.reset_mock()
+        service = StatisticServiceServicer(mock_db, leaderboard)
+
+        response = service.GetTopPosts(
+            statistic_pb2.TopPostsRequest(limit=1, window=statistic_pb2.TopPostsRequest.DAY), Mock()
+        )
+
+        assert [post.post_id for post in response.posts] == ["post1"]
+        mock_db.get_top_posts.assert_not_called()
+
+    def test_arbitrary_window_is_cached(self, mock_db):
+        service = StatisticServiceServicer(mock_db, Leaderboard(mock_db), TTLCache(ttl=60))
+        request = statistic_pb2.TopPostsRequest(limit=5, window_hours=3)
+
+        service.GetTopPosts(request, Mock())
+        response = service.GetTopPosts(request, Mock())
+
+        assert len(response.posts) == 2
+        mock_db.get_top_posts.assert_called_once_with(mock_db.get_session.return_value, 'views', 5, 3)
+
+    def test_window_longer_than_rollups(self, statistic_service, mock_db):
+        context = Mock()
+
+        statistic_service.GetTopPosts(statistic_pb2.TopPostsRequest(window_hours=24 * 365), context)
+
+        context.set_code.assert_called_with(grpc.StatusCode.INVALID_ARGUMENT)
+        mock_db.get_top_posts.assert_not_called()
+
+
+class TestGetTrendingPosts:
+    def test_defaults(self, statistic_service, mock_db):
+        response = statistic_service.GetTrendingPosts(
+            statistic_pb2.TrendingPostsRequest(metric=statistic_pb2.TrendingPostsRequest.LIKES), Mock()
+        )
+
+        assert response.posts[0].post_id == "post3"
+        assert response.posts[0].score == 12.5
+        assert response.posts[0].count == 40
+        mock_db.get_trending_posts.assert_called_once_with(mock_db.get_session.return_value, 'likes', 10, 48, 6)
+
+    def test_db_error(self, statistic_service, mock_db):
+        mock_db.get_trending_posts.side_effect = Exception("DB error")
+        context = Mock()
+
+        response = statistic_service.GetTrendingPosts(statistic_pb2.TrendingPostsRequest(), context)
+
+        assert response == statistic_pb2.TrendingPostsResponse()
+        context.set_code.assert_called_with(grpc.StatusCode.INTERNAL)
+
+
+class TestLeaderboard:
+    def test_refresh_builds_every_board(self, mock_db):
+        leaderboard = Leaderboard(mock_db, size=20)
+
+        assert leaderboard.refresh() is True
+
+        assert leaderboard.metrics()['boards'] == 24
+        mock_db.get_top_users.assert_any_call(mock_db.get_session.return_value, 'comments', 20, 24)
+        assert leaderboard.top('users', 'views', 'all', 1) == [{"user_id": "user1", "count": 200}]
+
+    def test_stale_or_missing_board_is_not_served(self, mock_db):
+        leaderboard = Leaderboard(mock_db, max_age=0)
+        assert leaderboard.top('posts', 'views', 'all', 10) is None
+
+        leaderboard.refresh()
+        leaderboard._refreshed_at -= 1
+        assert leaderboard.top('posts', 'views', 'all', 10) is None
+
+    def test_failed_refresh_keeps_previous_boards(self, mock_db):
+        leaderboard = Leaderboard(mock_db)
+        leaderboard.refresh()
+        mock_db.get_top_posts.side_effect = Exception("ClickHouse unavailable")
+
+        assert leaderboard.refresh() is False
+        assert leaderboard.top('posts', 'views', 'week', 10) is not None
+        assert leaderboard.metrics()['refresh_errors'] == 1
+
 
 class TestGetTopUsers:
     def test_success(self, statistic_service, mock_db):
@@ -186,3 +381,39 @@ class TestGetPostIds:
 
         assert response == statistic_pb2.GetPostIdsResponse()
         context.set_code.assert_called_with(grpc.StatusCode.INTERNAL)
+
+
+class TestAggregateBatch:
+    def test_records_creators_in_one_call(self, statistic_service, mock_db):
+        mock_db.attribute_posts.return_value = 2
+        request = statistic_pb2.AggregateBatchRequest(creators=[
+            statistic_pb2.PostCreator(post_id="post1", creator_id="user1"),
+            statistic_pb2.PostCreator(post_id="post2", creator_id="user2")
+        ])
+        context = Mock()
+
+        response = statistic_service.AggregateBatch(request, context)
+
+        assert response.recorded == 2
+        assert response.unattributed_post_ids == []
+        (rows,), _ = mock_db.attribute_posts.call_args
+        assert [(row['post_id'], row['creator_id']) for row in rows] == [("post1", "user1"), ("post2", "user2")]
+        mock_db.get_unattributed_post_ids.assert_not_called()
+
+    def test_empty_request_only_lists_unattributed(self, statistic_service, mock_db):
+        mock_db.get_unattributed_post_ids.return_value = TEST_POST_IDS
+        context = Mock()
+
+        response = statistic_service.AggregateBatch(statistic_pb2.AggregateBatchRequest(), context)
+
+        assert response.unattributed_post_ids == TEST_POST_IDS
+        mock_db.attribute_posts.assert_not_called()
+
+    def test_db_error(self, statistic_service, mock_db):
+        mock_db.get_unattributed_post_ids.side_effect = Exception("DB error")
+        context = Mock()
+
+        response = statistic_service.AggregateBatch(statistic_pb2.AggregateBatchRequest(), context)
+
+        assert response == statistic_pb2.AggregateBatchResponse()
+        context.set_code.assert_called_with(grpc.StatusCode.INTERNAL)
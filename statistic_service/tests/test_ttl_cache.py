@@ -0,0 +1,83 @@
+import threading
+import time
+import pytest
+from statistic_service.db.ttl_cache import TTLCache
+
+
+def test_value_is_reused_until_it_expires():
+    cache = TTLCache(ttl=0.05)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_load('top', load) == 1
+    assert cache.get_or_load('top', load) == 1
+    time.sleep(0.06)
+    assert cache.get_or_load('top', load) == 2
+    assert cache.metrics()['hits'] == 1
+
+
+def test_concurrent_misses_load_once():
+    cache = TTLCache(ttl=60)
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'result'
+
+    threads = [threading.Thread(target=cache.get_or_load, args=('trending', load)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+
+
+def test_failed_load_is_not_cached():
+    cache = TTLCache(ttl=60)
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load('top', lambda: (_ for _ in ()).throw(RuntimeError("ClickHouse unavailable")))
+    assert cache.get_or_load('top', lambda: 'ok') == 'ok'
+    assert cache._loading == {}
+
+
+def test_oldest_entry_is_evicted_when_full():
+    cache = TTLCache(ttl=60, max_entries=2)
+    for key in ['a', 'b', 'c']:
+        cache.get_or_load(key, lambda: key)
+
+    assert cache.metrics()['entries'] == 2
+    assert cache.get_or_load('a', lambda: 'reloaded') == 'reloaded'
+
+
+def test_eviction_during_a_load_does_not_start_a_second_one():
+    cache = TTLCache(ttl=0.01, max_entries=1)
+    cache.get_or_load('a', lambda: 'old')
+    time.sleep(0.02)
+    loading, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_load():
+        calls.append(1)
+        loading.set()
+        release.wait(5)
+        return 'new'
+
+    first = threading.Thread(target=cache.get_or_load, args=('a', slow_load))
+    first.start()
+    loading.wait(5)
+    # Evicts the expired entry of 'a' while it is being reloaded
+    cache.get_or_load('b', lambda: 'b')
+    second = threading.Thread(target=cache.get_or_load, args=('a', slow_load))
+    second.start()
+    time.sleep(0.05)
+    release.set()
+    first.join()
+    second.join()
+
+    assert len(calls) == 1
+    assert cache._loading == {}
@@ -2,7 +2,13 @@ import pytest
 from datetime import datetime, date
 from sqlalchemy import inspect
 from clickhouse_sqlalchemy import types as ch_types
-from statistic_service.db.clickhouse_models import Event, PostStats, PostDailyStats, UserStats, EventType
+from sqlalchemy import create_engine
+from sqlalchemy.schema import CreateTable
+from statistic_service.db.clickhouse_models import (Event, PostStats, PostDailyStats, UserStats, PostCreator,
+                                                      EventType, post_stats_mv, post_daily_stats_mv,
+                                                      user_stats_mv, post_creators_mv, PostHourlyStats,
+                                                      post_hourly_stats_mv, user_hourly_stats_mv, PostUnattributedStats,
+                                                      post_unattributed_stats_mv)
 
 
 @pytest.fixture
@@ -37,12 +43,10 @@ def sample_post_daily_stats():
 
 
 @pytest.fixture
-def sample_user_stats():
-    return UserStats(
-        user_id="user123",
-        views_count=200,
-        likes_count=20,
-        comments_count=10,
+def sample_post_creator():
+    return PostCreator(
+        post_id="post123",
+        creator_id="user123",
         updated_at=datetime.now()
     )
 
@@ -60,6 +64,18 @@ def test_event_column_definitions():
     assert isinstance(columns['post_id'].type, ch_types.String)
     assert isinstance(columns['event_type'].type, ch_types.Enum8)
     assert isinstance(columns['event_date'].type, ch_types.Date)
+    assert isinstance(columns['user_id'].type, ch_types.String)
+    assert isinstance(columns['creator_id'].type, ch_types.String)
+    assert isinstance(columns['event_time'].type, ch_types.DateTime64)
+
+
+def test_events_sorted_by_post_and_partitioned_by_month():
+    ddl = str(CreateTable(Event.__table__).compile(create_engine("clickhouse://mock")))
+    assert "ORDER BY (post_id, event_type, event_time, event_id)" in ddl
+    assert "PARTITION BY toYYYYMM(event_date)" in ddl
+    assert "TTL event_date + INTERVAL" in ddl
+    assert "event_time DateTime64(6) CODEC(Delta, ZSTD(1))" in ddl
+    assert "SETTINGS non_replicated_deduplication_window=" in ddl
 
 
 def test_post_stats_model(sample_post_stats):
@@ -103,12 +119,10 @@ def test_post_daily_stats_column_definitions():
     assert columns['comments_count'].default.arg == 0
 
 
-def test_user_stats_model(sample_user_stats):
-    assert sample_user_stats.user_id == "user123"
-    assert sample_user_stats.views_count == 200
-    assert sample_user_stats.likes_count == 20
-    assert sample_user_stats.comments_count == 10
-    assert isinstance(sample_user_stats.updated_at, datetime)
+def test_post_creator_model(sample_post_creator):
+    assert sample_post_creator.post_id == "post123"
+    assert sample_post_creator.creator_id == "user123"
+    assert isinstance(sample_post_creator.updated_at, datetime)
 
 
 def test_user_stats_column_definitions():
@@ -118,7 +132,56 @@ def test_user_stats_column_definitions():
     assert isinstance(columns['views_count'].type, ch_types.UInt64)
     assert columns['views_count'].default.arg == 0
     assert isinstance(columns['likes_count'].type, ch_types.UInt64)
-    assert columns['likes_count'].default.arg == 0
     assert isinstance(columns['comments_count'].type, ch_types.UInt64)
-    assert columns['comments_count'].default.arg == 0
     assert isinstance(columns['updated_at'].type, ch_types.DateTime)
+
+
+def test_post_creator_column_definitions():
+    columns = inspect(PostCreator).columns
+    assert isinstance(columns['post_id'].type, ch_types.String)
+    assert columns['post_id'].primary_key is True
+    assert isinstance(columns['creator_id'].type, ch_types.String)
+    assert isinstance(columns['updated_at'].type, ch_types.DateTime)
+
+
+def test_stats_materialized_views_write_to_stats_tables():
+    engine = create_engine("clickhouse://mock")
+
+    post_stats_query = str(post_stats_mv.mv_selectable.compile(engine, compile_kwargs={"literal_binds": True}))
+    daily_stats_query = str(post_daily_stats_mv.mv_selectable.compile(engine, compile_kwargs={"literal_binds": True}))
+
+    assert post_stats_mv.inner_table is PostStats.__table__
+    assert post_daily_stats_mv.inner_table is PostDailyStats.__table__
+    assert "countIf(events.event_type = 'VIEW') AS views_count" in post_stats_query
+    assert "GROUP BY events.post_id" in post_stats_query
+    assert "GROUP BY events.post_id, events.event_date" in daily_stats_query
+
+
+def test_hourly_rollups_group_events_by_hour():
+    engine = create_engine("clickhouse://mock")
+
+    query = str(post_hourly_stats_mv.mv_selectable.compile(engine, compile_kwargs={"literal_binds": True}))
+    assert "toStartOfHour(events.event_time) AS hour" in query
+    assert "GROUP BY events.post_id, hour" in query
+    assert post_hourly_stats_mv.inner_table is PostHourlyStats.__table__
+    assert "TTL hour + INTERVAL" in str(CreateTable(PostHourlyStats.__table__).compile(engine))
+
+
+def test_creator_views_skip_events_without_creator():
+    engine = create_engine("clickhouse://mock")
+
+    for view in [user_stats_mv, user_hourly_stats_mv, post_creators_mv]:
+        query = str(view.mv_selectable.compile(engine, compile_kwargs={"literal_binds": True}))
+        assert "WHERE events.creator_id != ''" in query
+    assert user_stats_mv.inner_table is UserStats.__table__
+    assert post_creators_mv.inner_table is PostCreator.__table__
+
+
+def test_unattributed_view_counts_events_without_creator():
+    engine = create_engine("clickhouse://mock")
+
+    query = str(post_unattributed_stats_mv.mv_selectable.compile(engine, compile_kwargs={"literal_binds": True}))
+    assert "WHERE events.creator_id = ''" in query
+    assert post_unattributed_stats_mv.inner_table is PostUnattributedStats.__table__
+    # Settled counts are written back negated
+    assert isinstance(inspect(PostUnattributedStats).columns['views_count'].type, ch_types.Int64)
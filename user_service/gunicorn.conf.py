@@ -0,0 +1,38 @@
+"""
+gunicorn settings of user_service, all overridable from the environment:
+
+    gunicorn -c gunicorn.conf.py user_service:app
+
+Every worker process has its own SQLAlchemy pool (5 connections + 10 overflow by default), so
+GUNICORN_WORKERS × GUNICORN_THREADS should stay within what Postgres accepts. The app is not
+preloaded: database connections and the Kafka producer are opened in each worker after the fork.
+Before taking requests every worker waits for the database and its schema (see post_worker_init).
+"""
+import os
+import sys
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("GUNICORN_WORKERS", str(os.cpu_count() or 1)))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+backlog = int(os.getenv("GUNICORN_BACKLOG", "2048"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE_SECONDS", "5"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT_SECONDS", "30"))
+# SIGTERM stops accepting connections and lets in-flight requests finish for this long
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT_SECONDS", "30"))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+preload_app = False
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def post_worker_init(worker):
+    """
+    Runs wait_for_database in every worker once the app is loaded. A worker that gives up fails to
+    boot, and gunicorn then exits instead of serving 500s. The wait stays under `timeout`, after
+    which the master kills a silent worker and just starts another one.
+    """
+    app = worker.wsgi
+    with app.app_context():
+        sys.modules[app.import_name].wait_for_database(timeout=timeout / 2)
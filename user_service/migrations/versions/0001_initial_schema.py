@@ -0,0 +1,62 @@
+"""Initial users, roles and profiles schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-05-27 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by the former metadata.create_all() at startup already have these tables;
+    # they are left as they are and the revision is recorded on top of them. Offline (--sql)
+    # there is no database to look at, and the script creates everything.
+    existing = set() if op.get_context().as_sql else set(sa.inspect(op.get_bind()).get_table_names())
+    if 'user_role' not in existing:
+        op.create_table(
+            'user_role',
+            sa.Column('role_id', sa.String(36), primary_key=True),
+            sa.Column('role_name', sa.String(80), nullable=False),
+            sa.Column('role_description', sa.Text()),
+            sa.Column('assigned_at', sa.DateTime()),
+        )
+    if 'user' not in existing:
+        op.create_table(
+            'user',
+            sa.Column('user_id', sa.String(36), primary_key=True),
+            sa.Column('role_id', sa.String(36), sa.ForeignKey('user_role.role_id'), nullable=False),
+            sa.Column('login', sa.String(80), nullable=False, unique=True),
+            sa.Column('email', sa.String(120), nullable=False, unique=True),
+            sa.Column('hashed_password', sa.String(255), nullable=False),
+            sa.Column('first_name', sa.String(80)),
+            sa.Column('last_name', sa.String(80)),
+            sa.Column('created_at', sa.DateTime()),
+            sa.Column('updated_at', sa.DateTime()),
+            sa.Column('is_active', sa.Boolean()),
+        )
+    if 'user_profile' not in existing:
+        op.create_table(
+            'user_profile',
+            sa.Column('profile_id', sa.String(36), primary_key=True),
+            sa.Column('user_id', sa.String(36), sa.ForeignKey('user.user_id'), nullable=False),
+            sa.Column('avatar_url', sa.String(200)),
+            sa.Column('about_me', sa.Text()),
+            sa.Column('city', sa.String(80)),
+            sa.Column('education', sa.String(80)),
+            sa.Column('interests', sa.String(200)),
+            sa.Column('date_of_birth', sa.DateTime()),
+            sa.Column('phone_number', sa.String(20)),
+        )
+
+
+def downgrade():
+    op.drop_table('user_profile')
+    op.drop_table('user')
+    op.drop_table('user_role')
@@ -16,6 +16,7 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     profile = db.relationship('UserProfile', backref='user', uselist=False, cascade='all, delete-orphan')
     role = db.relationship('UserRole', backref='users')
 
@@ -1,7 +1,13 @@
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
+import os
+import runpy
+import sys
 import pytest
 import datetime
 import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
 from ..user_service import app, User, generate_jwt, decode_jwt
 
 
@@ -160,3 +166,38 @@ def test_get_profile_invalid_token(mock_decode, client):
     response = client.get('/profile', headers={"Authorization": "invalid_token"})
     assert response.status_code == 401
     assert response.json == {"message": "Invalid or expired token."}
+
+
+def test_gunicorn_workers_wait_for_database_before_serving():
+    conf = runpy.run_path(os.path.join(os.path.dirname(__file__), '..', 'gunicorn.conf.py'))
+    with patch.object(sys.modules[app.import_name], 'wait_for_database') as mock_wait:
+        conf['post_worker_init'](SimpleNamespace(wsgi=app))
+
+    mock_wait.assert_called_once_with(timeout=conf['timeout'] / 2)
+
+
+def test_deactivating_or_deleting_a_user_publishes_a_revocation():
+    service = sys.modules[app.import_name]
+    engine = create_engine('sqlite://')
+    service.db.metadata.create_all(engine)
+    with patch.object(service.kafka_producer, 'send_token_revocation_event') as mock_send, Session(engine) as session:
+        session.add_all([
+            service.UserRole(role_id='r1', role_name='user'),
+            service.User(user_id='u1', role_id='r1', login='user1', email='user1@example.com', hashed_password='x')
+        ])
+        session.commit()
+        user = session.get(service.User, 'u1')
+
+        user.is_active = False
+        session.commit()
+        assert user.token_version == 1
+        mock_send.assert_called_once_with(user_id='u1', token_version=1)
+
+        user.token_version = 5
+        session.flush()
+        session.rollback()
+        assert mock_send.call_count == 1
+
+        session.delete(user)
+        session.commit()
+        mock_send.assert_called_with(user_id='u1', token_version=2)
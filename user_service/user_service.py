@@ -2,10 +2,15 @@ from flask import Flask, request, jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
 import datetime
+import os
 import time
 import uuid
 from models import db, User, UserProfile, UserRole
-from sqlalchemy import func
+from sqlalchemy import event, func, inspect
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, object_session
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
 from validators.validators import (
     validate_email_format, validate_date_of_birth, validate_name,
     validate_phone_number, validate_login, validate_password, validate_city
@@ -13,20 +18,46 @@ from validators.validators import (
 from broker.kafka_producer import kafka_producer
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'postgresql://user:password@db/user_db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'postgresql://user:password@db/user_db')
 app.config['JWT_SECRET'] = '12345678'
 app.config["JSON_SORT_KEYS"] = False
 db.init_app(app)
 
-with app.app_context():
-    time.sleep(10)
-    db.drop_all()
-    db.create_all()
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
 
 
-def generate_jwt(user_id):
+class SchemaVersionError(Exception):
+    pass
+
+
+def check_schema_version():
+    """Fails unless `alembic upgrade head` has been applied; never changes the schema."""
+    expected = set(ScriptDirectory(MIGRATIONS_DIR).get_heads())
+    with db.engine.connect() as conn:
+        current = set(MigrationContext.configure(conn).get_current_heads())
+    if current != expected:
+        raise SchemaVersionError(
+            f"Database schema is at {sorted(current) or 'an empty revision'}, expected {sorted(expected)}. "
+            f"Run `alembic -c user_service/alembic.ini upgrade head`"
+        )
+
+
+def wait_for_database(timeout: float = 30.0, interval: float = 0.5):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            check_schema_version()
+            return
+        except OperationalError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(interval)
+
+
+def generate_jwt(user_id, token_version=0):
     payload = {
         "user_id": user_id,
+        "ver": token_version,
         "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=1)
     }
     return jwt.encode(payload, app.config['JWT_SECRET'], algorithm='HS256')
@@ -42,6 +73,44 @@ def decode_jwt(token):
         return None
 
 
+def is_revoked(payload, user):
+    """Tokens issued before the user's last logout or deactivation carry an older version."""
+    return payload.get('ver', 0) < (user.token_version or 0)
+
+
+def pending_revocations(session) -> dict:
+    return session.info.setdefault('token_revocations', {})
+
+
+@event.listens_for(User, 'before_update')
+def revoke_tokens_on_update(mapper, connection, user):
+    """Deactivating a user revokes their tokens; a raised token_version is published once committed."""
+    state = inspect(user)
+    bumped = state.attrs.token_version.history.has_changes()
+    if not bumped and state.attrs.is_active.history.has_changes() and user.is_active is False:
+        user.token_version = (user.token_version or 0) + 1
+        bumped = True
+    if bumped:
+        pending_revocations(state.session)[user.user_id] = user.token_version
+
+
+@event.listens_for(User, 'after_delete')
+def revoke_tokens_on_delete(mapper, connection, user):
+    pending_revocations(object_session(user))[user.user_id] = (user.token_version or 0) + 1
+
+
+@event.listens_for(Session, 'after_commit')
+def publish_token_revocations(session):
+    # The gateways drop tokens below the published version, see api_gateway/utils/token_cache.py
+    for user_id, token_version in session.info.pop('token_revocations', {}).items():
+        kafka_producer.send_token_revocation_event(user_id=user_id, token_version=token_version)
+
+
+@event.listens_for(Session, 'after_rollback')
+def drop_token_revocations(session):
+    session.info.pop('token_revocations', None)
+
+
 @app.route('/register', methods=['POST'])
 def register():
     data = request.json
@@ -108,8 +177,8 @@ def register():
 def login():
     data = request.json
     user = User.query.filter_by(login=data['login']).first()
-    if user and check_password_hash(user.hashed_password, data['password']):
-        token = generate_jwt(user.user_id)
+    if user and user.is_active is not False and check_password_hash(user.hashed_password, data['password']):
+        token = generate_jwt(user.user_id, user.token_version or 0)
         return jsonify({
             "token": token,
             "message": "User successfully authenticated!"
@@ -126,6 +195,8 @@ def get_profile():
     if not payload:
         return jsonify({"message": "Invalid or expired token."}), 401
     user = User.query.get(payload['user_id'])
+    if user and is_revoked(payload, user):
+        return jsonify({"message": "Token has been revoked."}), 401
     if user:
         return jsonify({
             "login": user.login,
@@ -157,6 +228,8 @@ def update_profile():
     user = User.query.get(payload['user_id'])
     if not user:
         return jsonify({"message": "User not found."}), 404
+    if is_revoked(payload, user):
+        return jsonify({"message": "Token has been revoked."}), 401
 
     data = request.json
 
@@ -219,6 +292,8 @@ def get_user_info():
     user = db.session.get(User, payload['user_id'])
     if not user:
         return jsonify({"message": "User not found."}), 404
+    if is_revoked(payload, user):
+        return jsonify({"message": "Token has been revoked."}), 401
     return jsonify({
         "user_id": user.user_id,
         "login": user.login,
@@ -229,10 +304,46 @@ def get_user_info():
     }), 200
 
 
+@app.route('/logout', methods=['POST'])
+def logout():
+    """Revokes every token issued to the user so far, including the one in the request."""
+    token = request.headers.get('Authorization')
+    if not token:
+        return jsonify({"message": "Token is missing."}), 401
+    payload = decode_jwt(token)
+    if not payload:
+        return jsonify({"message": "Invalid or expired token."}), 401
+    user = db.session.get(User, payload['user_id'])
+    if not user:
+        return jsonify({"message": "User not found."}), 404
+    if is_revoked(payload, user):
+        return jsonify({"message": "Token has been revoked."}), 401
+
+    # Published to the gateways by publish_token_revocations on commit
+    user.token_version = (user.token_version or 0) + 1
+    db.session.commit()
+    return jsonify({
+        "message": "Logged out.",
+        "user_id": user.user_id,
+        "token_version": user.token_version
+    }), 200
+
+
 @app.route('/health', methods=['GET'])
 def health():
     return {"status": "healthy"}, 200
 
 
+@app.route('/ready', methods=['GET'])
+def ready():
+    try:
+        check_schema_version()
+    except (OperationalError, SchemaVersionError) as e:
+        return {"status": "not ready", "message": str(e)}, 503
+    return {"status": "ready"}, 200
+
+
 if __name__ == '__main__':
+    with app.app_context():
+        wait_for_database()
     app.run(host='0.0.0.0', port=5000)